@@ -0,0 +1,173 @@
+# Analisi CMJ senza GUI su una cartella (o glob) di acquisizioni di pedana.
+#   python -m batch CARTELLA_O_GLOB [...] --out report/ --workers 4
+# Le cartelle Excel (.xlsx/.xls) vengono lette direttamente: ogni foglio è una prova
+# ("cartella.xlsx::Foglio"), colonne A:C, senza passare da exportercreator e dai CSV.
+# Per ogni file: load_pedana -> preprocess -> analyze_cmj_force -> fasi automatiche ->
+# compute_kinematics, poi export PDF/CSV come "Esporta PDF/CSV" di rep.py. I file con errori vengono saltati
+# e segnalati; alla fine viene scritto un riepilogo con tutte le righe Parametro/Valore.
+# --profilo FILE: tempi/CPU/campioni per stadio e per file anche dai worker (vita_core.profiling).
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use("Agg")  # nessuna finestra nei processi worker
+
+import pandas as pd
+
+from vita_core import analysis, profiling
+from vita_core.excel import expand_trials
+from vita_core.ingest import ESTENSIONI_EXCEL, trial_name
+from vita_core.session import analyze_session
+
+ESTENSIONI = (".txt", ".csv") + ESTENSIONI_EXCEL
+
+# ============================
+# RACCOLTA FILE
+# ============================
+
+def collect_files(inputs):
+    files = []
+    for voce in inputs:
+        if os.path.isdir(voce):
+            trovati = [os.path.join(voce, f) for f in os.listdir(voce)
+                       if f.lower().endswith(ESTENSIONI)]
+        else:
+            trovati = glob.glob(voce)
+        files.extend(sorted(trovati))
+    # Stesso file indicato due volte: una sola analisi; cartelle Excel espanse per foglio
+    return list(dict.fromkeys(t for f in files for t in expand_trials(os.path.abspath(f))))
+
+# ============================
+# ANALISI SINGOLO FILE (WORKER)
+# ============================
+
+def process_file(file_path, params, out_dir):
+    tempi = {}
+    t0 = time.perf_counter()
+    df = analysis.load_pedana(file_path)
+    tempi['load'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    df = analysis.preprocess(df, params['offset_sx'], params['offset_dx'], params['soglia_contatto'])
+    tempi['preprocess'] = time.perf_counter() - t0
+    stima = df.attrs.get('baseline')
+    if stima is not None and stima['confidence'] < params.get('confidenza_min', 0):
+        raise ValueError(f"stima automatica di offset/peso poco affidabile "
+                         f"(confidenza {stima['confidence']*100:.0f}%): indicare --offset-sx/--offset-dx/--massa")
+
+    t0 = time.perf_counter()
+    cmj = analysis.analyze_cmj_force(df, soglia_volo=params['soglia_volo'], durata_min=params['durata_min'],
+                                massa=params['massa'])
+    tempi['analyze'] = time.perf_counter() - t0
+    if cmj['takeoff_idx'] is None:
+        raise ValueError("nessuna fase di volo rilevata")
+
+    t0 = time.perf_counter()
+    ecc_idx, conc_idx = analysis.auto_phases(cmj)
+    tempi['phases'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    # Potenza calcolata una volta sola e passata al report (None se le fasi non sono rilevate:
+    # il report esce senza le righe di potenza)
+    kin = analysis.compute_kinematics(cmj['df'], ecc_idx, conc_idx, cmj['takeoff_idx'])
+    tempi['kinematics'] = time.perf_counter() - t0
+
+    base_name = trial_name(file_path)
+    pdf_file = os.path.join(out_dir, f"report_{base_name}_.pdf")
+    csv_file = os.path.join(out_dir, f"report_{base_name}_.csv")
+    t0 = time.perf_counter()
+    df_csv = analysis.write_report(pdf_file, csv_file, cmj, params['soglia_volo'], ecc_idx, conc_idx, cmj['massa'],
+                                   kin=kin)
+    tempi['export'] = time.perf_counter() - t0
+
+    # Più salti nello stesso file: tabella per prova accanto al report
+    if len(cmj['flight_intervals'][0]) > 1:
+        t0 = time.perf_counter()
+        sessione = analyze_session(df, soglia_volo=params['soglia_volo'], durata_min=params['durata_min'])
+        sessione['salti'].to_csv(os.path.join(out_dir, f"report_{base_name}_salti.csv"), index=False)
+        tempi['session'] = time.perf_counter() - t0
+    return df_csv, tempi
+
+def _run_one(file_path, params, out_dir):
+    # Gli errori tornano al processo principale come testo: un file rotto non ferma il lotto.
+    t0 = time.perf_counter()
+    try:
+        with profiling.stage("file", file=file_path):
+            df_csv, tempi = process_file(file_path, params, out_dir)
+        errore = None
+    except Exception as e:
+        df_csv, tempi, errore = None, {}, f"{type(e).__name__}: {e}"
+    tempi['totale'] = time.perf_counter() - t0
+    return file_path, df_csv, tempi, errore
+
+def run_batch(files, params, out_dir, workers=None):
+    os.makedirs(out_dir, exist_ok=True)
+    risultati, errori = [], []
+    t_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [profiling.submit(pool, _run_one, f, params, out_dir) for f in files]
+        for fut in as_completed(futures):
+            file_path, df_csv, tempi, errore = profiling.result(fut)
+            nome = os.path.basename(file_path)
+            if errore is not None:
+                errori.append((nome, errore))
+                print(f"[ERRORE] {nome}: {errore} ({tempi['totale']:.2f} s)")
+                continue
+            dettaglio = " ".join(f"{k}={v*1000:.0f}ms" for k, v in tempi.items() if k != 'totale')
+            print(f"[OK] {nome}: {tempi['totale']:.2f} s ({dettaglio})")
+            df_csv.insert(0, 'File', nome)
+            risultati.append(df_csv)
+    t_tot = time.perf_counter() - t_start
+
+    if risultati:
+        riepilogo = pd.concat(risultati, ignore_index=True).sort_values('File', kind='stable')
+        riepilogo_path = os.path.join(out_dir, "riepilogo.csv")
+        riepilogo.to_csv(riepilogo_path, index=False)
+        print(f"Riepilogo: {riepilogo_path}")
+    print(f"Completati {len(risultati)}/{len(files)} file in {t_tot:.2f} s")
+    return risultati, errori
+
+# ============================
+# CLI
+# ============================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analisi CMJ in batch, senza GUI")
+    parser.add_argument("inputs", nargs="+", help="cartelle o glob (es. dati/*.txt)")
+    parser.add_argument("--out", default="report", help="cartella di destinazione dei report")
+    parser.add_argument("--workers", type=int, default=None, help="processi paralleli (default: CPU)")
+    parser.add_argument("--offset-sx", type=analysis.numero_o_auto, default=analysis.AUTO,
+                        help="N oppure auto (tratto scarico più stabile)")
+    parser.add_argument("--offset-dx", type=analysis.numero_o_auto, default=analysis.AUTO)
+    parser.add_argument("--soglia-contatto", type=float, default=3)
+    parser.add_argument("--soglia-volo", type=float, default=5)
+    parser.add_argument("--durata-min", type=float, default=0.2)
+    parser.add_argument("--massa", type=analysis.numero_o_auto, default=analysis.AUTO,
+                        help="kg oppure auto (tratto di stazione eretta più stabile)")
+    parser.add_argument("--confidenza-min", type=float, default=0.2,
+                        help="confidenza minima (0-1) della stima automatica, sotto il file viene scartato")
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    files = collect_files(args.inputs)
+    if not files:
+        parser.error("nessun file trovato")
+    params = {
+        'offset_sx': args.offset_sx,
+        'offset_dx': args.offset_dx,
+        'soglia_contatto': args.soglia_contatto,
+        'soglia_volo': args.soglia_volo,
+        'durata_min': args.durata_min,
+        'massa': args.massa,
+        'confidenza_min': args.confidenza_min,
+    }
+    profilo = profiling.from_args(args)
+    _, errori = run_batch(files, params, args.out, args.workers)
+    profiling.finish(profilo, args)
+    return 1 if errori else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,97 @@
+# Conversione Excel -> CSV per foglio: lettura completa con pandas (versione precedente di
+# exportercreator) contro lettura in streaming con vita_core.excel, con tempi e picco di
+# memoria (ru_maxrss di un processo figlio per ciascun metodo). Verifica che i CSV
+# contengano gli stessi numeri e che la cache binaria coincida con il parse del testo.
+#   python benchmarks/bench_excel.py [--fogli 12] [--righe 20000] [--workers 4]
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+RADICE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RADICE)
+
+from vita_core.excel import convert_workbook
+from vita_core.ingest import CACHE_DIR, load_capture, parse_capture
+
+def crea_cartella(path, n_fogli, n_righe, seed=0):
+    from openpyxl import Workbook
+    rng = np.random.default_rng(seed)
+    wb = Workbook(write_only=True)
+    for k in range(n_fogli):
+        ws = wb.create_sheet(f"Prova {k + 1}")
+        ws.append(["Tempo (ms)", "Pedana SX (N)", "Pedana DX (N)"])
+        sx = np.round(rng.normal(380, 30, n_righe), 2)
+        dx = np.round(rng.normal(370, 30, n_righe), 2)
+        for i in range(n_righe):
+            ws.append([i, float(sx[i]), float(dx[i])])
+    wb.save(path)
+
+def vecchio(excel, out_dir):
+    for nome, df in pd.read_excel(excel, sheet_name=None, usecols="A:C").items():
+        df.to_csv(os.path.join(out_dir, f"{nome}.csv"), index=False, sep=",")
+
+def figlio(metodo, excel, out_dir, workers):
+    # Eseguito in un processo separato: stampa durata e picco RSS (MB)
+    import resource
+    t0 = time.perf_counter()
+    if metodo == "pandas":
+        vecchio(excel, out_dir)
+    else:
+        convert_workbook(excel, out_dir, workers=workers, binario=(metodo == "binario"))
+    durata = time.perf_counter() - t0
+    print(durata, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+
+def misura(metodo, excel, out_dir, workers):
+    os.makedirs(out_dir, exist_ok=True)
+    out = subprocess.run([sys.executable, __file__, "--figlio", metodo, excel, out_dir, str(workers)],
+                         capture_output=True, text=True, check=True).stdout.split()
+    return float(out[0]), float(out[1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fogli", type=int, default=12)
+    parser.add_argument("--righe", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--figlio", nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.figlio:
+        metodo, excel, out_dir, workers = args.figlio
+        figlio(metodo, excel, out_dir, int(workers))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        excel = os.path.join(tmp, "pedana.xlsx")
+        t0 = time.perf_counter()
+        crea_cartella(excel, args.fogli, args.righe)
+        print(f"{args.fogli} fogli x {args.righe} righe ({os.path.getsize(excel) / 2**20:.1f} MB) "
+              f"creati in {time.perf_counter() - t0:.1f} s")
+        risultati = {}
+        for metodo, workers in (("pandas", 1), ("streaming", 1), ("streaming", args.workers), ("binario", args.workers)):
+            nome = f"{metodo} x{workers}"
+            risultati[nome] = (os.path.join(tmp, nome.replace(" ", "_")), *misura(metodo, excel,
+                               os.path.join(tmp, nome.replace(" ", "_")), workers))
+            print(f"{nome:<14} {risultati[nome][1]:7.2f} s   picco {risultati[nome][2]:7.1f} MB")
+
+        # Stessi numeri nei CSV; la cache binaria uguale al parse del testo
+        rif = risultati["pandas x1"][0]
+        for nome, (cartella, _, _) in risultati.items():
+            for f in sorted(os.listdir(rif)):
+                a, b = parse_capture(os.path.join(rif, f)), parse_capture(os.path.join(cartella, f))
+                assert all(np.array_equal(a[c], b[c], equal_nan=True) for c in a), (nome, f)
+        cartella = risultati[f"binario x{args.workers}"][0]
+        for f in os.listdir(cartella):
+            if f.endswith(".csv"):
+                assert os.path.exists(os.path.join(cartella, CACHE_DIR, f + ".json")), f
+                testo = parse_capture(os.path.join(cartella, f))
+                cache = load_capture(os.path.join(cartella, f))
+                assert all(np.array_equal(testo[c], cache[c], equal_nan=True) for c in testo), f
+        print("CSV equivalenti, cache binaria identica al parse del testo")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# Cartella Excel con una prova CMJ per foglio: percorso in due passi (Excel -> CSV per
+# foglio -> load_pedana di ogni CSV, con il vecchio exportercreator basato su
+# pd.read_excel e con vita_core.excel.convert_workbook) contro lettura diretta dei fogli
+# (load_pedana("cartella.xlsx::Foglio")), tutti fino a preprocess + analyze_cmj_force.
+# Verifica che i risultati delle analisi coincidano.
+#   python benchmarks/bench_excel_ingest.py [--fogli 10] [--durata 10]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vita_core import analysis
+from vita_core import excel
+from vita_core.synthetic import cmj_trace
+
+def crea_cartella(path, n_fogli, durata):
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    for k in range(n_fogli):
+        ws = wb.create_sheet(f"CMJ {k + 1}")
+        ws.append(["Tempo (ms)", "Pedana SX (N)", "Pedana DX (N)"])
+        df = cmj_trace(durata=durata, massa=65 + k, seed=k)
+        for riga in df.itertuples(index=False, name=None):
+            ws.append([float(v) for v in riga])
+    wb.save(path)
+
+def analizza(prova):
+    df = analysis.preprocess(analysis.load_pedana(prova), analysis.AUTO, analysis.AUTO)
+    cmj = analysis.analyze_cmj_force(df, massa=analysis.AUTO, durata_min=0.2)
+    return cmj['Fmax'], cmj['takeoff_time'], cmj['massa']
+
+def due_passi_pandas(xlsx, out_dir):
+    os.makedirs(out_dir)
+    csv = []
+    for nome, df in pd.read_excel(xlsx, sheet_name=None, usecols="A:C").items():
+        csv.append(os.path.join(out_dir, f"{nome}.csv"))
+        df.to_csv(csv[-1], index=False, sep=",")
+    return [analizza(c) for c in csv]
+
+def due_passi(xlsx, out_dir):
+    esiti = excel.convert_workbook(xlsx, out_dir, workers=1)
+    return [analizza(e['csv']) for e in esiti]
+
+def diretto(xlsx):
+    return [analizza(prova) for prova in excel.expand_trials(xlsx)]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fogli", type=int, default=10)
+    parser.add_argument("--durata", type=float, default=10.0, help="secondi per prova (1 kHz)")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        xlsx = os.path.join(tmp, "sessione.xlsx")
+        crea_cartella(xlsx, args.fogli, args.durata)
+        print(f"{args.fogli} fogli x {int(args.durata * 1000)} righe ({os.path.getsize(xlsx) / 2**20:.1f} MB)")
+
+        tempi, risultati = {}, {}
+        for nome, fn in (("due passi, pd.read_excel", lambda: due_passi_pandas(xlsx, os.path.join(tmp, "pandas"))),
+                         ("due passi, convert_workbook", lambda: due_passi(xlsx, os.path.join(tmp, "csv"))),
+                         ("lettura diretta", lambda: diretto(xlsx))):
+            t0 = time.perf_counter()
+            risultati[nome] = np.array(fn(), dtype=float)
+            tempi[nome] = time.perf_counter() - t0
+        rif = tempi["due passi, pd.read_excel"]
+        for nome, t in tempi.items():
+            assert np.allclose(risultati[nome], risultati["lettura diretta"], equal_nan=True), nome
+            print(f"{nome:<28} {t:6.2f} s  ({args.fogli / t:.1f} prove/s, {rif / t:.2f}x)")
+        print("risultati identici")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# Filtri di vita_core.filtering contro il percorso pandas rolling che sostituiscono:
+# media centrata di 3 campioni (analyze_cmj_force), media all'indietro di 5 campioni
+# (vecchia calculate_stiffness_metrics), le due pedane insieme come array (2, n) e un
+# blocco di prove (filter_trials) contro un ciclo di Series. Verifica che le medie
+# coincidano con pandas; riporta anche Butterworth a fase zero e despike.
+#   python benchmarks/bench_filtering.py [--sizes 1e4 1e5 1e6 1e7] [--prove 50]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vita_core import filtering
+from vita_core.synthetic import cmj_trace
+
+def cronometra(fn, ripetizioni=5):
+    fn()
+    tempi = []
+    for _ in range(ripetizioni):
+        t0 = time.perf_counter()
+        risultato = fn()
+        tempi.append(time.perf_counter() - t0)
+    return min(tempi), risultato
+
+def riga(nome, t_pandas, t_nuovo):
+    print(f"  {nome:<34} pandas {t_pandas * 1e3:9.2f} ms   filtering {t_nuovo * 1e3:9.2f} ms   {t_pandas / t_nuovo:6.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e4, 1e5, 1e6, 1e7])
+    parser.add_argument("--prove", type=int, default=50, help="prove da 10 s nel blocco")
+    args = parser.parse_args()
+
+    for n in (int(s) for s in args.sizes):
+        raw = cmj_trace(fs=1000, durata=max(n, 3000) / 1000, n_salti=max(n // 5000, 1))
+        piatti = raw[['pedana_sinistra', 'pedana_destra']].to_numpy().T.copy()   # (2, n)
+        forza = piatti.sum(axis=0)
+        print(f"{len(forza)} campioni")
+
+        t_p, a = cronometra(lambda: pd.Series(forza).rolling(3, center=True, min_periods=1).mean().to_numpy())
+        t_n, b = cronometra(lambda: filtering.moving_average(forza, 3))
+        assert np.allclose(a, b, rtol=1e-12, atol=1e-9)
+        riga("media centrata 3", t_p, t_n)
+
+        t_p, a = cronometra(lambda: pd.Series(forza).rolling(5, min_periods=1).mean().to_numpy())
+        t_n, b = cronometra(lambda: filtering.moving_average(forza, 5, centrata=False))
+        assert np.allclose(a, b, rtol=1e-12, atol=1e-9)
+        riga("media all'indietro 5", t_p, t_n)
+
+        df = pd.DataFrame(piatti.T)
+        t_p, a = cronometra(lambda: df.rolling(3, center=True, min_periods=1).mean().to_numpy().T)
+        t_n, b = cronometra(lambda: filtering.moving_average(piatti, 3))
+        assert np.allclose(a, b, rtol=1e-12, atol=1e-9)
+        riga("due pedane (2, n), media 3", t_p, t_n)
+
+        t_b, _ = cronometra(lambda: filtering.butterworth(piatti, 1000, 50))
+        t_d, _ = cronometra(lambda: filtering.despike(piatti))
+        print(f"  {'Butterworth 50 Hz (2, n)':<34} {t_b * 1e3:9.2f} ms   despike (2, n) {t_d * 1e3:9.2f} ms")
+
+    # Blocco di prove della stessa durata: un ciclo di Series contro una chiamata 2-D
+    prove = [cmj_trace(fs=1000, durata=10, massa=60 + k % 30, seed=k) for k in range(args.prove)]
+    forze = [(p['pedana_sinistra'] + p['pedana_destra']).to_numpy() for p in prove]
+    t_p, a = cronometra(lambda: [pd.Series(f).rolling(3, center=True, min_periods=1).mean().to_numpy() for f in forze])
+    t_n, b = cronometra(lambda: filtering.filter_trials(forze, 1000))
+    assert all(np.allclose(x, y, rtol=1e-12, atol=1e-9) for x, y in zip(a, b))
+    print(f"{args.prove} prove x 10 s")
+    riga("blocco di prove, media 3 ms", t_p, t_n)
+    t_b, _ = cronometra(lambda: filtering.filter_trials(forze, 1000, {'tipo': 'butterworth', 'taglio_hz': 50}))
+    t_l, _ = cronometra(lambda: [filtering.butterworth(f, 1000, 50) for f in forze])
+    print(f"  {'Butterworth 50 Hz':<34} ciclo {t_l * 1e3:9.2f} ms   blocco {t_b * 1e3:9.2f} ms   {t_l / t_b:6.1f}x")
+    print("medie identiche a pandas rolling")
+
+if __name__ == "__main__":
+    main()
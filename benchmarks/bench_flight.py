@@ -0,0 +1,71 @@
+# Benchmark del rilevamento fasi di volo: ciclo per campione (versione storica)
+# contro il motore run-length vettoriale.
+#   python benchmarks/bench_flight.py [--sizes 1e5 1e6 1e7] [--legacy-max 1e6]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vita_core.phases import find_flight_intervals
+from vita_core.synthetic import cmj_trace
+
+def legacy_detect_flight_phase(df, soglia=5, durata_min=0.5):
+    # Versione originale di rep.detect_flight_phase (ciclo per campione), come riferimento.
+    df = df.copy()
+    df['in_volo'] = False
+    in_volo = df['forza_tot'] < soglia
+    start_idx = None
+    for i, val in enumerate(in_volo):
+        if val and start_idx is None:
+            start_idx = i
+        elif not val and start_idx is not None:
+            if df['time_s'].iloc[i-1] - df['time_s'].iloc[start_idx] >= durata_min:
+                df.loc[start_idx:i-1, 'in_volo'] = True
+            start_idx = None
+    if start_idx is not None and df['time_s'].iloc[-1] - df['time_s'].iloc[start_idx] >= durata_min:
+        df.loc[start_idx:len(df)-1, 'in_volo'] = True
+    return df
+
+def mask_edges(mask):
+    fronti = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(fronti == 1), np.flatnonzero(fronti == -1) - 1
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1e5, 1e6, 1e7])
+    parser.add_argument("--legacy-max", type=float, default=1e5)
+    parser.add_argument("--soglia", type=float, default=5)
+    parser.add_argument("--durata-min", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(f"{'campioni':>10} {'salti':>6} {'vettoriale (ms)':>16} {'ciclo (ms)':>12} {'identici':>9}")
+    for size in args.sizes:
+        n = int(size)
+        n_salti = max(n // 5000, 1)
+        df = cmj_trace(fs=1000, durata=n / 1000, n_salti=n_salti)
+        # Come rep.preprocess con offset 50/40 e soglia di contatto 3 N
+        sx = (df["pedana_sinistra"] - 50).clip(lower=0)
+        dx = (df["pedana_destra"] - 40).clip(lower=0)
+        df["forza_tot"] = sx.where(sx > 3, 0) + dx.where(dx > 3, 0)
+        df["time_s"] = df["time"] / 1000
+        forza = df["forza_tot"].values
+        time_s = df["time_s"].values
+
+        t0 = time.perf_counter()
+        starts, ends = find_flight_intervals(forza, time_s, args.soglia, args.durata_min)
+        t_vec = (time.perf_counter() - t0) * 1000
+
+        t_loop, uguali = "-", "-"
+        if n <= args.legacy_max:
+            t0 = time.perf_counter()
+            ref = mask_edges(legacy_detect_flight_phase(df, args.soglia, args.durata_min)['in_volo'].values)
+            t_loop = f"{(time.perf_counter() - t0) * 1000:.1f}"
+            uguali = "si" if np.array_equal(ref[0], starts) and np.array_equal(ref[1], ends) else "NO"
+        print(f"{n:>10} {len(starts):>6} {t_vec:>16.2f} {t_loop:>12} {uguali:>9}")
+
+if __name__ == "__main__":
+    main()
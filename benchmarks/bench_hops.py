@@ -0,0 +1,73 @@
+# Segmentazione dei balzelli: tempi su tracciati lunghi e robustezza agli spike rispetto al
+# conteggio storico di tutti gli attraversamenti di soglia (rolling(5) + diff).
+#   python benchmarks/bench_hops.py [--sizes 1e5 1e6 1e7] [--spike 50]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vita_core.hops import hop_metrics
+from vita_core.synthetic import hop_trace
+
+def forza_netta(raw):
+    return (raw['pedana_sinistra'] - 50).clip(lower=0) + (raw['pedana_destra'] - 40).clip(lower=0)
+
+def legacy(forza, time_s, massa, soglia=20):
+    f = pd.Series(forza).rolling(5).mean()
+    is_contact = f > soglia
+    diff = is_contact.astype(int).diff().fillna(0)
+    starts = time_s[(diff == 1).values]
+    ends = time_s[(diff == -1).values]
+    if ends[0] < starts[0]: ends = ends[1:]
+    n = min(len(starts), len(ends))
+    tc = np.mean(ends[:n] - starts[:n])
+    tv = np.mean(starts[1:n] - ends[:n-1])
+    return tc, tv
+
+def nuovo(forza, time_s, massa):
+    f = pd.Series(forza).rolling(5, min_periods=1).mean().to_numpy()
+    b = hop_metrics(f, time_s, massa)
+    return b['tc'][b['steady']].mean(), b['tv'][b['steady']].mean()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1e5, 1e6, 1e7])
+    parser.add_argument("--spike", type=int, default=50, help="spike di rumore in volo da aggiungere")
+    args = parser.parse_args()
+    rng = np.random.default_rng(1)
+
+    print("Robustezza (tc atteso 0.200 s, tv atteso 0.300 s):")
+    raw = hop_trace(n_balzi=30)
+    forza = forza_netta(raw).to_numpy()
+    time_s = raw['time'].to_numpy() / 1000
+    volo = np.flatnonzero(forza < 1)
+    spike = rng.choice(volo[5:-5], args.spike, replace=False)
+    sporco = forza.copy()
+    for i in spike:
+        sporco[i:i+6] = 300
+    for nome, f in (("pulito", forza), (f"{args.spike} spike", sporco)):
+        tc_l, tv_l = legacy(f, time_s, 75)
+        tc_n, tv_n = nuovo(f, time_s, 75)
+        print(f"  {nome:<10} storico tc {tc_l:.3f} tv {tv_l:.3f} | nuovo tc {tc_n:.3f} tv {tv_n:.3f}")
+
+    print(f"{'campioni':>10} {'balzi':>7} {'storico (ms)':>13} {'hop_metrics (ms)':>17}")
+    for size in args.sizes:
+        n_balzi = max(int(size / 1000 * 2) - 10, 1)
+        raw = hop_trace(n_balzi=n_balzi, stazione=1.0)
+        forza = forza_netta(raw).to_numpy()
+        time_s = raw['time'].to_numpy() / 1000
+        t0 = time.perf_counter()
+        legacy(forza, time_s, 75)
+        t_l = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        b = hop_metrics(forza, time_s, 75)
+        t_n = time.perf_counter() - t0
+        print(f"{len(forza):>10} {len(b['tc']):>7} {t_l*1000:>13.1f} {t_n*1000:>17.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# Benchmark della lettura dei file di pedana: parser python storico di load_pedana,
+# primo caricamento (parser C + scrittura cache) e caricamenti successivi da cache.
+#   python benchmarks/bench_ingest.py [--mb 100] [--dir CARTELLA]
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vita_core import ingest
+from vita_core.synthetic import cmj_trace, write_capture
+
+BYTE_PER_RIGA = 24  # stima per "123456.0,612.34,533.21\n"
+
+def legacy_load(path):
+    # load_pedana prima della cache: parser python, righe malformate saltate.
+    df = pd.read_csv(path, sep=",", header=None, comment="#", engine="python",
+                     skip_blank_lines=True, on_bad_lines="skip")
+    df = df.iloc[:, :3]
+    df.columns = list(ingest.COLONNE)
+    return df
+
+def cronometra(fn, ripetizioni=1):
+    migliore = float("inf")
+    for _ in range(ripetizioni):
+        t0 = time.perf_counter()
+        fn()
+        migliore = min(migliore, time.perf_counter() - t0)
+    return migliore
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=float, default=100)
+    parser.add_argument("--dir", default=None, help="cartella di lavoro (default: temporanea)")
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    cartella = args.dir or tempfile.mkdtemp(prefix="bench_ingest_")
+    path = os.path.join(cartella, "capture.txt")
+    n = int(args.mb * 1e6 / BYTE_PER_RIGA)
+    write_capture(cmj_trace(fs=1000, durata=n / 1000, n_salti=max(n // 5000, 1)), path)
+    mb = os.path.getsize(path) / 1e6
+    print(f"File: {path} ({mb:.1f} MB, {n} righe)")
+
+    shutil.rmtree(os.path.join(cartella, ingest.CACHE_DIR), ignore_errors=True)
+    t_cold = cronometra(lambda: ingest.load_capture(path))
+    t_warm = cronometra(lambda: ingest.load_capture(path), 3)
+    t_mmap = cronometra(lambda: ingest.load_capture(path, exact=False), 3)
+    t_c = cronometra(lambda: ingest.parse_capture(path))
+    cache_mb = sum(os.path.getsize(os.path.join(cartella, ingest.CACHE_DIR, f))
+                   for f in os.listdir(os.path.join(cartella, ingest.CACHE_DIR))) / 1e6
+
+    righe = [("parser C senza cache", t_c),
+             ("primo caricamento (parse + cache)", t_cold),
+             ("cache, float64 esatto", t_warm),
+             ("cache, memory-map compatto", t_mmap)]
+    if not args.skip_legacy:
+        righe.insert(0, ("load_pedana storico (engine python)", cronometra(lambda: legacy_load(path))))
+    for nome, t in righe:
+        print(f"{nome:<38} {t*1000:>10.1f} ms {mb / t:>8.1f} MB/s")
+    print(f"Dimensione cache: {cache_mb:.1f} MB")
+    if args.dir is None:
+        shutil.rmtree(cartella, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
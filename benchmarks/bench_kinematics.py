@@ -0,0 +1,56 @@
+# Verifica della cinematica sul salto analitico di vita_core.synthetic.analytic_jump e
+# tempi del calcolo a lotti (le stesse verifiche sono in tests/test_kinematics.py).
+#   python benchmarks/bench_kinematics.py [--prove 1000] [--fs 1000]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vita_core.kinematics import cmj_kinematics
+from vita_core.synthetic import analytic_jump
+
+def verifica(fs):
+    forza, t, start, takeoff, attesi = analytic_jump(fs)
+    ris = cmj_kinematics(forza, t, takeoff, start_idx=start)
+    print(f"{'metrica':<18} {'atteso':>10} {'calcolato':>10} {'errore %':>9}")
+    peggiore = 0.0
+    for k, atteso in attesi.items():
+        val = ris['metrics'][k]
+        err = abs(val - atteso) / abs(atteso) * 100
+        peggiore = max(peggiore, err)
+        print(f"{k:<18} {atteso:>10.4f} {val:>10.4f} {err:>9.3f}")
+    t_conc = t[ris['metrics']['concentric_start_idx']] - t[start]
+    print(f"inizio concentrica: {t_conc:.4f} s (atteso {0.5:.4f})")
+    assert peggiore < 0.5, f"errore massimo {peggiore:.3f}% oltre la tolleranza"
+    assert abs(t_conc - 0.5) <= 1.5 / fs
+
+def tempi(n_prove, fs):
+    rng = np.random.default_rng(0)
+    forza, t, start, takeoff, _ = analytic_jump(fs)
+    F = forza + rng.normal(0, 2, (n_prove, len(forza)))
+    t0 = time.perf_counter()
+    for riga in F:
+        cmj_kinematics(riga, t, takeoff, start_idx=start)
+    ciclo = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    lotto = cmj_kinematics(F, t, takeoff, start_idx=start)
+    matrice = time.perf_counter() - t0
+    singola = cmj_kinematics(F[-1], t, takeoff, start_idx=start)['metrics']['peak_power']
+    assert np.isclose(lotto['metrics']['peak_power'][-1], singola)
+    print(f"{n_prove} prove x {len(t)} campioni: ciclo {ciclo*1000:.0f} ms, matrice {matrice*1000:.0f} ms "
+          f"({ciclo/matrice:.1f}x)")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--prove", type=int, default=1000)
+    parser.add_argument("--fs", type=int, default=1000)
+    args = parser.parse_args()
+    verifica(args.fs)
+    tempi(args.prove, args.fs)
+
+if __name__ == "__main__":
+    main()
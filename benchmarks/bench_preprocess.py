@@ -0,0 +1,64 @@
+# Profilo di memoria e tempo per file: preprocess + analyze_cmj_force nella versione
+# storica (df.copy() a ogni passo, colonne float64 da Series) contro la versione su array.
+#   python benchmarks/bench_preprocess.py [--sizes 1e5 1e6 1e7]
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vita_core import analysis
+from vita_core.synthetic import cmj_trace
+
+def legacy_preprocess(df, offset_sx=0, offset_dx=0, soglia_contatto=3):
+    df = df.copy()
+    df["pedana_sinistra_cor"] = (df["pedana_sinistra"] - offset_sx).clip(lower=0)
+    df["pedana_destra_cor"]   = (df["pedana_destra"] - offset_dx).clip(lower=0)
+    df["pedana_sinistra_cor"] = df["pedana_sinistra_cor"].where(df["pedana_sinistra_cor"]>soglia_contatto, 0)
+    df["pedana_destra_cor"]   = df["pedana_destra_cor"].where(df["pedana_destra_cor"]>soglia_contatto, 0)
+    df["forza_tot"] = df["pedana_sinistra_cor"] + df["pedana_destra_cor"]
+    df['time_s'] = df['time'] / 1000
+    return df
+
+def legacy_analyze(df, soglia_volo=5, durata_min=0.2, finestra_media=3):
+    df = df.copy()
+    df['forza_filt'] = df['forza_tot'].rolling(finestra_media, center=True, min_periods=1).mean()
+    df = analysis.detect_flight_phase(df.copy(), soglia_volo, durata_min)
+    return df
+
+def misura(fn, raw):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn(raw)
+    durata = time.perf_counter() - t0
+    _, picco = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return durata * 1000, picco / 1e6
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1e5, 1e6, 1e7])
+    args = parser.parse_args()
+
+    varianti = [
+        ("storico", lambda raw: legacy_analyze(legacy_preprocess(raw, 50, 40))),
+        ("array float64", lambda raw: analysis.analyze_cmj_force(analysis.preprocess(raw, 50, 40), 5, 0.2)),
+        ("array float32", lambda raw: analysis.analyze_cmj_force(analysis.preprocess(raw, 50, 40, dtype=np.float32), 5, 0.2)),
+    ]
+    print(f"{'campioni':>10} {'variante':<14} {'tempo (ms)':>11} {'picco (MB)':>11} {'picco/grezzo':>13}")
+    for size in args.sizes:
+        n = int(size)
+        raw = cmj_trace(fs=1000, durata=n / 1000, n_salti=max(n // 5000, 1))
+        grezzo = raw.memory_usage(index=False).sum() / 1e6
+        for nome, fn in varianti:
+            t, picco = misura(fn, raw)
+            print(f"{n:>10} {nome:<14} {t:>11.1f} {picco:>11.1f} {picco / grezzo:>12.1f}x")
+
+if __name__ == "__main__":
+    main()
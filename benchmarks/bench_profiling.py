@@ -0,0 +1,60 @@
+# Costo della strumentazione per stadio (vita_core.profiling) sugli stadi di analisi di un
+# CMJ: funzioni non decorate (__wrapped__), decorate a strumentazione spenta, accesa, accesa
+# con picco di memoria. A strumentazione spenta il costo deve restare nel rumore.
+#   python benchmarks/bench_profiling.py [--campioni 10000] [--ripetizioni 200]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vita_core import analysis, profiling
+from vita_core.synthetic import cmj_trace
+
+def pipeline(raw, fn):
+    df = fn['preprocess'](raw, 50, 40)
+    fn['detect_flight_phase'](df, 5, 0.2)
+    cmj = fn['analyze_cmj_force'](df, massa=75, durata_min=0.2)
+    ecc, conc = fn['auto_phases'](cmj)
+    fn['compute_kinematics'](cmj['df'], ecc, conc, cmj['takeoff_idx'])
+
+def misura(raw, fn, opzioni):
+    # Una esecuzione della pipeline; opzioni None = strumentazione spenta
+    if opzioni is not None:
+        profiling.enable(**opzioni)
+    t0 = time.perf_counter()
+    pipeline(raw, fn)
+    t = time.perf_counter() - t0
+    if opzioni is not None:
+        assert len(profiling.disable().eventi) == 5
+    return t
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--campioni", type=int, default=10000)
+    parser.add_argument("--ripetizioni", type=int, default=200)
+    args = parser.parse_args()
+    raw = cmj_trace(fs=1000, durata=max(args.campioni, 3000) / 1000)
+    nomi = ['preprocess', 'detect_flight_phase', 'analyze_cmj_force', 'auto_phases', 'compute_kinematics']
+    decorate = {n: getattr(analysis, n) for n in nomi}
+    originali = {n: f.__wrapped__ for n, f in decorate.items()}
+
+    varianti = [("senza decoratori", originali, None), ("spenta", decorate, None),
+                ("accesa", decorate, {}), ("accesa + memoria", decorate, {'memoria': True})]
+    tempi = {nome: [] for nome, _, _ in varianti}
+    for k in range(args.ripetizioni + 5):   # varianti alternate; le prime 5 scaldano
+        for nome, fn, opzioni in varianti:
+            t = misura(raw, fn, opzioni)
+            if k >= 5:
+                tempi[nome].append(t)
+    rif = np.median(tempi["senza decoratori"])
+    print(f"{len(raw)} campioni, 5 stadi, mediana su {args.ripetizioni} ripetizioni")
+    for nome, _, _ in varianti:
+        t = np.median(tempi[nome])
+        print(f"  {nome:<20} {t * 1e3:8.3f} ms  ({(t - rif) / 5 * 1e6:+8.1f} µs per stadio, {(t / rif - 1) * 100:+6.1f}%)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# Benchmark del report PDF CMJ: rendering storico con pyplot e tutti i campioni contro
+# il renderer a oggetti con template riusati e decimazione min/max.
+#   python benchmarks/bench_report.py [--sizes 1e4 1e5 1e6] [--reports 5]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vita_core import analysis
+from vita_core.report import CMJReportRenderer
+from vita_core.synthetic import cmj_trace
+
+def legacy_render(pdf_file, df, cmj, soglia_volo, ecc_idx, conc_idx, cmj_data, bilanciamento=None):
+    # Pagine del report come le generava export_results prima del renderer a oggetti.
+    with PdfPages(pdf_file) as pdf:
+        plt.figure(figsize=(8,5))
+        plt.plot(df['time'], df['forza_tot'], label='Forza Totale')
+        plt.axhline(soglia_volo, color='red', linestyle='--', label='Soglia volo')
+        plt.axvline(cmj['takeoff_time']*1000, color='green', linestyle='--', label='Take-off')
+        plt.axvline(cmj['landing_time']*1000, color='orange', linestyle='--', label='Landing')
+        plt.scatter(cmj['peak_time']*1000, cmj['Fmax'], color='red', s=60, zorder=5, label='Fmax')
+        if ecc_idx is not None:
+            plt.axvline(df.iloc[ecc_idx]['time'], color='purple', linestyle='--', label='Inizio eccentrica')
+        if conc_idx is not None:
+            plt.axvline(df.iloc[conc_idx]['time'], color='brown', linestyle='--', label='Inizio concentrica')
+        plt.legend(loc='upper left'); plt.ylim(bottom=0)
+        pdf.savefig(); plt.close()
+
+        plt.figure(figsize=(8,5))
+        plt.plot(df['time'], df['pedana_sinistra_cor'], label='SX')
+        plt.plot(df['time'], df['pedana_destra_cor'], label='DX')
+        plt.legend(loc='upper left'); plt.ylim(bottom=0)
+        pdf.savefig(); plt.close()
+
+        if bilanciamento is not None:
+            plt.figure(figsize=(8,5))
+            plt.plot(*bilanciamento, label='Bilanciamento DX (%)')
+            plt.axhline(50, color='black', linestyle='--', linewidth=1)
+            plt.ylim(0,100); plt.legend(loc='upper left'); plt.grid(alpha=0.3)
+            pdf.savefig(); plt.close()
+
+        fig, ax = plt.subplots(figsize=(10,6))
+        ax.axis('off')
+        table = ax.table(cellText=cmj_data, loc='center', cellLoc='center', colWidths=[0.5,0.5])
+        table.auto_set_font_size(False); table.set_fontsize(14); table.scale(1.5,2)
+        pdf.savefig(); plt.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1e4, 1e5, 1e6])
+    parser.add_argument("--reports", type=int, default=5)
+    args = parser.parse_args()
+
+    cartella = tempfile.mkdtemp(prefix="bench_report_")
+    renderer = CMJReportRenderer()
+    print(f"{'campioni':>10} {'renderer':<10} {'ms/report':>10} {'KB/report':>10}")
+    for size in args.sizes:
+        n = int(size)
+        n_salti = max(n // 5000, 1)
+        df = analysis.preprocess(cmj_trace(fs=1000, durata=max(n, 3000) / 1000, n_salti=n_salti), 50, 40)
+        cmj = analysis.analyze_cmj_force(df, 5, 0.2, 75)
+        ecc, conc = analysis.auto_phases(cmj)
+        df_conc = cmj['df'].iloc[conc:cmj['takeoff_idx'] + 1]
+        bil = (df_conc['time_s'] - df_conc['time_s'].iloc[0],
+               100 * df_conc['pedana_destra_cor'] / df_conc['forza_tot'])
+        righe = [['Fmax (N)', f"{cmj['Fmax']:.0f}"], ['Massa soggetto (kg)', "75.0"]]
+        argomenti = (cmj['df'], cmj, 5, ecc, conc, righe, bil)
+        for nome, fn in (("storico", legacy_render), ("oggetti", renderer.render)):
+            path = os.path.join(cartella, f"{nome}_{n}.pdf")
+            t0 = time.perf_counter()
+            for _ in range(args.reports):
+                fn(path, *argomenti)
+            ms = (time.perf_counter() - t0) * 1000 / args.reports
+            print(f"{n:>10} {nome:<10} {ms:>10.1f} {os.path.getsize(path) / 1024:>10.1f}")
+
+if __name__ == "__main__":
+    main()
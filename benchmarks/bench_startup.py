@@ -0,0 +1,105 @@
+# Tempi di avvio a freddo: import dei moduli di calcolo di vita_core (verificando che non
+# carichino tkinter né matplotlib), import dei moduli delle GUI senza aprire la finestra e
+# tempo alla prima finestra di ogni strumento (mainloop sostituito da un solo update, poi
+# la finestra viene chiusa). Ogni misura in un interprete nuovo, minimo su --ripetizioni.
+# Senza display (DISPLAY non impostato su Linux) la prima finestra non viene misurata.
+#   python benchmarks/bench_startup.py [--ripetizioni 5] [--budget-core 0.5]
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+RADICE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CORE = ["vita_core.analysis", "vita_core.performance", "vita_core.comparison",
+        "vita_core.metrics", "vita_core.excel"]
+STRUMENTI = ["rep", "new", "compare", "compare_new", "exportercreator", "roster"]
+FINESTRE = ["rep", "new", "compare", "compare_new", "exportercreator"]
+
+IMPORT = """
+import sys, time
+t0 = time.perf_counter()
+import {modulo}
+print(time.perf_counter() - t0, 'tkinter' in sys.modules, 'matplotlib' in sys.modules)
+"""
+
+# runpy esegue lo script come __main__; al primo mainloop la finestra viene disegnata,
+# si misura il tempo e si esce senza entrare nel ciclo degli eventi.
+FINESTRA = """
+import sys, time
+t0 = time.perf_counter()
+import runpy, tkinter
+def primo_disegno(self, n=0):
+    self.update()
+    print(time.perf_counter() - t0)
+    self.destroy()
+    raise SystemExit(0)
+tkinter.Misc.mainloop = primo_disegno
+sys.argv = [{script!r}]
+runpy.run_path({script!r}, run_name="__main__")
+"""
+
+def esegui(codice):
+    out = subprocess.run([sys.executable, "-c", codice], cwd=RADICE,
+                         capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "errore")
+    return out.stdout.split()
+
+def misura_import(modulo, ripetizioni):
+    prove = [esegui(IMPORT.format(modulo=modulo)) for _ in range(ripetizioni)]
+    return min(float(p[0]) for p in prove), prove[0][1] == "True", prove[0][2] == "True"
+
+def misura_finestra(script, ripetizioni):
+    return min(float(esegui(FINESTRA.format(script=script))[0]) for _ in range(ripetizioni))
+
+def display_disponibile():
+    if sys.platform != "linux":
+        return True
+    if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+        return False
+    try:
+        esegui("import tkinter; tkinter.Tk().destroy()")
+        return True
+    except RuntimeError:
+        return False
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ripetizioni", type=int, default=5)
+    parser.add_argument("--budget-core", type=float, default=0.5, help="secondi per l'import di un modulo di calcolo")
+    parser.add_argument("--json", help="salva i risultati in questo file")
+    args = parser.parse_args()
+    risultati = {"core": {}, "import_strumenti": {}, "prima_finestra": {}}
+
+    print("Import a freddo del nucleo di calcolo")
+    for modulo in CORE:
+        t, tk, mpl = misura_import(modulo, args.ripetizioni)
+        risultati["core"][modulo] = t
+        print(f"  {modulo:<24} {t * 1000:7.0f} ms  tkinter={tk} matplotlib={mpl}")
+        assert not tk and not mpl, f"{modulo} carica tkinter o matplotlib"
+        assert t <= args.budget_core, f"{modulo}: {t:.3f} s oltre il budget di {args.budget_core} s"
+
+    print("Import degli strumenti (senza finestra)")
+    for modulo in STRUMENTI:
+        t, _, mpl = misura_import(modulo, args.ripetizioni)
+        risultati["import_strumenti"][modulo] = t
+        print(f"  {modulo:<24} {t * 1000:7.0f} ms  matplotlib={mpl}")
+
+    print("Tempo alla prima finestra")
+    if display_disponibile():
+        for script in FINESTRE:
+            t = misura_finestra(f"{script}.py", args.ripetizioni)
+            risultati["prima_finestra"][script] = t
+            print(f"  {script:<24} {t * 1000:7.0f} ms")
+    else:
+        risultati["prima_finestra"] = None
+        print("  nessun display: non misurato")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(risultati, f, indent=2)
+
+if __name__ == "__main__":
+    main()
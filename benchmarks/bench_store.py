@@ -0,0 +1,69 @@
+# Archivio storico: scrittura di molte sessioni e tempi delle interrogazioni pre/post e
+# andamento, contro la lettura dei CSV Parametro/Valore di una cartella.
+#   python benchmarks/bench_store.py [--atleti 200] [--sessioni 25] [--csv 500]
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vita_core.store import ResultsStore
+
+PARAMETRI = [f"Parametro {i} (u)" for i in range(20)] + ["Altezza salto (cm)"]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--atleti", type=int, default=200)
+    parser.add_argument("--sessioni", type=int, default=25, help="sessioni per atleta")
+    parser.add_argument("--csv", type=int, default=500, help="CSV da leggere per il confronto")
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    inizio = datetime.date(2024, 1, 1)
+
+    with tempfile.TemporaryDirectory() as cartella:
+        with ResultsStore(os.path.join(cartella, "bench.sqlite")) as store:
+            t0 = time.perf_counter()
+            for a in range(args.atleti):
+                for k in range(args.sessioni):
+                    valori = dict(zip(PARAMETRI, rng.normal(30, 5, len(PARAMETRI))))
+                    store.save_session(f"Atleta {a:04d}", "CMJ", valori, inizio + datetime.timedelta(weeks=k))
+            t_scrittura = time.perf_counter() - t0
+            n = args.atleti * args.sessioni
+            print(f"Scrittura: {n} sessioni in {t_scrittura:.2f} s ({t_scrittura / n * 1000:.2f} ms/sessione)")
+
+            fine = inizio + datetime.timedelta(weeks=args.sessioni - 1)
+            atleta = f"Atleta {args.atleti // 2:04d}"   # un atleta esistente, a metà dell'archivio
+            for nome, fn in (
+                ("pre/post un atleta", lambda: store.pre_post(atleta, "CMJ", inizio, fine)),
+                ("andamento un atleta", lambda: store.history(atleta, "CMJ")),
+                ("andamento squadra, 1 parametro", lambda: store.history(test="CMJ", parametri="Altezza salto (cm)")),
+            ):
+                assert len(fn()) > 0, f"{nome}: nessuna riga, l'interrogazione non misura nulla"
+                t0 = time.perf_counter()
+                for _ in range(20):
+                    risultato = fn()
+                t = (time.perf_counter() - t0) / 20
+                print(f"{nome:<32} {t * 1000:>8.2f} ms ({len(risultato)} righe)")
+
+        # Confronto: stessa interrogazione leggendo i CSV uno per uno
+        for i in range(args.csv):
+            valori = rng.normal(30, 5, len(PARAMETRI))
+            pd.DataFrame({"Parametro": PARAMETRI, "Valore": [f"{v:.1f}" for v in valori]}).to_csv(
+                os.path.join(cartella, f"report_{i}.csv"), index=False)
+        t0 = time.perf_counter()
+        altezze = []
+        for i in range(args.csv):
+            df = pd.read_csv(os.path.join(cartella, f"report_{i}.csv"))
+            v = pd.to_numeric(df["Valore"].astype(str).str.replace('%', '').str.strip(), errors='coerce')
+            altezze.append(v[df["Parametro"] == "Altezza salto (cm)"].iloc[0])
+        t = time.perf_counter() - t0
+        print(f"{'lettura di ' + str(args.csv) + ' CSV':<32} {t * 1000:>8.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# Memoria di picco e tempi: percorso in memoria (load_pedana + preprocess +
+# analyze_cmj_force) contro l'analisi a blocchi di vita_core.streaming. Verifica poi che
+# ogni salto coincida con session.analyze_session sullo stesso tracciato: take-off,
+# atterraggio, Fmax, indice del picco, tempo di volo e altezza.
+#   python benchmarks/bench_streaming.py [--minuti 30] [--chunksize 100000]
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use("Agg")
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vita_core import analysis
+from vita_core.session import analyze_session
+from vita_core.streaming import stream_jumps
+from vita_core.synthetic import cmj_trace, write_capture
+
+def misura(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    risultato = fn()
+    durata = time.perf_counter() - t0
+    _, picco = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return risultato, durata, picco / 1e6
+
+def finestre_in_memoria(df, salti, assestamento=1.0):
+    # Inizio della ricerca del massimo in analyze_session: inizio eccentrica, altrimenti
+    # atterraggio precedente + assestamento (inizio del file per il primo salto)
+    time_s = df['time_s'].to_numpy()
+    takeoff, landing = salti['takeoff_idx'].to_numpy(), salti['landing_idx'].to_numpy()
+    inizi = []
+    for k, (t, ecc) in enumerate(zip(takeoff, salti['eccentric_start_idx'])):
+        inizio = 0 if k == 0 else min(int(np.searchsorted(time_s, time_s[landing[k - 1]] + assestamento)), t)
+        inizi.append(ecc if ecc >= 0 else inizio)
+    return np.array(inizi)
+
+def verifica(cmj, eventi):
+    salti = analyze_session(cmj['df'], soglia_volo=5, durata_min=0.2)['salti']
+    assert len(eventi) == len(salti), f"voli: {len(eventi)} a blocchi, {len(salti)} in memoria"
+    t_volo = np.array([e['landing_time'] - e['takeoff_time'] for e in eventi])
+    # Il picco a blocchi deve cadere nella finestra in memoria e valere il massimo della forza
+    # filtrata in memoria: con valori uguali (plateau) l'indice può differire per arrotondamento
+    forza = cmj['df']['forza_filt'].to_numpy()
+    picco = np.array([-1 if e['peak_idx'] is None else e['peak_idx'] for e in eventi])
+    nella_finestra = (picco >= finestre_in_memoria(cmj['df'], salti)) & (picco < salti['takeoff_idx'].to_numpy())
+    assert nella_finestra.all(), f"peak_idx fuori dalla finestra di ricerca nel salto n. {np.argmin(nella_finestra) + 1}"
+    confronti = {
+        'takeoff_idx': ([e['takeoff_idx'] for e in eventi], salti['takeoff_idx']),
+        'landing_idx': ([e['landing_idx'] for e in eventi], salti['landing_idx']),
+        'Fmax (N)': ([np.nan if e['Fmax'] is None else e['Fmax'] for e in eventi], salti['Fmax (N)']),
+        'forza al peak_idx (N)': (forza[picco], salti['Fmax (N)']),
+        'Tempo di volo (s)': (t_volo, salti['Tempo di volo (s)']),
+        'Altezza salto (cm)': (analysis.g * t_volo**2 / 8 * 100, salti['Altezza salto (cm)']),
+    }
+    for nome, (a_blocchi, in_memoria) in confronti.items():
+        a_blocchi, in_memoria = np.asarray(a_blocchi, dtype=np.float64), np.asarray(in_memoria, dtype=np.float64)
+        diversi = ~np.isclose(a_blocchi, in_memoria, rtol=1e-9, atol=1e-9, equal_nan=True)
+        assert not diversi.any(), (f"{nome}: {diversi.sum()} salti diversi, primo n. {np.argmax(diversi) + 1} "
+                                   f"({a_blocchi[diversi][0]} a blocchi, {in_memoria[diversi][0]} in memoria)")
+    print(f"{len(salti)} salti identici a analyze_session (Fmax, picco, volo, altezza)")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minuti", type=float, default=30)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args()
+
+    cartella = tempfile.mkdtemp(prefix="bench_stream_")
+    path = os.path.join(cartella, "sessione.txt")
+    n = int(args.minuti * 60 * 1000)
+    write_capture(cmj_trace(fs=1000, durata=n / 1000, n_salti=max(n // 5000, 1)), path)
+    print(f"Registrazione: {args.minuti:.0f} min a 1 kHz ({n} campioni, {os.path.getsize(path)/1e6:.0f} MB)")
+
+    def in_memoria():
+        df = analysis.preprocess(analysis.load_pedana(path, use_cache=False), 50, 40)
+        return analysis.analyze_cmj_force(df, soglia_volo=5, durata_min=0.2)
+
+    def a_blocchi():
+        return list(stream_jumps(path, args.chunksize, offset_sx=50, offset_dx=40, durata_min=0.2))
+
+    cmj, t_mem, p_mem = misura(in_memoria)
+    eventi, t_str, p_str = misura(a_blocchi)
+    print(f"{'in memoria':<12} {t_mem:>8.2f} s  picco {p_mem:>8.1f} MB  voli {len(cmj['flight_intervals'][0])}")
+    print(f"{'a blocchi':<12} {t_str:>8.2f} s  picco {p_str:>8.1f} MB  voli {len(eventi)}")
+    verifica(cmj, eventi)
+    shutil.rmtree(cartella, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# Suite di benchmark di tutti gli stadi su tracciati sintetici (vita_core.synthetic) da
+# 10^3 a 10^7 campioni: load_pedana (parse del testo e cache binaria), preprocess,
+# detect_flight_phase, analyze_cmj_force, compute_kinematics (potenza concentrica),
+# calculate_stiffness_metrics (balzelli), confronto pre/post (get_merged_df di
+# compare_new, cioè comparison.merge_sessions) e export PDF/CSV (write_report).
+# Per ogni stadio e dimensione: minimo e mediana su --ripetizioni, ogni ripetizione con
+# abbastanza chiamate da durare almeno --minimo secondi. Risultati in JSON con commit e
+# versioni, per confrontare due commit:
+#   python benchmarks/bench_suite.py [--sizes 1e3 1e4 1e5 1e6 1e7] [--stadi preprocess ...]
+#   python benchmarks/bench_suite.py --confronta benchmarks/risultati/<prima>.json
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+
+RADICE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RADICE)
+
+from vita_core import analysis, comparison, performance
+from vita_core.synthetic import cmj_trace, hop_trace, write_capture
+
+STADI = ["load_pedana", "load_pedana_cache", "preprocess", "detect_flight_phase", "analyze_cmj_force",
+         "compute_kinematics", "calculate_stiffness_metrics", "get_merged_df", "write_report"]
+MASSA = 75
+
+def cronometra(fn, ripetizioni, minimo):
+    # (minimo, mediana) in secondi per chiamata; la prima chiamata scalda cache e import
+    t0 = time.perf_counter()
+    fn()
+    numero = max(1, math.ceil(minimo / max(time.perf_counter() - t0, 1e-9)))
+    tempi = []
+    for _ in range(ripetizioni):
+        t0 = time.perf_counter()
+        for _ in range(numero):
+            fn()
+        tempi.append((time.perf_counter() - t0) / numero)
+    return min(tempi), float(np.median(tempi)), numero
+
+def sessione_parametri(k, seed):
+    # Due CSV Parametro/Valore con k parametri, come quelli di rep.py
+    rng = np.random.default_rng(seed)
+    nomi = [f"Parametro {i}" for i in range(k)]
+    return [pd.DataFrame({'Parametro': nomi, 'Valore': [f"{v:.2f}" for v in rng.normal(100, 10, k)]})
+            for _ in range(2)]
+
+def prepara(n, cartella):
+    # Tracciati di n campioni: almeno 3 s (un salto), 1 kHz appena la durata lo consente
+    durata = max(n / 1000, 3.0)
+    fs = n / durata
+    raw = cmj_trace(fs=fs, durata=durata, n_salti=max(int(durata // 5), 1), massa=MASSA)
+    cmj_path = os.path.join(cartella, f"cmj_{n}.txt")
+    write_capture(raw, cmj_path)
+    hop = hop_trace(fs=fs, n_balzi=max(int((durata - 2) / 0.5), 3), massa=MASSA, stazione=1.0)
+    hop_path = os.path.join(cartella, f"hop_{n}.txt")
+    write_capture(hop, hop_path)
+
+    df = analysis.preprocess(raw, 50, 40)
+    cmj = analysis.analyze_cmj_force(df, massa=MASSA, durata_min=0.2)
+    ecc, conc = analysis.auto_phases(cmj)
+    return {'raw': raw, 'cmj_path': cmj_path, 'hop_path': hop_path, 'n_hop': len(hop), 'df': df,
+            'cmj': cmj, 'ecc': ecc, 'conc': conc, 'sessioni': sessione_parametri(max(n // 100, 10), n)}
+
+def casi(d, cartella):
+    # stadio -> (funzione, campioni in ingresso)
+    cmj, df = d['cmj'], d['df']
+    pdf, csv = os.path.join(cartella, "report.pdf"), os.path.join(cartella, "report.csv")
+    analysis.load_pedana(d['cmj_path'])   # scrive la cache binaria
+    return {
+        "load_pedana": (lambda: analysis.load_pedana(d['cmj_path'], use_cache=False), len(d['raw'])),
+        "load_pedana_cache": (lambda: analysis.load_pedana(d['cmj_path']), len(d['raw'])),
+        "preprocess": (lambda: analysis.preprocess(d['raw'], 50, 40), len(d['raw'])),
+        "detect_flight_phase": (lambda: analysis.detect_flight_phase(df, 5, 0.2), len(df)),
+        "analyze_cmj_force": (lambda: analysis.analyze_cmj_force(df, massa=MASSA, durata_min=0.2), len(df)),
+        "compute_kinematics": (lambda: analysis.compute_kinematics(cmj['df'], d['ecc'], d['conc'], cmj['takeoff_idx']),
+                               len(df)),
+        "calculate_stiffness_metrics": (lambda: performance.calculate_stiffness_metrics(d['hop_path'], MASSA),
+                                        d['n_hop']),
+        "get_merged_df": (lambda: comparison.merge_sessions(d['sessioni']), len(d['sessioni'][0])),
+        "write_report": (lambda: analysis.write_report(pdf, csv, cmj, 5, d['ecc'], d['conc'], MASSA), len(df)),
+    }
+
+def commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RADICE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "sconosciuto"
+
+def confronta(attuali, path):
+    # Rapporto tempo attuale / tempo del file indicato per ogni stadio e dimensione in comune
+    with open(path, encoding="utf-8") as f:
+        prima = json.load(f)
+    rif = {(r['stadio'], r['n']): r['secondi'] for r in prima['risultati']}
+    print(f"\nRispetto a {prima['commit']} ({os.path.basename(path)}): >1 più lento")
+    for r in attuali['risultati']:
+        t = rif.get((r['stadio'], r['n']))
+        if t:
+            print(f"  {r['stadio']:<28} {r['n']:>9}  {r['secondi'] / t:6.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e3, 1e4, 1e5, 1e6, 1e7])
+    parser.add_argument("--stadi", nargs="+", choices=STADI, default=STADI)
+    parser.add_argument("--ripetizioni", type=int, default=3)
+    parser.add_argument("--minimo", type=float, default=0.2, help="secondi minimi per ripetizione")
+    parser.add_argument("--out", help="file JSON (default benchmarks/risultati/<commit>.json)")
+    parser.add_argument("--confronta", help="JSON di un'esecuzione precedente")
+    args = parser.parse_args()
+
+    risultati = {
+        "commit": commit(), "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+        "cpu": os.cpu_count(), "risultati": [],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (int(s) for s in args.sizes):
+            d = prepara(n, tmp)
+            stadi = casi(d, tmp)
+            for stadio in args.stadi:
+                fn, campioni = stadi[stadio]
+                t_min, t_med, numero = cronometra(fn, args.ripetizioni, args.minimo)
+                risultati["risultati"].append({"stadio": stadio, "n": n, "campioni": campioni, "secondi": t_min,
+                                               "mediana": t_med, "chiamate": numero})
+                print(f"{stadio:<28} {n:>9}  {t_min * 1000:10.2f} ms  ({campioni / t_min / 1e6:8.2f} M campioni/s)")
+            del d, stadi
+
+    out = args.out or os.path.join(RADICE, "benchmarks", "risultati", f"{risultati['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(risultati, f, indent=2)
+    print(f"Risultati: {out}")
+    if args.confronta:
+        confronta(risultati, args.confronta)
+
+if __name__ == "__main__":
+    main()
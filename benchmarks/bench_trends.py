@@ -0,0 +1,58 @@
+# Motore di andamento: atleti × sessioni × parametri in formato lungo, contro il calcolo
+# per serie con groupby + rolling (una funzione Python per ogni atleta e parametro).
+#   python benchmarks/bench_trends.py [--atleti 300] [--sessioni 30] [--parametri 20]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vita_core.trends import trend_matrix, trend_table
+
+def dati(atleti, sessioni, parametri, seed=0):
+    rng = np.random.default_rng(seed)
+    n = atleti * sessioni * parametri
+    return pd.DataFrame({
+        'atleta': np.repeat([f"A{a:04d}" for a in range(atleti)], sessioni * parametri),
+        'data': np.tile(np.repeat(pd.date_range('2025-01-01', periods=sessioni, freq='W'), parametri), atleti),
+        'parametro': np.tile([f"P{p:02d}" for p in range(parametri)], atleti * sessioni),
+        'valore': rng.normal(30, 3, n),
+    }).sample(frac=1, random_state=seed, ignore_index=True)
+
+def per_serie(lungo, finestra=3):
+    df = lungo.sort_values(['atleta', 'parametro', 'data'], ignore_index=True)
+    g = df.groupby(['atleta', 'parametro'])['valore']
+    df['baseline'] = g.transform(lambda s: s.shift().rolling(finestra).mean())
+    df['SWC'] = 0.2 * g.transform(lambda s: s.shift().rolling(finestra).std())
+    return df
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--atleti", type=int, default=300)
+    parser.add_argument("--sessioni", type=int, default=30)
+    parser.add_argument("--parametri", type=int, default=20)
+    args = parser.parse_args()
+    lungo = dati(args.atleti, args.sessioni, args.parametri)
+
+    t0 = time.perf_counter()
+    tab = trend_table(lungo)
+    t_tab = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    m = trend_matrix(tab)
+    t_piv = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    ref = per_serie(lungo)
+    t_ref = time.perf_counter() - t0
+
+    diff = np.nanmax(np.abs(ref['baseline'].to_numpy() - tab['baseline'].to_numpy()))
+    print(f"{len(lungo)} righe ({args.atleti} atleti x {args.sessioni} sessioni x {args.parametri} parametri)")
+    print(f"trend_table   {t_tab*1000:>9.1f} ms")
+    print(f"trend_matrix  {t_piv*1000:>9.1f} ms  {m.shape}")
+    print(f"per serie     {t_ref*1000:>9.1f} ms  ({t_ref / t_tab:.0f}x), differenza baseline max {diff:.1e}")
+
+if __name__ == "__main__":
+    main()
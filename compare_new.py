@@ -1,12 +1,17 @@
+import argparse
+import sys
+
 import pandas as pd
 import tkinter as tk
-from tkinter import filedialog, Label, Button, Text, Frame
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.backends.backend_pdf import PdfPages
+from tkinter import filedialog, simpledialog, Label, Button, Text, Frame
 import os
 import numpy as np
 
+from vita_core import profiling
+from vita_core.comparison import find_pairs, merge_sessions, read_pairs_manifest, run_team, write_comparison_pdf
+from vita_core.store import ResultsStore
+from vita_core.trends import load_sessions, render_trend_report, trend_matrix, trend_table
+
 # ============================
 # LOGICA DATI
 # ============================
@@ -27,13 +32,53 @@ def load_csv(pre_or_post):
         post_label.config(text=f"Post: {os.path.basename(file_path)}")
     update_preview()
 
-def get_merged_df():
-    if pre_data is None or post_data is None: return None
-    merged = pd.merge(pre_data, post_data, on='Parametro', suffixes=('_Pre', '_Post'))
-    for col in ['Valore_Pre', 'Valore_Post']:
-        merged[col] = pd.to_numeric(merged[col].astype(str).str.replace('%', '').str.strip(), errors='coerce')
-    merged['Diff %'] = ((merged['Valore_Post'] - merged['Valore_Pre']) / merged['Valore_Pre']) * 100
-    return merged
+def get_merged_df(sessioni=None):
+    # Default: Pre e Post caricati nella GUI (calcolo in vita_core.comparison.merge_sessions)
+    if sessioni is None:
+        if pre_data is None or post_data is None: return None
+        sessioni = [pre_data, post_data]
+    return merge_sessions(sessioni)
+
+# ============================
+# ANDAMENTO SU PIÙ SESSIONI
+# ============================
+trend_data = None
+
+def load_sessions_csv():
+    # Più CSV dello stesso atleta, in ordine di data di modifica
+    global trend_data
+    paths = filedialog.askopenfilenames(filetypes=[("CSV files","*.csv")])
+    if not paths: return
+    paths = sorted(paths, key=os.path.getmtime)
+    atleta = simpledialog.askstring("Atleta", "Nome atleta:", initialvalue="Atleta") or "Atleta"
+    trend_data = trend_table(load_sessions(paths, atleta=[atleta] * len(paths),
+                                           date=[pd.Timestamp(os.path.getmtime(p), unit='s') for p in paths]))
+    update_trend_preview()
+
+def load_sessions_store():
+    # Tutte le sessioni di un atleta (o di tutti, se il nome è vuoto) dall'archivio risultati
+    global trend_data
+    atleta = simpledialog.askstring("Archivio", "Atleta (vuoto = tutti):")
+    if atleta is None: return
+    with ResultsStore() as store:
+        lungo = store.history(atleta=atleta.strip() or None)
+    if lungo.empty:
+        preview_text.delete("1.0", "end"); preview_text.insert("end", "Nessuna sessione in archivio")
+        return
+    trend_data = trend_table(lungo)
+    update_trend_preview()
+
+def update_trend_preview():
+    preview_text.delete("1.0", "end")
+    m = trend_matrix(trend_data)
+    preview_text.insert("end", f"{trend_data['atleta'].nunique()} atleti, fino a {m.shape[1]} sessioni\n")
+    preview_text.insert("end", m.round(2).to_string())
+
+def export_trend_pdf():
+    if trend_data is None: return
+    path = filedialog.asksaveasfilename(defaultextension=".pdf", initialfile="Andamento_Sessioni.pdf")
+    if not path: return
+    render_trend_report(path, trend_data)
 
 def update_preview():
     preview_text.delete("1.0", "end")
@@ -43,6 +88,8 @@ def update_preview():
         plot_comparison_gui(df)
 
 def plot_comparison_gui(df):
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
     for widget in canvas_frame.winfo_children(): widget.destroy()
     fig, ax = plt.subplots(figsize=(10, 4), dpi=80)
     x = np.arange(len(df['Parametro']))
@@ -63,78 +110,53 @@ def export_pdf():
     if df is None: return
     path = filedialog.asksaveasfilename(defaultextension=".pdf", initialfile="Analisi_Evolutiva_Magistrale.pdf")
     if not path: return
+    write_comparison_pdf(path, df)
+
+# ============================
+# REPORT DI SQUADRA SENZA GUI
+# ============================
+# Coppie pre/post, PDF per atleta e PDF unico in vita_core.comparison; qui solo la riga di comando.
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report pre/post di tutta la squadra, senza GUI")
+    sorgente = parser.add_mutually_exclusive_group(required=True)
+    sorgente.add_argument("--cartella", help="cartella con ATLETA_pre.csv / ATLETA_post.csv")
+    sorgente.add_argument("--manifest", help="CSV con colonne Atleta, Pre, Post")
+    parser.add_argument("--out", default="confronti", help="cartella dei PDF per atleta")
+    parser.add_argument("--unito", help="PDF unico di squadra (es. squadra.pdf); più veloce con pypdf installato")
+    parser.add_argument("--workers", type=int, default=None, help="processi paralleli (default: CPU)")
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
 
-    with PdfPages(path) as pdf:
-        # --- PAGINA 1: TABELLA E CONFRONTO ALTEZZE ---
-        fig1, (ax_t, ax_h) = plt.subplots(2, 1, figsize=(8.5, 11), gridspec_kw={'height_ratios': [0.7, 1.3]})
-        ax_t.axis('off')
-        vals = df[['Parametro', 'Valore_Pre', 'Valore_Post', 'Diff %']].round(2).values
-        table = ax_t.table(cellText=vals, colLabels=["Parametro", "Pre", "Post", "Var %"], loc='center', cellLoc='center')
-        table.auto_set_font_size(False); table.set_fontsize(10); table.scale(1, 2)
-        ax_t.set_title("SINTESI COMPARATIVA", fontsize=14, fontweight='bold', pad=20)
-
-        # Solo Altezze
-        h_df = df[df['Parametro'].str.contains('Altezza', case=False)]
-        x_h = np.arange(len(h_df))
-        ax_h.bar(x_h - 0.17, h_df['Valore_Pre'], 0.35, label='Iniziale (Pre)', color="#30E91F", edgecolor='black')
-        ax_h.bar(x_h + 0.17, h_df['Valore_Post'], 0.35, label='Finale (Post)', color='#CE44B7', edgecolor='black')
-        ax_h.set_xticks(x_h); ax_h.set_xticklabels(h_df['Parametro'])
-        ax_h.set_ylabel("Centimetri (cm)"); ax_h.legend(); ax_h.grid(axis='y', alpha=0.3)
-        ax_h.set_title("EVOLUZIONE ALTEZZE DI SALTO", fontsize=12, fontweight='bold')
-        
-        fig1.tight_layout(pad=4.0); pdf.savefig(); plt.close()
-
-        # --- PAGINA 2: CONFRONTO INDICI (EUR, RSI, STIFFNESS) ---
-        fig2, ax_i = plt.subplots(figsize=(8.5, 6))
-        i_df = df[~df['Parametro'].str.contains('Altezza', case=False)]
-        x_i = np.arange(len(i_df))
-        ax_i.bar(x_i - 0.17, i_df['Valore_Pre'], 0.35, label='Pre', color="#30E91F", alpha=0.7, edgecolor='black')
-        ax_i.bar(x_i + 0.17, i_df['Valore_Post'], 0.35, label='Post', color="#CE44B7", alpha=0.7, edgecolor='black')
-        ax_i.set_xticks(x_i); ax_i.set_xticklabels(i_df['Parametro'], rotation=15)
-        ax_i.set_title("INDICI NEUROMUSCOLARI E REATTIVITÀ", fontsize=12, fontweight='bold')
-        ax_i.legend(); ax_i.grid(axis='y', alpha=0.3)
-        
-        fig2.tight_layout(pad=4.0); pdf.savefig(); plt.close()
-
-        # --- PAGINA 3: VARIAZIONE PERCENTUALE (IMPATTO VISIVO) ---
-        fig3, ax3 = plt.subplots(figsize=(8.5, 8))
-        colors = ['#4CAF50' if v >= 0 else "#AA1949" for v in df['Diff %']]
-        bars = ax3.barh(df['Parametro'], df['Diff %'], color=colors, edgecolor='black', height=0.6)
-        
-        # Linea centrale sullo 0
-        ax3.axvline(0, color='black', linewidth=1.5)
-        
-        # Imposta limite fisso a +/- 100 per impatto grafico
-        limit = max(100, df['Diff %'].abs().max() + 20)
-        ax3.set_xlim(-limit, limit)
-        
-        ax3.set_title("VARIAZIONE PERCENTUALE DELLE PERFORMANCE (%)", fontsize=14, fontweight='bold', pad=20)
-        
-        # Label dentro le barre
-        for bar in bars:
-            width = bar.get_width()
-            # Posiziona il testo: se la barra è piccola lo mette fuori, se grande lo mette dentro
-            x_pos = width/2 if abs(width) > limit/4 else (width + (5 if width > 0 else -15))
-            ax3.text(x_pos, bar.get_y() + bar.get_height()/2, f'{width:+.1f}%', 
-                     va='center', ha='center', fontweight='bold', 
-                     color='white' if abs(width) > limit/4 else 'black')
-
-        ax3.grid(axis='x', linestyle='--', alpha=0.4)
-        ax3.invert_yaxis() # Parametri dall'alto verso il basso
-        
-        fig3.tight_layout(pad=4.0); pdf.savefig(); plt.close()
+    coppie = find_pairs(args.cartella) if args.cartella else read_pairs_manifest(args.manifest)
+    if not coppie:
+        parser.error("nessuna coppia pre/post trovata")
+    profilo = profiling.from_args(args)
+    _, errori = run_team(coppie, args.out, args.workers, args.unito)
+    profiling.finish(profilo, args)
+    return 1 if errori else 0
 
 # ============================
 # GUI TKINTER
 # ============================
-root = tk.Tk()
-root.title("Analisi Performance Andrea - Magistrale")
-frame_btns = Frame(root); frame_btns.pack(pady=10)
-Button(frame_btns, text="1. Carica Report PRE", command=lambda: load_csv("pre"), width=25).grid(row=0, column=0, padx=5)
-pre_label = Label(frame_btns, text="Nessun file Pre"); pre_label.grid(row=0, column=1, sticky='w')
-Button(frame_btns, text="2. Carica Report POST", command=lambda: load_csv("post"), width=25).grid(row=1, column=0, padx=5)
-post_label = Label(frame_btns, text="Nessun file Post"); post_label.grid(row=1, column=1, sticky='w')
-Button(root, text="GENERA PDF COMPARATIVO PRO", command=export_pdf, bg="#2196F3", fg="white", font=('Arial', 10, 'bold')).pack(pady=10)
-preview_text = Text(root, height=8, width=80, font=('Consolas', 9)); preview_text.pack(padx=10)
-canvas_frame = Frame(root); canvas_frame.pack(fill="both", expand=True, padx=10, pady=10)
-root.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Modalità squadra: python compare_new.py --cartella DATI --out confronti --unito squadra.pdf
+        import matplotlib
+        matplotlib.use("Agg")
+        raise SystemExit(main())
+    root = tk.Tk()
+    root.title("Analisi Performance Andrea - Magistrale")
+    frame_btns = Frame(root); frame_btns.pack(pady=10)
+    Button(frame_btns, text="1. Carica Report PRE", command=lambda: load_csv("pre"), width=25).grid(row=0, column=0, padx=5)
+    pre_label = Label(frame_btns, text="Nessun file Pre"); pre_label.grid(row=0, column=1, sticky='w')
+    Button(frame_btns, text="2. Carica Report POST", command=lambda: load_csv("post"), width=25).grid(row=1, column=0, padx=5)
+    post_label = Label(frame_btns, text="Nessun file Post"); post_label.grid(row=1, column=1, sticky='w')
+    Button(root, text="GENERA PDF COMPARATIVO PRO", command=export_pdf, bg="#2196F3", fg="white", font=('Arial', 10, 'bold')).pack(pady=10)
+    frame_trend = Frame(root); frame_trend.pack(pady=5)
+    Button(frame_trend, text="Andamento: carica N report", command=load_sessions_csv, width=25).grid(row=0, column=0, padx=5)
+    Button(frame_trend, text="Andamento: da archivio", command=load_sessions_store, width=25).grid(row=0, column=1, padx=5)
+    Button(frame_trend, text="PDF ANDAMENTO", command=export_trend_pdf, width=25).grid(row=0, column=2, padx=5)
+    preview_text = Text(root, height=8, width=80, font=('Consolas', 9)); preview_text.pack(padx=10)
+    canvas_frame = Frame(root); canvas_frame.pack(fill="both", expand=True, padx=10, pady=10)
+    root.mainloop()
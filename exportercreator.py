@@ -1,7 +1,13 @@
-import pandas as pd
 import tkinter as tk
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, ttk
+import argparse
 import os
+import queue
+import sys
+import threading
+import time
+
+from vita_core.excel import convert_workbook
 
 def select_file():
     file_path = filedialog.askopenfilename(
@@ -27,35 +33,92 @@ def export_csv():
         messagebox.showerror("Errore", "Seleziona una cartella di destinazione valida.")
         return
 
+    # Conversione in un thread (fogli in processi paralleli): la finestra resta attiva
+    # e l'avanzamento arriva dalla coda letta da poll_progress.
+    export_button.config(state="disabled")
+    progress.config(value=0)
+    status_label.config(text="Lettura dei fogli...")
+    binario = binario_var.get()
+
+    def lavoro():
+        try:
+            esiti = convert_workbook(excel_file, output_folder, binario=binario,
+                                     progress=lambda *stato: progress_queue.put(('foglio',) + stato))
+            progress_queue.put(('fine', esiti))
+        except Exception as e:
+            progress_queue.put(('errore', e))
+    threading.Thread(target=lavoro, daemon=True).start()
+
+def poll_progress():
     try:
-        # Legge tutti i fogli in un dizionario {nome_foglio: DataFrame}
-        all_sheets = pd.read_excel(excel_file, sheet_name=None, usecols="A:C")
-        
-        for sheet_name, df in all_sheets.items():
-            csv_filename = os.path.join(output_folder, f"{sheet_name}.csv")
-            df.to_csv(csv_filename, index=False, sep=",")
-        
-        messagebox.showinfo("Successo", "Esportazione completata!")
-    except Exception as e:
-        messagebox.showerror("Errore", f"Qualcosa è andato storto:\n{e}")
-
-# Creazione GUI
-root = tk.Tk()
-root.title("Excel → CSV per foglio")
-
-# File selection
-tk.Label(root, text="File Excel:").grid(row=0, column=0, sticky="e")
-entry_file = tk.Entry(root, width=50)
-entry_file.grid(row=0, column=1)
-tk.Button(root, text="Sfoglia", command=select_file).grid(row=0, column=2)
-
-# Folder selection
-tk.Label(root, text="Cartella di destinazione:").grid(row=1, column=0, sticky="e")
-entry_folder = tk.Entry(root, width=50)
-entry_folder.grid(row=1, column=1)
-tk.Button(root, text="Sfoglia", command=select_folder).grid(row=1, column=2)
-
-# Export button
-tk.Button(root, text="Esporta CSV", command=export_csv, bg="green", fg="white").grid(row=2, column=1, pady=10)
-
-root.mainloop()
\ No newline at end of file
+        while True:
+            evento = progress_queue.get_nowait()
+            if evento[0] == 'foglio':
+                _, fatti, totale, esito = evento
+                progress.config(maximum=totale, value=fatti)
+                status_label.config(text=f"{esito['foglio']}: {esito['righe']} righe ({fatti}/{totale})")
+            else:
+                export_button.config(state="normal")
+                if evento[0] == 'fine':
+                    messagebox.showinfo("Successo", f"Esportazione completata! ({len(evento[1])} fogli)")
+                else:
+                    messagebox.showerror("Errore", f"Qualcosa è andato storto:\n{evento[1]}")
+    except queue.Empty:
+        pass
+    root.after(100, poll_progress)
+
+def main(argv=None):
+    # Senza GUI: python exportercreator.py cartella.xlsx destinazione [--binario] [--workers N]
+    parser = argparse.ArgumentParser(description="Excel -> CSV per foglio")
+    parser.add_argument("excel")
+    parser.add_argument("cartella")
+    parser.add_argument("--binario", action="store_true", help="scrive anche la cache .npy letta da load_capture")
+    parser.add_argument("--workers", type=int, default=None, help="processi paralleli (default: CPU)")
+    args = parser.parse_args(argv)
+
+    def stampa(fatti, totale, esito):
+        print(f"[{fatti}/{totale}] {esito['foglio']}: {esito['righe']} righe in {esito['secondi']:.2f} s")
+    t0 = time.perf_counter()
+    esiti = convert_workbook(args.excel, args.cartella, workers=args.workers, binario=args.binario, progress=stampa)
+    durata = time.perf_counter() - t0
+    righe = sum(e['righe'] for e in esiti)
+    print(f"{len(esiti)} fogli, {righe} righe in {durata:.2f} s ({righe / durata if durata > 0 else 0:.0f} righe/s)")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main()
+        raise SystemExit
+
+    # Creazione GUI
+    root = tk.Tk()
+    root.title("Excel → CSV per foglio")
+
+    # File selection
+    tk.Label(root, text="File Excel:").grid(row=0, column=0, sticky="e")
+    entry_file = tk.Entry(root, width=50)
+    entry_file.grid(row=0, column=1)
+    tk.Button(root, text="Sfoglia", command=select_file).grid(row=0, column=2)
+
+    # Folder selection
+    tk.Label(root, text="Cartella di destinazione:").grid(row=1, column=0, sticky="e")
+    entry_folder = tk.Entry(root, width=50)
+    entry_folder.grid(row=1, column=1)
+    tk.Button(root, text="Sfoglia", command=select_folder).grid(row=1, column=2)
+
+    # Cache binaria per le analisi (vita_core.ingest)
+    binario_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(root, text="Scrivi anche la cache binaria per le analisi", variable=binario_var).grid(row=2, column=1, sticky="w")
+
+    # Export button
+    export_button = tk.Button(root, text="Esporta CSV", command=export_csv, bg="green", fg="white")
+    export_button.grid(row=3, column=1, pady=10)
+
+    # Avanzamento per foglio
+    progress = ttk.Progressbar(root, mode="determinate", length=300)
+    progress.grid(row=4, column=1, pady=5)
+    status_label = tk.Label(root, text="")
+    status_label.grid(row=5, column=0, columnspan=3)
+    progress_queue = queue.Queue()
+    root.after(100, poll_progress)
+
+    root.mainloop()
@@ -1,61 +1,15 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
 from tkinter import Tk, Label, Entry, Button, filedialog, Text, Frame
-from matplotlib.backends.backend_pdf import PdfPages
 import os
+import queue
+import threading
 
-# ============================
-# LOGICA CALCOLI ROBUSTA
-# ============================
-
-def get_eur(sj_csv, cmj_csv):
-    try:
-        df_sj = pd.read_csv(sj_csv)
-        df_cmj = pd.read_csv(cmj_csv)
-        h_sj = float(df_sj[df_sj.iloc[:, 0].str.contains('Altezza', na=False)].iloc[0, 1])
-        h_cmj = float(df_cmj[df_cmj.iloc[:, 0].str.contains('Altezza', na=False)].iloc[0, 1])
-        return h_sj, h_cmj, h_cmj / h_sj
-    except Exception as e:
-        print(f"Errore lettura EUR: {e}")
-        return None
-
-def calculate_stiffness_metrics(file_path, massa, soglia=20):
-    try:
-        df = pd.read_csv(file_path, sep=",", header=None, comment="#").iloc[:, :3]
-        df.columns = ["time", "sx", "dx"]
-        
-        # Calcolo automatico OFFSET basato sui primi campioni del file
-        offset_sx = df['sx'].iloc[:20].mean()
-        offset_dx = df['dx'].iloc[:20].mean()
-        
-        df['sx_cor'] = (df['sx'] - offset_sx).clip(lower=0)
-        df['dx_cor'] = (df['dx'] - offset_dx).clip(lower=0)
-        df['forza'] = (df['sx_cor'] + df['dx_cor']).rolling(5).mean()
-        df['time_s'] = df['time'] / 1000
-        
-        is_contact = df['forza'] > soglia
-        diff = is_contact.astype(int).diff().fillna(0)
-        
-        starts = df.loc[diff == 1, 'time_s'].values
-        ends = df.loc[diff == -1, 'time_s'].values
-        
-        if len(starts) < 3: return None
-        if ends[0] < starts[0]: ends = ends[1:]
-        n = min(len(starts), len(ends))
-        
-        tc = np.mean(ends[:n] - starts[:n])
-        tv = np.mean(starts[1:n] - ends[:n-1])
-        rsi = tv / tc
-        k_vert = (massa * np.pi * tv) / (tc**2 * (tv + tc))
-        
-        return tc, tv, rsi, k_vert
-    except Exception as e:
-        print(f"Errore Stiffness: {e}")
-    return None
+# Calcoli e report in vita_core.performance (riesportati qui: new.get_eur, ...)
+from vita_core.performance import (get_eur, calculate_stiffness_metrics, performance_values,
+                                   performance_rows, write_performance_report)
+from vita_core.store import save_session
 
 # ============================
-# INTERFACCIA E EXPORT PDF + CSV
+# INTERFACCIA
 # ============================
 
 class PerformanceApp:
@@ -66,14 +20,21 @@ class PerformanceApp:
         Label(root, text="Massa Atleta (kg):", font=('Arial', 10, 'bold')).grid(row=0, column=0, pady=10)
         self.massa_entry = Entry(root); self.massa_entry.insert(0, "75")
         self.massa_entry.grid(row=0, column=1)
+        Label(root, text="Atleta:", font=('Arial', 10, 'bold')).grid(row=1, column=0, pady=5)
+        self.atleta_entry = Entry(root)
+        self.atleta_entry.grid(row=1, column=1)
+
+        Button(root, text="1. CARICA SJ + CMJ (Profilo EUR)", command=self.run_eur, width=40, bg="#e1f5fe").grid(row=2, columnspan=2, pady=5)
+        Button(root, text="2. CARICA BALZELLI (Stiffness)", command=self.run_stiffness, width=40, bg="#e8f5e9").grid(row=3, columnspan=2, pady=5)
+        Button(root, text="3. GENERA REPORT FINALE (PDF + CSV)", command=self.export_final, width=40, bg="#ffcc80", font=('Arial', 10, 'bold')).grid(row=4, columnspan=2, pady=20)
 
-        Button(root, text="1. CARICA SJ + CMJ (Profilo EUR)", command=self.run_eur, width=40, bg="#e1f5fe").grid(row=1, columnspan=2, pady=5)
-        Button(root, text="2. CARICA BALZELLI (Stiffness)", command=self.run_stiffness, width=40, bg="#e8f5e9").grid(row=2, columnspan=2, pady=5)
-        Button(root, text="3. GENERA REPORT FINALE (PDF + CSV)", command=self.export_final, width=40, bg="#ffcc80", font=('Arial', 10, 'bold')).grid(row=3, columnspan=2, pady=20)
+        Button(root, text="4. ROSTER SQUADRA (manifest)", command=self.run_roster, width=40, bg="#ede7f6").grid(row=5, columnspan=2, pady=5)
 
         self.txt = Text(root, height=10, width=60, font=('Consolas', 9))
-        self.txt.grid(row=4, column=0, columnspan=2, padx=10, pady=10)
+        self.txt.grid(row=6, column=0, columnspan=2, padx=10, pady=10)
         self.results = {}
+        self.log_queue = queue.Queue()
+        self.root.after(100, self.poll_log)
 
     def run_eur(self):
         f_sj = filedialog.askopenfilename(title="Seleziona CSV Squat Jump")
@@ -103,32 +64,42 @@ class PerformanceApp:
         path_base = filedialog.asksaveasfilename(defaultextension=".pdf", initialfile="Report_Performance.pdf")
         if not path_base: return
         
-        # --- PREPARAZIONE DATI PER CSV (struttura compatibile con compare.py) ---
-        csv_data = []
-        if 'eur' in self.results:
-            csv_data.append(["Altezza SJ (cm)", f"{self.results['eur']['sj']:.1f}"])
-            csv_data.append(["Altezza CMJ (cm)", f"{self.results['eur']['cmj']:.1f}"])
-            csv_data.append(["EUR (Efficienza)", f"{self.results['eur']['eur']:.2f}"])
-        if 'stiff' in self.results:
-            csv_data.append(["RSI (Reattivita)", f"{self.results['stiff']['rsi']:.2f}"])
-            csv_data.append(["Vertical Stiffness (kN/m)", f"{self.results['stiff']['kv']/1000:.2f}"])
-            csv_data.append(["T. Contatto (s)", f"{self.results['stiff']['tc']:.3f}"])
-        
-        # --- EXPORT CSV ---
-        csv_path = path_base.replace(".pdf", ".csv")
-        df_csv = pd.DataFrame(csv_data, columns=["Parametro", "Valore"])
-        df_csv.to_csv(csv_path, index=False)
-
-        # --- EXPORT PDF ---
-        with PdfPages(path_base) as pdf:
-            fig, ax = plt.subplots(figsize=(8.5, 11))
-            ax.axis('off')
-            table = ax.table(cellText=csv_data, colLabels=["Parametro", "Valore"], loc='center', cellLoc='left')
-            table.set_fontsize(12); table.scale(1.2, 2.5)
-            plt.title("VALUTAZIONE NEUROMUSCOLARE", fontsize=16, fontweight='bold', pad=30)
-            pdf.savefig(); plt.close()
-        
+        csv_path = write_performance_report(path_base, self.results)
+        # Archivio storico: valori numerici, non le stringhe del CSV
+        try:
+            massa = float(self.massa_entry.get())
+        except ValueError:
+            massa = None
+        atleta = self.atleta_entry.get().strip() or os.path.splitext(os.path.basename(path_base))[0]
+        save_session(atleta, "PERFORMANCE", {p: v for p, v, _ in performance_values(self.results)},
+                     sorgente=os.path.abspath(path_base), massa=massa)
         self.txt.insert("end", f"\n*** EXPORT COMPLETATO ***\nPDF: {os.path.basename(path_base)}\nCSV: {os.path.basename(csv_path)}\n")
 
+    def run_roster(self):
+        # Tutta la squadra da un manifest (vedi roster.py), in un thread per non bloccare la finestra
+        manifest = filedialog.askopenfilename(title="Seleziona manifest squadra",
+                                              filetypes=[("Manifest", "*.csv;*.xlsx")])
+        if not manifest: return
+        out_dir = filedialog.askdirectory(title="Cartella report squadra")
+        if not out_dir: return
+        import roster
+        self.txt.insert("end", f"> ROSTER: {os.path.basename(manifest)}\n")
+        def lavoro():
+            try:
+                roster.run_roster(roster.read_manifest(manifest), out_dir, log=self.log_queue.put)
+            except Exception as e:
+                self.log_queue.put(f"[ERRORE] Roster: {type(e).__name__}: {e}")
+        threading.Thread(target=lavoro, daemon=True).start()
+
+    def poll_log(self):
+        while True:
+            try:
+                riga = self.log_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.txt.insert("end", riga + "\n")
+            self.txt.see("end")
+        self.root.after(100, self.poll_log)
+
 if __name__ == "__main__":
     root = Tk(); app = PerformanceApp(root); root.mainloop()
\ No newline at end of file
@@ -1,10 +1,21 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from tkinter import Tk, Label, Entry, Button, filedialog, Text, Frame
-from matplotlib.backends.backend_pdf import PdfPages
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from tkinter import Tk, Label, Entry, Button, filedialog, Text, Frame, ttk
+import datetime
 import os
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Calcolo in vita_core.analysis (nessuna GUI, matplotlib solo per i report): i nomi restano
+# disponibili come rep.load_pedana, rep.analyze_cmj_force, ... per script e batch esistenti.
+from vita_core.analysis import (AUTO, g, pipeline_cache, load_pedana, preprocess, detect_flight_phase,
+                                resolve_massa, analyze_cmj_force, run_pipeline, compute_kinematics,
+                                auto_phases, numero_o_auto, write_report)
+from vita_core.excel import expand_trials
+from vita_core.ingest import split_trial, trial_name
+from vita_core.session import analyze_session
+from vita_core.store import save_session
+from vita_core.phases import nearest_index
 
 # ============================
 # VARIABILI GLOBALI
@@ -15,146 +26,34 @@ soglia_volo_global = 5
 eccentric_start_idx = None
 concentric_start_idx = None
 massa_global = None
-g = 9.81  # gravità
-
-# ============================
-# FUNZIONI DI CALCOLO
-# ============================
-
-def load_pedana(file):
-    df = pd.read_csv(file, sep=",", header=None, comment="#", engine="python",
-                     skip_blank_lines=True, on_bad_lines="skip")
-    df = df.iloc[:, :3]
-    df.columns = ["time", "pedana_sinistra", "pedana_destra"]
-    return df
-
-def preprocess(df, offset_sx=0, offset_dx=0, soglia_contatto=3):
-    df = df.copy()
-    df["pedana_sinistra_cor"] = (df["pedana_sinistra"] - offset_sx).clip(lower=0)
-    df["pedana_destra_cor"]   = (df["pedana_destra"] - offset_dx).clip(lower=0)
-    df["pedana_sinistra_cor"] = df["pedana_sinistra_cor"].where(df["pedana_sinistra_cor"]>soglia_contatto, 0)
-    df["pedana_destra_cor"]   = df["pedana_destra_cor"].where(df["pedana_destra_cor"]>soglia_contatto, 0)
-    df["forza_tot"] = df["pedana_sinistra_cor"] + df["pedana_destra_cor"]
-    df['time_s'] = df['time'] / 1000  # ms -> s
-    return df
-
-def detect_flight_phase(df, soglia=5, durata_min=0.5):
-    df = df.copy()
-    df['in_volo'] = False
-    in_volo = df['forza_tot'] < soglia
-    start_idx = None
-    for i, val in enumerate(in_volo):
-        if val and start_idx is None:
-            start_idx = i
-        elif not val and start_idx is not None:
-            if df['time_s'].iloc[i-1] - df['time_s'].iloc[start_idx] >= durata_min:
-                df.loc[start_idx:i-1, 'in_volo'] = True
-            start_idx = None
-    if start_idx is not None and df['time_s'].iloc[-1] - df['time_s'].iloc[start_idx] >= durata_min:
-        df.loc[start_idx:len(df)-1, 'in_volo'] = True
-    return df
-
-def analyze_cmj_force(df, soglia_volo=5, durata_min=0.5, massa=66, finestra_media=3):
-    df = df.copy()
-    df['forza_filt'] = df['forza_tot'].rolling(finestra_media, center=True, min_periods=1).mean()
-    df = detect_flight_phase(df, soglia_volo, durata_min)
-
-    # Take-off e landing
-    volo_idx = df[df['in_volo']].index
-    takeoff_idx = volo_idx[0] if len(volo_idx) > 0 else None
-    landing_idx = volo_idx[-1] if len(volo_idx) > 0 else None
-    takeoff_time = df.loc[takeoff_idx, 'time_s'] if takeoff_idx is not None else None
-    landing_time = df.loc[landing_idx, 'time_s'] if landing_idx is not None else None
-
-    # Picco di forza totale (prima del take-off)
-    if takeoff_idx is not None:
-        Fmax = df['forza_filt'].iloc[:takeoff_idx].max()
-        idx_peak = df['forza_filt'].iloc[:takeoff_idx].idxmax()
-        peak_time = df.loc[idx_peak, 'time_s']
-    else:
-        Fmax, peak_time = df['forza_filt'].max(), df['time_s'][df['forza_filt'].idxmax()]
-
-    return {
-        'Fmax': Fmax,
-        'peak_time': peak_time,
-        'df': df,
-        'massa': massa,
-        'takeoff_idx': takeoff_idx,
-        'landing_idx': landing_idx,
-        'takeoff_time': takeoff_time,
-        'landing_time': landing_time
-    }
-
-# ============================
-# CALCOLO POTENZA CONCENTRICA
-# ============================
-
-def compute_concentric_power(df, concentric_start_idx, takeoff_idx, massa):
-    if concentric_start_idx is None or takeoff_idx is None:
-        return None, None
-
-    F_conc = df['forza_tot'].iloc[concentric_start_idx:takeoff_idx+1].values
-    time_conc = df['time_s'].iloc[concentric_start_idx:takeoff_idx+1].values /1000
-
-    if len(F_conc) <= 1:
-        return None, None
-
-    acc = (F_conc - massa*g) / massa
-    dt = np.diff(time_conc, prepend=time_conc[0])
-    vel = np.cumsum(acc * dt)
-    vel = np.maximum(vel, 0)
-    pot = F_conc * vel
-    pot_media = np.trapz(pot, time_conc) / (time_conc[-1]-time_conc[0])
-    pot_max = np.max(pot)
-
-    return pot_media, pot_max
+# Coda dei file da analizzare (thread worker) e dei risultati per la GUI
+job_queue = queue.Queue()
+result_queue = queue.Queue()
+job_generation = 0
+jobs_totali = jobs_fatti = 0
+export_pool = None
+export_futures = []
+POLL_MS = 50
+plot_controller = None
 
 # ============================
 # FUNZIONI GUI
 # ============================
 
 def update_plots(cmj, soglia_volo_val):
-    global eccentric_start_idx, concentric_start_idx
-    for widget in plot_frame.winfo_children():
-        widget.destroy()
-    df_plot = cmj['df']
-
-    fig, axes = plt.subplots(1, 2, figsize=(10,4))
-    axes[0].plot(df_plot['time'], df_plot['forza_tot'], label='Forza Totale')
-    axes[0].axhline(soglia_volo_val, color='red', linestyle='--', label='Soglia volo')
-    if cmj['takeoff_time'] is not None:
-        axes[0].axvline(cmj['takeoff_time']*1000, color='green', linestyle='--', label='Take-off')
-    if cmj['landing_time'] is not None:
-        axes[0].axvline(cmj['landing_time']*1000, color='orange', linestyle='--', label='Landing')
-    axes[0].scatter(cmj['peak_time']*1000, cmj['Fmax'], color='red', s=60, zorder=5, label='Fmax')
-    if eccentric_start_idx is not None:
-        axes[0].axvline(df_plot.iloc[eccentric_start_idx]['time'], color='purple', linestyle='--', label='Inizio eccentrica')
-    if concentric_start_idx is not None:
-        axes[0].axvline(df_plot.iloc[concentric_start_idx]['time'], color='brown', linestyle='--', label='Inizio concentrica')
-    axes[0].set_xlabel('Tempo (ms)')
-    axes[0].set_ylabel('Forza (N)')
-    axes[0].set_title('Forza Totale e volo')
-    axes[0].set_ylim(bottom=0)
-    axes[0].legend()
-
-    axes[1].plot(df_plot['time'], df_plot['pedana_sinistra_cor'], label='SX')
-    axes[1].plot(df_plot['time'], df_plot['pedana_destra_cor'], label='DX')
-    axes[1].set_xlabel('Tempo (ms)')
-    axes[1].set_ylabel('Forza (N)')
-    axes[1].set_title('Forza Pedane')
-    axes[1].set_ylim(bottom=0)
-    axes[1].legend()
-
-    fig.tight_layout()
-    canvas = FigureCanvasTkAgg(fig, master=plot_frame)
-    canvas.draw()
-    canvas.get_tk_widget().pack()
+    # Canvas creato una volta sola (vita_core.liveplot); qui si aggiornano solo i dati
+    global plot_controller
+    if plot_controller is None:
+        from vita_core.liveplot import LivePlotController   # matplotlib al primo grafico, non all'avvio
+        plot_controller = LivePlotController(plot_frame)
+    plot_controller.show(cmj, soglia_volo_val, eccentric_start_idx, concentric_start_idx)
 
 # ============================
 # SELEZIONE PUNTI
 # ============================
 
 def pick_point(title, cmj):
+    import matplotlib.pyplot as plt
     df = cmj['df']
     fig, ax = plt.subplots(figsize=(10,5))
     ax.plot(df['time'], df['forza_tot'], label='Forza Totale')
@@ -163,6 +62,8 @@ def pick_point(title, cmj):
     ax.set_ylabel('Forza (N)')
     plt.ylim(bottom=0)
     point = []
+    times = df['time'].values
+    forze = df['forza_tot'].values
 
     annot = ax.annotate("", xy=(0,0), xytext=(15,15), textcoords="offset points",
                         bbox=dict(boxstyle="round", fc="w"),
@@ -174,18 +75,16 @@ def pick_point(title, cmj):
             annot.set_visible(False)
             fig.canvas.draw_idle()
             return
-        x = event.xdata
-        idx = (np.abs(df['time'] - x)).idxmin()
-        y = df['forza_tot'].iloc[idx]
-        annot.xy = (df['time'].iloc[idx], y)
-        annot.set_text(f"Time: {df['time'].iloc[idx]:.2f} ms\nForce: {y:.1f} N")
+        idx = nearest_index(times, event.xdata)
+        y = forze[idx]
+        annot.xy = (times[idx], y)
+        annot.set_text(f"Time: {times[idx]:.2f} ms\nForce: {y:.1f} N")
         annot.set_visible(True)
         fig.canvas.draw_idle()
 
     def onclick(event):
         if event.xdata is not None:
-            idx = (np.abs(df['time'] - event.xdata)).idxmin()
-            point.append(idx)
+            point.append(nearest_index(times, event.xdata))
             plt.close('all')  # <-- chiude tutte le figure
 
     fig.canvas.mpl_connect("motion_notify_event", update_annot)
@@ -195,63 +94,169 @@ def pick_point(title, cmj):
 
 def select_eccentric():
     global eccentric_start_idx, cmj_global
+    if plot_controller is None or cmj_global is None:
+        status_label.config(text="Nessun grafico! Prima esegui un'analisi.")
+        return
     idx = pick_point("Clicca per selezionare inizio eccentrica", cmj_global)
     if idx is not None:
         eccentric_start_idx = idx
-        update_plots(cmj_global, soglia_volo_global)
+        plot_controller.set_markers(eccentric_start_idx, concentric_start_idx)
 
 def select_concentric():
     global concentric_start_idx, cmj_global
+    if plot_controller is None or cmj_global is None:
+        status_label.config(text="Nessun grafico! Prima esegui un'analisi.")
+        return
     idx = pick_point("Clicca per selezionare inizio concentrica", cmj_global)
     if idx is not None:
         concentric_start_idx = idx
-        update_plots(cmj_global, soglia_volo_global)
+        plot_controller.set_markers(eccentric_start_idx, concentric_start_idx)
 
 # ============================
 # RUN ANALYSIS
 # ============================
 
+def analysis_worker():
+    # Thread di analisi: prende i file dalla coda e restituisce i risultati alla GUI
+    # tramite result_queue. I job di una generazione annullata vengono scartati.
+    while True:
+        job = job_queue.get()
+        if job is None:
+            return
+        generazione, file_path, params = job
+        if generazione != job_generation:
+            result_queue.put(('annullato', generazione, file_path, None))
+            continue
+        result_queue.put(('inizio', generazione, file_path, None))
+        try:
+            cmj = run_pipeline(file_path, params['offset_sx'], params['offset_dx'],
+                               soglia_volo=params['soglia_volo'], durata_min=params['durata_min'],
+                               massa=params['massa'])
+            fasi = auto_phases(cmj)
+            sessione = None
+            if len(cmj['flight_intervals'][0]) > 1:
+                sessione = analyze_session(cmj['df'], soglia_volo=params['soglia_volo'],
+                                           durata_min=params['durata_min'])
+            result_queue.put(('ok', generazione, file_path, (cmj, fasi, sessione, params)))
+        except Exception as e:
+            result_queue.put(('errore', generazione, file_path, f"{type(e).__name__}: {e}"))
+
 def run_analysis():
-    global cmj_global, file_global, soglia_volo_global, massa_global
-    file_path = filedialog.askopenfilename(filetypes=[("Text/CSV files","*.txt;*.csv")])
-    if not file_path: return
+    global jobs_totali, jobs_fatti
     try:
-        offset_sx_val = float(offset_sx_entry.get())
-        offset_dx_val = float(offset_dx_entry.get())
-        soglia_volo_val = float(soglia_entry.get())
-        durata_min_val = float(durata_entry.get())
-        massa_val = float(massa_entry.get())
+        params = {
+            'offset_sx': numero_o_auto(offset_sx_entry.get()),
+            'offset_dx': numero_o_auto(offset_dx_entry.get()),
+            'soglia_volo': float(soglia_entry.get()),
+            'durata_min': float(durata_entry.get()),
+            'massa': numero_o_auto(massa_entry.get()),
+        }
     except ValueError:
-        print("Inserisci valori numerici validi!")
+        status_label.config(text="Inserisci valori numerici validi (offset e peso anche \"auto\")!")
         return
-
-    df = load_pedana(file_path)
-    df = preprocess(df, offset_sx_val, offset_dx_val)
-    cmj = analyze_cmj_force(df, soglia_volo=soglia_volo_val, durata_min=durata_min_val, massa=massa_val)
-
+    file_paths = filedialog.askopenfilenames(filetypes=[("Text/CSV/Excel files","*.txt;*.csv;*.xlsx;*.xls"),
+                                                        ("Text/CSV files","*.txt;*.csv")])
+    if not file_paths: return
+    # Cartelle Excel: ogni foglio è una prova
+    file_paths = [t for f in file_paths for t in expand_trials(f)]
+
+    if jobs_fatti >= jobs_totali:
+        jobs_totali = jobs_fatti = 0
+    for file_path in file_paths:
+        job_queue.put((job_generation, file_path, params))
+    jobs_totali += len(file_paths)
+    progress.config(maximum=jobs_totali, value=jobs_fatti)
+    status_label.config(text=f"In coda: {jobs_totali - jobs_fatti} file")
+
+def cancel_jobs():
+    # Scarta i file in coda e il risultato di quello in corso; annulla gli export non partiti.
+    global job_generation, jobs_totali, jobs_fatti
+    job_generation += 1
+    for fut in export_futures:
+        fut.cancel()
+    jobs_totali = jobs_fatti = 0
+    progress.config(value=0)
+    status_label.config(text="Operazioni annullate")
+
+def show_result(file_path, cmj, fasi, sessione, params):
+    global cmj_global, file_global, soglia_volo_global, massa_global, eccentric_start_idx, concentric_start_idx
     cmj_global = cmj
+    eccentric_start_idx, concentric_start_idx = fasi
     file_global = file_path
-    soglia_volo_global = soglia_volo_val
-    massa_global = massa_val
+    soglia_volo_global = params['soglia_volo']
+    massa_global = cmj['massa']
 
     preview_text.delete("1.0", "end")
-    preview_text.insert("end", f"File: {os.path.basename(file_path)}\n")
+    preview_text.insert("end", f"File: {trial_name(file_path)}\n")
     preview_text.insert("end", f"Fmax (N): {cmj['Fmax']:.0f}\n")
     preview_text.insert("end", f"Tempo picco forza (s): {cmj['peak_time']:.3f}\n")
-    preview_text.insert("end", f"Take-off (s): {cmj['takeoff_time']:.3f}\n")
-    preview_text.insert("end", f"Landing (s): {cmj['landing_time']:.3f}\n")
-    preview_text.insert("end", f"Massa soggetto (kg): {massa_val:.1f}\n")
-
-    if concentric_start_idx is not None and cmj_global['takeoff_idx'] is not None:
-        pot_media, pot_max = compute_concentric_power(cmj_global['df'],
-                                                      concentric_start_idx,
-                                                      cmj_global['takeoff_idx'],
-                                                      massa_global)
-        if pot_media is not None:
-            preview_text.insert("end", f"Potenza media concentrica (W): {pot_media:.1f}\n")
-            preview_text.insert("end", f"Potenza massima concentrica (W): {pot_max:.1f}\n")
-
-    update_plots(cmj, soglia_volo_val)
+    if cmj['takeoff_time'] is not None:
+        preview_text.insert("end", f"Take-off (s): {cmj['takeoff_time']:.3f}\n")
+        preview_text.insert("end", f"Landing (s): {cmj['landing_time']:.3f}\n")
+    else:
+        preview_text.insert("end", "Nessuna fase di volo rilevata\n")
+    preview_text.insert("end", f"Massa soggetto (kg): {massa_global:.1f}\n")
+    stima = cmj['df'].attrs.get('baseline')
+    if stima is not None:
+        preview_text.insert("end", f"Offset stimati SX/DX: {stima['offset_sx']:.1f} / {stima['offset_dx']:.1f} "
+                                   f"(confidenza {stima['confidence']*100:.0f}%)\n")
+
+    # Più salti nello stesso file: tabella per prova
+    if sessione is not None:
+        preview_text.insert("end", f"\nSalti rilevati: {len(sessione['salti'])}\n")
+        for _, r in sessione['salti'].iterrows():
+            preview_text.insert("end", f"  #{r['Salto']}: H {r['Altezza salto (cm)']:.1f} cm, "
+                                       f"Fmax {r['Fmax (N)']:.0f} N, tv {r['Tempo di volo (s)']:.3f} s\n")
+        riep = sessione['riepilogo'].loc['Altezza salto (cm)']
+        preview_text.insert("end", f"  Altezza best {riep['Best']:.1f} cm, media {riep['Media']:.1f} cm, CV {riep['CV (%)']:.1f}%\n")
+
+    kin = compute_kinematics(cmj_global['df'], eccentric_start_idx, concentric_start_idx, cmj_global['takeoff_idx'])
+    if kin is not None:
+        m = kin['metrics']
+        preview_text.insert("end", f"Potenza media concentrica (W): {m['mean_power']:.1f}\n")
+        preview_text.insert("end", f"Potenza massima concentrica (W): {m['peak_power']:.1f}\n")
+        preview_text.insert("end", f"Velocità al take-off (m/s): {m['takeoff_velocity']:.2f}\n")
+        preview_text.insert("end", f"RSI modificato (m/s): {m['rsi_mod']:.2f}\n")
+
+    stats = pipeline_cache.stats()
+    hit = sum(v['hit'] + v['disk'] for k, v in stats.items() if k != '_memoria')
+    miss = sum(v['miss'] for k, v in stats.items() if k != '_memoria')
+    preview_text.insert("end", f"\nCache: {hit} hit / {miss} miss\n")
+
+    update_plots(cmj, soglia_volo_global)
+
+def poll_results():
+    # Chiamata periodica dal main loop Tk: non blocca mai, legge solo ciò che è pronto.
+    global jobs_fatti
+    try:
+        while True:
+            esito, generazione, file_path, dati = result_queue.get_nowait()
+            nome = os.path.basename(file_path)
+            if generazione != job_generation:
+                continue
+            if esito == 'inizio':
+                status_label.config(text=f"Analisi di {nome} ({jobs_fatti + 1}/{jobs_totali})...")
+                continue
+            jobs_fatti += 1
+            progress.config(value=jobs_fatti)
+            if esito == 'ok':
+                show_result(file_path, *dati)
+                status_label.config(text=f"Completato {nome} ({jobs_fatti}/{jobs_totali})")
+            elif esito == 'errore':
+                status_label.config(text=f"Errore su {nome}: {dati}")
+    except queue.Empty:
+        pass
+
+    for fut in [f for f in export_futures if f.done()]:
+        export_futures.remove(fut)
+        if fut.cancelled():
+            continue
+        try:
+            pdf_file, csv_file = fut.result()
+            status_label.config(text=f"Report generato: {os.path.basename(pdf_file)}, {os.path.basename(csv_file)}")
+        except Exception as e:
+            status_label.config(text=f"Errore nell'export: {type(e).__name__}: {e}")
+    root.after(POLL_MS, poll_results)
 
 # ============================
 # EXPORT PDF/CSV
@@ -260,37 +265,10 @@ def run_analysis():
 def export_results():
     global cmj_global, file_global, soglia_volo_global, eccentric_start_idx, concentric_start_idx, massa_global
     if cmj_global is None:
-        print("Nessun dato da esportare! Prima esegui un'analisi.")
+        status_label.config(text="Nessun dato da esportare! Prima esegui un'analisi.")
         return
 
-    df = cmj_global['df']
-    base_name = os.path.splitext(os.path.basename(file_global))[0]
-
-    t_ecc = t_conc = pot_media = pot_max = None
-    if eccentric_start_idx is not None and concentric_start_idx is not None:
-        t_ecc = df['time_s'].iloc[concentric_start_idx] - df['time_s'].iloc[eccentric_start_idx]
-    if concentric_start_idx is not None and cmj_global['takeoff_idx'] is not None:
-        t_conc = df['time_s'].iloc[cmj_global['takeoff_idx']] - df['time_s'].iloc[concentric_start_idx]
-        pot_media, pot_max = compute_concentric_power(df, concentric_start_idx, cmj_global['takeoff_idx'], massa_global)
-
-    # PARAMETRI DINAMICI CONCENTRICA
-    df_conc = df.iloc[concentric_start_idx:cmj_global['takeoff_idx']+1].copy()
-    F_conc = df_conc['forza_tot'].values
-    t_conc_vec = df_conc['time_s'].values  # già in secondi
-    F_mean_conc = np.mean(F_conc)
-    # Impulso reale
-    J_conc = np.trapz(F_conc, t_conc_vec)
-    # Delta v al take-off
-    delta_v = J_conc / massa_global
-    # Impulso normalizzato
-    J_norm = J_conc / (massa_global * g)
-
-    # BILANCIAMENTO CONCENTRICO
-    df_conc = df.iloc[concentric_start_idx:cmj_global['takeoff_idx']+1].copy()
-    forza_tot_lr = df_conc['pedana_sinistra_cor'] + df_conc['pedana_destra_cor']
-    bil_conc = 100 * df_conc['pedana_destra_cor'] / forza_tot_lr.replace(0, np.nan)
-    bil_mean = bil_conc.mean()
-
+    base_name = trial_name(file_global)
     pdf_file = filedialog.asksaveasfilename(defaultextension=".pdf",
                                             filetypes=[("PDF files","*.pdf")],
                                             initialfile=f"report_{base_name}_.pdf")
@@ -299,115 +277,66 @@ def export_results():
                                             initialfile=f"report_{base_name}_.csv")
     if not pdf_file or not csv_file: return
 
-    with PdfPages(pdf_file) as pdf:
-        # Plot forza totale
-        plt.figure(figsize=(8,5))
-        plt.plot(df['time'], df['forza_tot'], label='Forza Totale')
-        plt.axhline(soglia_volo_global, color='red', linestyle='--', label='Soglia volo')
-        if cmj_global['takeoff_time'] is not None:
-            plt.axvline(cmj_global['takeoff_time']*1000, color='green', linestyle='--', label='Take-off')
-        if cmj_global['landing_time'] is not None:
-            plt.axvline(cmj_global['landing_time']*1000, color='orange', linestyle='--', label='Landing')
-        plt.scatter(cmj_global['peak_time']*1000, cmj_global['Fmax'], color='red', s=60, zorder=5, label='Fmax')
-        if eccentric_start_idx is not None:
-            plt.axvline(df.iloc[eccentric_start_idx]['time'], color='purple', linestyle='--', label='Inizio eccentrica')
-        if concentric_start_idx is not None:
-            plt.axvline(df.iloc[concentric_start_idx]['time'], color='brown', linestyle='--', label='Inizio concentrica')
-        plt.xlabel('Tempo (ms)')
-        plt.ylabel('Forza (N)')
-        plt.legend(loc='upper left')
-        plt.ylim(bottom=0)
-        pdf.savefig(); plt.close()
-
-        # Plot pedane
-        plt.figure(figsize=(8,5))
-        plt.plot(df['time'], df['pedana_sinistra_cor'], label='SX')
-        plt.plot(df['time'], df['pedana_destra_cor'], label='DX')
-        plt.xlabel('Tempo (ms)')
-        plt.ylabel('Forza (N)')
-        plt.legend(loc='upper left')
-        plt.ylim(bottom=0)
-        pdf.savefig(); plt.close()
-        t_volo = None
-        H_salto = None
-        if cmj_global['takeoff_time'] is not None and cmj_global['landing_time'] is not None:
-            t_volo = cmj_global['landing_time'] - cmj_global['takeoff_time']
-            H_salto = g * t_volo**2 / 8
-
-        # Plot bilanciamento concentrico
-        if concentric_start_idx is not None and cmj_global['takeoff_idx'] is not None:
-            plt.figure(figsize=(8,5))
-            t_rel = df_conc['time_s'] - df_conc['time_s'].iloc[0]
-            plt.plot(t_rel, bil_conc, label='Bilanciamento DX (%)')
-            plt.axhline(50, color='black', linestyle='--', linewidth=1)
-            plt.xlabel('Tempo concentrica (s)')
-            plt.ylabel('Bilanciamento (%)')
-            plt.title('Bilanciamento durante fase concentrica')
-            plt.ylim(0,100)
-            plt.legend(loc='upper left')
-            plt.grid(alpha=0.3)
-            pdf.savefig()
-            plt.close()
-
-        # Tabella
-        fig, ax = plt.subplots(figsize=(10,6))
-        ax.axis('off')
-        ax.set_title('Parametri CMJ', fontsize=18, fontweight='bold')
-        cmj_data = [
-        ['Fmax (N)', f"{cmj_global['Fmax']:.0f}"],
-        ['t concentrica (s)', f"{t_conc:.3f}" if t_conc is not None else "-"],
-        ['Tempo di volo (s)', f"{t_volo:.3f}" if t_volo is not None else "-"],
-        ['Altezza salto (cm)', f"{H_salto*100:.1f}" if H_salto is not None else "-"],
-        ['Bilanciamento medio DX (%)', f"{bil_mean:.1f}" if bil_mean is not None else "-"],
-        ['Massa soggetto (kg)', f"{massa_global:.1f}"]
-        ]
-        if t_conc is not None:
-            cmj_data.insert(2, ['Forza media concentrica (N)', f"{F_mean_conc:.0f}"])
-            cmj_data.insert(3, ['Impulso concentrico (N·s)', f"{J_conc:.1f}"])
-            cmj_data.insert(4, ['Δv al take-off (m/s)', f"{delta_v:.2f}"])
-            cmj_data.insert(5, ['Impulso / BW (s)', f"{J_norm:.2f}"])
-        if t_ecc is not None:
-            cmj_data.insert(1, ['t eccentrica (s)', f"{t_ecc:.3f}"])
-
-        table = ax.table(cellText=cmj_data, loc='center', cellLoc='center', colWidths=[0.5,0.5])
-        table.auto_set_font_size(False)
-        table.set_fontsize(14)
-        table.scale(1.5,2)
-        pdf.savefig(); plt.close()
-
-    df_csv = pd.DataFrame({'Parametro':[r[0] for r in cmj_data], 'Valore':[r[1] for r in cmj_data]})
-    df_csv.to_csv(csv_file, index=False)
-    print(f"Report PDF generato: {pdf_file}")
-    print(f"CSV generato: {csv_file}")
+    # Rendering in un processo separato: il PDF di una registrazione lunga può richiedere secondi
+    global export_pool
+    if export_pool is None:
+        export_pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    # Sessione per l'archivio storico: atleta (o nome del file) e data dell'acquisizione
+    sessione = {'atleta': atleta_entry.get().strip() or base_name, 'test': 'CMJ',
+                'data': datetime.date.fromtimestamp(os.path.getmtime(split_trial(file_global)[0])),
+                'sorgente': os.path.abspath(file_global), 'massa': massa_global}
+    export_futures.append(export_pool.submit(_export_job, pdf_file, csv_file, sessione, cmj_global,
+                                             soglia_volo_global, eccentric_start_idx, concentric_start_idx,
+                                             massa_global))
+    status_label.config(text=f"Export di {os.path.basename(pdf_file)} in corso...")
+
+def _export_job(pdf_file, csv_file, sessione, *args):
+    df_csv = write_report(pdf_file, csv_file, *args)
+    if sessione is not None:
+        save_session(valori=dict(zip(df_csv['Parametro'], df_csv['Numero'])), **sessione)
+    return pdf_file, csv_file
 
 # ============================
 # CREAZIONE GUI
 # ============================
 
-root = Tk()
-root.title("CMJ Analysis")
-
-Label(root, text="Offset pedana SX").grid(row=0, column=0)
-offset_sx_entry = Entry(root); offset_sx_entry.insert(0,"50"); offset_sx_entry.grid(row=0, column=1)
-Label(root, text="Offset pedana DX").grid(row=1, column=0)
-offset_dx_entry = Entry(root); offset_dx_entry.insert(0,"40"); offset_dx_entry.grid(row=1, column=1)
-Label(root, text="Soglia volo (N)").grid(row=2, column=0)
-soglia_entry = Entry(root); soglia_entry.insert(0,"5"); soglia_entry.grid(row=2, column=1)
-Label(root, text="Durata minima volo (s)").grid(row=3, column=0)
-durata_entry = Entry(root); durata_entry.insert(0,"0.2"); durata_entry.grid(row=3, column=1)
-Label(root, text="Peso soggetto (kg)").grid(row=4, column=0)
-massa_entry = Entry(root); massa_entry.insert(0,"75"); massa_entry.grid(row=4, column=1)
-
-Button(root, text="Seleziona file e calcola", command=run_analysis).grid(row=5, column=0, pady=5)
-Button(root, text="Esporta PDF/CSV", command=export_results).grid(row=5, column=1, pady=5)
-
-preview_text = Text(root, height=14, width=70)
-preview_text.grid(row=6, column=0, columnspan=2, pady=5)
-
-plot_frame = Frame(root)
-plot_frame.grid(row=7, column=0, columnspan=2, pady=5)
-
-Button(root, text="Seleziona inizio eccentrica", command=select_eccentric).grid(row=8, column=0, pady=5)
-Button(root, text="Seleziona inizio concentrica", command=select_concentric).grid(row=8, column=1, pady=5)
-
-root.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    root = Tk()
+    root.title("CMJ Analysis")
+
+    Label(root, text="Offset pedana SX (N o auto)").grid(row=0, column=0)
+    offset_sx_entry = Entry(root); offset_sx_entry.insert(0,"50"); offset_sx_entry.grid(row=0, column=1)
+    Label(root, text="Offset pedana DX (N o auto)").grid(row=1, column=0)
+    offset_dx_entry = Entry(root); offset_dx_entry.insert(0,"40"); offset_dx_entry.grid(row=1, column=1)
+    Label(root, text="Soglia volo (N)").grid(row=2, column=0)
+    soglia_entry = Entry(root); soglia_entry.insert(0,"5"); soglia_entry.grid(row=2, column=1)
+    Label(root, text="Durata minima volo (s)").grid(row=3, column=0)
+    durata_entry = Entry(root); durata_entry.insert(0,"0.2"); durata_entry.grid(row=3, column=1)
+    Label(root, text="Peso soggetto (kg o auto)").grid(row=4, column=0)
+    massa_entry = Entry(root); massa_entry.insert(0,"75"); massa_entry.grid(row=4, column=1)
+    Label(root, text="Atleta (archivio risultati)").grid(row=5, column=0)
+    atleta_entry = Entry(root); atleta_entry.grid(row=5, column=1)
+
+    Button(root, text="Seleziona file e calcola", command=run_analysis).grid(row=6, column=0, pady=5)
+    Button(root, text="Esporta PDF/CSV", command=export_results).grid(row=6, column=1, pady=5)
+
+    preview_text = Text(root, height=14, width=70)
+    preview_text.grid(row=7, column=0, columnspan=2, pady=5)
+
+    plot_frame = Frame(root)
+    plot_frame.grid(row=8, column=0, columnspan=2, pady=5)
+
+    Button(root, text="Seleziona inizio eccentrica", command=select_eccentric).grid(row=9, column=0, pady=5)
+    Button(root, text="Seleziona inizio concentrica", command=select_concentric).grid(row=9, column=1, pady=5)
+
+    progress = ttk.Progressbar(root, mode="determinate", length=300)
+    progress.grid(row=10, column=0, pady=5)
+    Button(root, text="Annulla", command=cancel_jobs).grid(row=10, column=1, pady=5)
+    status_label = Label(root, text="Pronto", anchor="w")
+    status_label.grid(row=11, column=0, columnspan=2, sticky="we")
+
+    threading.Thread(target=analysis_worker, daemon=True).start()
+    root.after(POLL_MS, poll_results)
+    root.mainloop()
+    if export_pool is not None:
+        export_pool.shutdown(wait=True)
@@ -0,0 +1,189 @@
+# Profilo SJ/CMJ/balzelli di tutta la squadra, senza GUI.
+#   python -m roster MANIFEST.csv --out report_squadra/ --workers 4 [--parquet]
+# Il manifest ha una riga per atleta con le colonne Atleta, Massa, SJ, CMJ, Balzelli
+# (SJ e CMJ sono i CSV dei report di rep.py, Balzelli il file grezzo della pedana; celle
+# vuote = test non eseguito, Massa anche "auto"). Percorsi relativi alla cartella del
+# manifest. Per ogni atleta: get_eur, calculate_stiffness_metrics e report PDF/CSV come
+# "GENERA REPORT FINALE" di new.py; alla fine un'unica tabella di squadra (CSV e Parquet).
+import argparse
+import importlib.util
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use("Agg")  # nessuna finestra nei processi worker
+
+import pandas as pd
+
+from vita_core import performance, profiling
+
+COLONNE = ["Atleta", "Massa", "SJ", "CMJ", "Balzelli"]
+# Colonne della tabella di squadra in ordine fisso (vuote per i test non eseguiti)
+COLONNE_TABELLA = ["Atleta", "Massa (kg)", "Altezza SJ (cm)", "Altezza CMJ (cm)", "EUR (Efficienza)",
+                   "RSI (Reattivita)", "Vertical Stiffness (kN/m)", "T. Contatto (s)", "T. Volo (s)", "Avvisi"]
+
+# ============================
+# MANIFEST
+# ============================
+
+def read_manifest(path):
+    if path.lower().endswith(".xlsx"):
+        df = pd.read_excel(path, dtype=str)
+    else:
+        df = pd.read_csv(path, dtype=str, sep=None, engine="python")
+    df.columns = [str(c).strip() for c in df.columns]
+    per_nome = {c.lower(): c for c in df.columns}
+    mancanti = [c for c in COLONNE[:2] if c.lower() not in per_nome]
+    if mancanti:
+        raise ValueError(f"{os.path.basename(path)}: colonne mancanti {mancanti}")
+    base = os.path.dirname(os.path.abspath(path))
+    atleti = []
+    for _, riga in df.iterrows():
+        voce = {}
+        for c in COLONNE:
+            v = riga.get(per_nome.get(c.lower()), None)
+            voce[c] = v.strip() if isinstance(v, str) and v.strip() else None
+        if voce["Atleta"] is None:
+            continue
+        for c in ("SJ", "CMJ", "Balzelli"):
+            if voce[c] is not None and not os.path.isabs(voce[c]):
+                voce[c] = os.path.join(base, voce[c])
+        massa = voce["Massa"]
+        voce["Massa"] = "auto" if massa is None or massa.lower() == "auto" else float(massa.replace(",", "."))
+        atleti.append(voce)
+    return atleti
+
+# ============================
+# ANALISI SINGOLO ATLETA (WORKER)
+# ============================
+
+def _nome_file(atleta):
+    return re.sub(r"[^\w\-]+", "_", atleta).strip("_") or "atleta"
+
+def process_athlete(voce, out_dir):
+    tempi, results, avvisi = {}, {}, []
+    massa = voce["Massa"]
+    if massa == "auto" and voce["Balzelli"]:
+        # Stimata una volta dal file dei balzelli: serve alla stiffness e va in tabella
+        massa = performance.estimate_mass(voce["Balzelli"])
+        if massa is None:
+            avvisi.append("massa non stimabile")
+    if voce["SJ"] and voce["CMJ"]:
+        t0 = time.perf_counter()
+        res = performance.get_eur(voce["SJ"], voce["CMJ"])
+        tempi['eur'] = time.perf_counter() - t0
+        if res:
+            h_sj, h_cmj, eur = res
+            results['eur'] = {'sj': h_sj, 'cmj': h_cmj, 'eur': eur}
+        else:
+            avvisi.append("EUR non calcolabile")
+    if voce["Balzelli"]:
+        t0 = time.perf_counter()
+        res = performance.calculate_stiffness_metrics(voce["Balzelli"], massa if massa is not None else "auto")
+        tempi['stiffness'] = time.perf_counter() - t0
+        if res:
+            tc, tv, rsi, kv = res
+            results['stiff'] = {'tc': tc, 'tv': tv, 'rsi': rsi, 'kv': kv}
+        else:
+            avvisi.append("stiffness non calcolabile")
+    if not results:
+        raise ValueError("; ".join(avvisi) or "nessun test indicato nel manifest")
+
+    t0 = time.perf_counter()
+    pdf_path = os.path.join(out_dir, f"Report_{_nome_file(voce['Atleta'])}.pdf")
+    performance.write_performance_report(pdf_path, results, f"VALUTAZIONE NEUROMUSCOLARE - {voce['Atleta']}")
+    tempi['export'] = time.perf_counter() - t0
+
+    riga = {"Atleta": voce["Atleta"], "Massa (kg)": massa if massa != "auto" else None}
+    riga.update({p: v for p, v, _ in performance.performance_values(results)})
+    if 'stiff' in results:
+        riga["T. Volo (s)"] = results['stiff']['tv']
+    riga["Avvisi"] = "; ".join(avvisi) or None
+    return riga, tempi
+
+def _run_one(voce, out_dir):
+    # Gli errori tornano al processo principale come testo: un atleta non ferma la squadra.
+    t0 = time.perf_counter()
+    try:
+        with profiling.stage("atleta"):
+            riga, tempi = process_athlete(voce, out_dir)
+        errore = None
+    except Exception as e:
+        riga, tempi, errore = None, {}, f"{type(e).__name__}: {e}"
+    tempi['totale'] = time.perf_counter() - t0
+    return voce["Atleta"], riga, tempi, errore
+
+# ============================
+# SQUADRA
+# ============================
+
+def write_table(tabella, out_dir, parquet=None):
+    # CSV sempre; Parquet se richiesto (None = se pyarrow è installato)
+    percorsi = [os.path.join(out_dir, "roster.csv")]
+    tabella.to_csv(percorsi[0], index=False)
+    if parquet is None:
+        parquet = importlib.util.find_spec("pyarrow") is not None
+    if parquet:
+        percorsi.append(os.path.join(out_dir, "roster.parquet"))
+        tabella.to_parquet(percorsi[1], index=False)
+    return percorsi
+
+def run_roster(atleti, out_dir, workers=None, parquet=None, log=print):
+    os.makedirs(out_dir, exist_ok=True)
+    righe, errori, tempi_stadio = [], [], {}
+    t_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [profiling.submit(pool, _run_one, v, out_dir) for v in atleti]
+        for fut in as_completed(futures):
+            atleta, riga, tempi, errore = profiling.result(fut)
+            if errore is not None:
+                errori.append((atleta, errore))
+                log(f"[ERRORE] {atleta}: {errore} ({tempi['totale']:.2f} s)")
+                continue
+            for k, v in tempi.items():
+                tempi_stadio.setdefault(k, []).append(v)
+            dettaglio = " ".join(f"{k}={v*1000:.0f}ms" for k, v in tempi.items() if k != 'totale')
+            log(f"[OK] {atleta}: {tempi['totale']:.2f} s ({dettaglio})")
+            righe.append(riga)
+    t_tot = time.perf_counter() - t_start
+
+    tabella = None
+    if righe:
+        # Colonne esplicite: l'ordine non dipende da quale atleta termina per primo
+        tabella = pd.DataFrame(righe, columns=COLONNE_TABELLA).sort_values("Atleta", kind="stable", ignore_index=True)
+        for p in write_table(tabella, out_dir, parquet):
+            log(f"Tabella squadra: {p}")
+    for k, v in tempi_stadio.items():
+        if k != 'totale':
+            log(f"  {k}: {len(v)} atleti, totale {sum(v)*1000:.0f} ms, medio {sum(v)/len(v)*1000:.0f} ms")
+    log(f"Completati {len(righe)}/{len(atleti)} atleti in {t_tot:.2f} s")
+    return tabella, errori
+
+# ============================
+# CLI
+# ============================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profilo SJ/CMJ/balzelli di una squadra da manifest")
+    parser.add_argument("manifest", help="CSV o XLSX con colonne Atleta, Massa, SJ, CMJ, Balzelli")
+    parser.add_argument("--out", default="report_squadra", help="cartella di destinazione")
+    parser.add_argument("--workers", type=int, default=None, help="processi paralleli (default: CPU)")
+    formato = parser.add_mutually_exclusive_group()
+    formato.add_argument("--parquet", dest="parquet", action="store_true", default=None,
+                         help="scrive anche roster.parquet (richiede pyarrow)")
+    formato.add_argument("--no-parquet", dest="parquet", action="store_false")
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    atleti = read_manifest(args.manifest)
+    if not atleti:
+        parser.error("nessun atleta nel manifest")
+    profilo = profiling.from_args(args)
+    _, errori = run_roster(atleti, args.out, args.workers, args.parquet)
+    profiling.finish(profilo, args)
+    return 1 if errori else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# I test importano vita_core dalla radice del repository, come gli script in benchmarks/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,25 @@
+import os
+import pickle
+from collections import OrderedDict
+
+import pytest
+
+from vita_core.cache import StageCache
+
+@pytest.mark.parametrize("contenuto", [
+    b"",                                                  # troncato
+    b"non un pickle",
+    pickle.dumps({'x': 1})[:-3],                          # interrotto a metà
+    # modulo non più importabile (ModuleNotFoundError, non UnpicklingError)
+    pickle.dumps(OrderedDict(x=1)).replace(b"collections", b"collectionz"),
+])
+def test_voce_su_disco_illeggibile_ricalcolata(tmp_path, contenuto):
+    cache = StageCache(disk_dir=str(tmp_path))
+    path = cache._disk_path("k")
+    with open(path, "wb") as f:
+        f.write(contenuto)
+    assert cache.get_or_compute("analyze", "k", lambda: 42) == 42
+    assert cache.stats()["analyze"] == {'hit': 0, 'disk': 0, 'miss': 1}
+    # La voce rotta è stata sostituita dal valore ricalcolato
+    assert StageCache(disk_dir=str(tmp_path)).get_or_compute("analyze", "k", lambda: 0) == 42
+    assert os.path.exists(path)
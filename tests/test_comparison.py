@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from vita_core.comparison import merge_sessions
+
+# ============================
+# CONFRONTO PRE/POST (merge_sessions)
+# ============================
+
+def _sessione(parametri, valori):
+    return pd.DataFrame({'Parametro': parametri, 'Valore': valori})
+
+def _merge_per_chiave(pre, post):
+    # Riferimento: il merge per Parametro di compare_new prima del motore di andamento
+    m = pd.merge(pre, post, on='Parametro', suffixes=('_Pre', '_Post'))
+    for col in ['Valore_Pre', 'Valore_Post']:
+        m[col] = pd.to_numeric(m[col].astype(str).str.replace('%', '').str.strip(), errors='coerce')
+    m['Diff %'] = (m['Valore_Post'] - m['Valore_Pre']) / m['Valore_Pre'] * 100
+    return m.astype({'Valore_Pre': np.float64, 'Valore_Post': np.float64})
+
+def test_pre_post_come_merge_per_chiave():
+    pre = _sessione(['Fmax (N)', 'Altezza salto (cm)', 'Bilanciamento (%)', 'Solo pre'], ['1500', '32.5', '48 %', '1'])
+    post = _sessione(['Bilanciamento (%)', 'Fmax (N)', 'Altezza salto (cm)', 'Solo post'], ['51 %', '1650', '-', '2'])
+    pd.testing.assert_frame_equal(merge_sessions([pre, post]), _merge_per_chiave(pre, post))
+
+def test_pre_post_valori_numerici_e_nomi_con_spazi():
+    pre = _sessione([' A', 'B', 'B'], [1.0, 2.0, 9.0])   # nome ripetuto: vale la prima riga
+    post = _sessione(['B ', 'A'], [4.0, 3.0])
+    m = merge_sessions([pre, post])
+    assert m['Parametro'].tolist() == ['A', 'B']
+    assert m['Valore_Post'].tolist() == [3.0, 4.0] and m['Diff %'].tolist() == [200.0, 100.0]
+
+def test_piu_sessioni_parametro_mancante_in_mezzo():
+    m = merge_sessions([_sessione(['A', 'B'], [1, 10]), _sessione(['A'], [2]), _sessione(['A', 'B'], [3, 30])])
+    assert m['Parametro'].tolist() == ['A', 'B']
+    assert m['Valore_Post'].tolist() == [3.0, 30.0]
@@ -0,0 +1,59 @@
+import csv
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+from vita_core import excel
+
+# ============================
+# CONVERSIONE IN PARALLELO
+# ============================
+# Il processo principale tiene aperta la cartella (sheet_names); i worker non devono
+# riusarne il descrittore ereditato, altrimenti le letture si sovrappongono.
+
+FOGLI, RIGHE = 4, 3000
+
+@pytest.fixture
+def cartella(tmp_path):
+    path = tmp_path / "prove.xlsx"
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for k in range(FOGLI):
+        ws = wb.create_sheet(f"Prova {k}")
+        ws.append(["tempo", "SX", "DX"])
+        for i in range(RIGHE):
+            ws.append([i, k + i * 0.5, i * 2.0])
+    wb.save(path)
+    return str(path)
+
+def _righe_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+def _verifica(esiti, fogli):
+    assert [e['foglio'] for e in esiti] == fogli
+    for k, e in enumerate(esiti):
+        righe = _righe_csv(e['csv'])
+        assert e['righe'] == len(righe) == RIGHE + 1
+        assert righe[0] == ["tempo", "SX", "DX"]
+        assert [float(v) for v in righe[-1]] == [RIGHE - 1, k + (RIGHE - 1) * 0.5, (RIGHE - 1) * 2.0]
+
+@pytest.mark.parametrize("binario", [False, True])
+def test_convert_workbook_in_parallelo(cartella, tmp_path, binario):
+    fogli = excel.sheet_names(cartella)   # cartella aperta nel processo principale
+    for giro in range(3):
+        esiti = excel.convert_workbook(cartella, str(tmp_path / f"out{giro}"), workers=FOGLI, binario=binario)
+        _verifica(esiti, fogli)
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="serve fork")
+def test_worker_fork_non_riusa_la_cartella_del_padre(cartella, tmp_path):
+    # Senza passare da convert_workbook: pool con fork mentre la cartella è aperta nel padre
+    fogli = excel.sheet_names(cartella)
+    with ProcessPoolExecutor(FOGLI, mp_context=multiprocessing.get_context("fork")) as pool:
+        esiti = list(pool.map(excel.convert_sheet, [cartella] * FOGLI, fogli, [str(tmp_path)] * FOGLI))
+    _verifica(esiti, fogli)
+    assert excel.sheet_names(cartella) == fogli   # la cartella del padre resta utilizzabile
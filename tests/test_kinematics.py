@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from vita_core.kinematics import cmj_kinematics
+from vita_core.synthetic import analytic_jump
+
+# ============================
+# SALTO ANALITICO
+# ============================
+# v(t) = -V sin(ωt): take-off, altezza, profondità, impulso di frenata e potenze hanno
+# soluzione esatta (vita_core.synthetic.analytic_jump). Tolleranza 0.5% sull'errore di
+# discretizzazione dei trapezi.
+
+@pytest.mark.parametrize("fs", [500, 1000, 2000])
+def test_salto_analitico(fs):
+    forza, t, start, takeoff, attesi = analytic_jump(fs)
+    metriche = cmj_kinematics(forza, t, takeoff, start_idx=start)['metrics']
+    for nome, atteso in attesi.items():
+        assert metriche[nome] == pytest.approx(atteso, rel=5e-3), nome
+
+@pytest.mark.parametrize("fs", [500, 1000, 2000])
+def test_inizio_concentrica(fs):
+    # Velocità di nuovo >= 0 a ωt = π; a 500 Hz cade esattamente su un campione
+    omega = 2 * np.pi
+    forza, t, start, takeoff, _ = analytic_jump(fs, omega=omega)
+    conc = cmj_kinematics(forza, t, takeoff, start_idx=start)['metrics']['concentric_start_idx']
+    assert abs(t[conc] - t[start] - np.pi / omega) <= 1.5 / fs
+
+def test_velocita_al_takeoff_e_altezza():
+    forza, t, start, takeoff, _ = analytic_jump(1000, massa=60.0, V=2.0)
+    ris = cmj_kinematics(forza, t, takeoff, start_idx=start)
+    assert ris['velocity'][takeoff] == pytest.approx(2.0, rel=1e-3)
+    assert ris['metrics']['jump_height'] == pytest.approx(2.0**2 / (2 * 9.81), rel=1e-3)
+
+# ============================
+# LOTTO 2-D CONTRO SINGOLA PROVA
+# ============================
+
+def test_lotto_uguale_a_singola():
+    rng = np.random.default_rng(0)
+    forza, t, start, takeoff, _ = analytic_jump(1000)
+    F = forza + rng.normal(0, 2, (8, len(forza)))
+    lotto = cmj_kinematics(F, t, takeoff, start_idx=start)
+    for k, riga in enumerate(F):
+        singola = cmj_kinematics(riga, t, takeoff, start_idx=start)
+        for nome, valore in singola['metrics'].items():
+            np.testing.assert_allclose(lotto['metrics'][nome][k], valore, rtol=1e-12, err_msg=nome)
+        for serie in ('velocity', 'displacement', 'power'):
+            np.testing.assert_allclose(lotto[serie][k], singola[serie], rtol=1e-12, atol=1e-12, err_msg=serie)
+
+def test_lotto_con_indici_per_prova():
+    # Prove spostate nel tempo: inizio e take-off diversi per riga, stesso salto
+    forza, t, start, takeoff, attesi = analytic_jump(1000)
+    ritardi = np.array([0, 100, 250])
+    n = len(forza) + ritardi.max()
+    F = np.full((len(ritardi), n), forza[0])
+    for k, r in enumerate(ritardi):
+        F[k, r:r + len(forza)] = forza
+    tempi = np.arange(n) / 1000
+    lotto = cmj_kinematics(F, tempi, takeoff + ritardi, start_idx=start + ritardi)
+    for k, r in enumerate(ritardi):
+        singola = cmj_kinematics(F[k], tempi, takeoff + r, start_idx=start + r)
+        for nome, valore in singola['metrics'].items():
+            np.testing.assert_allclose(lotto['metrics'][nome][k], valore, rtol=1e-12, err_msg=nome)
+    np.testing.assert_allclose(lotto['metrics']['peak_power'], attesi['peak_power'], rtol=5e-3)
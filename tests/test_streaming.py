@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from vita_core import analysis
+from vita_core.session import analyze_session
+from vita_core.streaming import JumpStream, stream_jumps
+from vita_core.synthetic import cmj_trace, write_capture
+
+@pytest.fixture(scope="module")
+def registrazione(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("stream") / "sessione.txt")
+    write_capture(cmj_trace(fs=1000, durata=60, n_salti=10), path)
+    return path
+
+@pytest.mark.parametrize("filtro", [
+    None,
+    {'tipo': 'media', 'finestra_s': 0.02},
+    [{'tipo': 'media', 'finestra': 7, 'centrata': False}],
+])
+def test_stream_come_analyze_session(registrazione, filtro):
+    df = analysis.preprocess(analysis.load_pedana(registrazione, use_cache=False), 50, 40)
+    salti = analyze_session(df, soglia_volo=5, durata_min=0.2, filtro=filtro)['salti']
+    eventi = list(stream_jumps(registrazione, 4096, offset_sx=50, offset_dx=40, durata_min=0.2,
+                               filtro=filtro))
+    assert len(eventi) == len(salti) == 10
+    assert [e['takeoff_idx'] for e in eventi] == list(salti['takeoff_idx'])
+    np.testing.assert_allclose([e['Fmax'] for e in eventi], salti['Fmax (N)'], rtol=1e-9)
+
+@pytest.mark.parametrize("filtro", [
+    {'tipo': 'butterworth', 'taglio_hz': 50},
+    {'tipo': 'mediana'},
+    [{'tipo': 'media', 'finestra': 3}, {'tipo': 'media', 'finestra': 5}],
+])
+def test_filtri_non_a_blocchi_rifiutati(filtro):
+    with pytest.raises(ValueError):
+        JumpStream(filtro=filtro)
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from vita_core.trends import pre_post, trend_matrix, trend_table
+
+# ============================
+# NUMERO DI SESSIONE
+# ============================
+# Un parametro assente in una sessione (write_report scrive alcune righe solo se
+# calcolabili) non deve spostare i valori successivi nella sessione sbagliata.
+
+def _lungo(righe):
+    return pd.DataFrame(righe, columns=['atleta', 'data', 'parametro', 'valore'])
+
+def test_parametro_mancante_lascia_un_buco():
+    lungo = _lungo([
+        ('X', '2025-01-01', 'A', 1.0), ('X', '2025-01-01', 'B', 10.0),
+        ('X', '2025-02-01', 'A', 2.0),
+        ('X', '2025-03-01', 'A', 3.0), ('X', '2025-03-01', 'B', 30.0),
+    ])
+    tab = trend_table(lungo)
+    m = trend_matrix(tab)
+    assert list(m.columns) == [1, 2, 3]
+    assert m.loc[('X', 'B'), 1] == 10.0 and np.isnan(m.loc[('X', 'B'), 2]) and m.loc[('X', 'B'), 3] == 30.0
+    # Delta rispetto alla misura precedente esistente
+    b = tab[tab['parametro'] == 'B']
+    assert b['sessione'].tolist() == [1, 3] and b['delta'].iloc[1] == 20.0
+
+    pp = pre_post(tab, 1, 3).set_index('Parametro')
+    assert pp.loc['B', 'Valore_Post'] == 30.0
+    assert np.isnan(pre_post(tab, 1, 2).set_index('Parametro').loc['B', 'Valore_Post'])
+    assert pre_post(tab).set_index('Parametro').loc['B', 'Valore_Post'] == 30.0
+
+def test_sessioni_numerate_per_atleta_e_sessione_id():
+    # Due sessioni nella stessa data (sessione_id diversi) e atleti con calendari diversi
+    lungo = _lungo([
+        ('X', '2025-01-01', 'A', 1.0), ('X', '2025-01-01', 'A', 2.0), ('X', '2025-01-05', 'A', 3.0),
+        ('Y', '2025-01-05', 'A', 5.0), ('Y', '2025-01-05', 'B', 6.0),
+    ])
+    lungo['sessione_id'] = [1, 2, 3, 4, 4]
+    tab = trend_table(lungo).set_index(['atleta', 'sessione_id', 'parametro'])
+    assert tab['sessione'].loc['X'].tolist() == [1, 2, 3]
+    assert tab['sessione'].loc['Y'].tolist() == [1, 1]
+
+def test_baseline_sulle_misure_esistenti():
+    # Baseline = media delle `finestra` misure precedenti della serie, anche con buchi
+    date = pd.date_range('2025-01-01', periods=6, freq='W')
+    righe = [('X', d, 'A', float(k)) for k, d in enumerate(date)]
+    righe += [('X', d, 'B', float(10 * k)) for k, d in enumerate(date) if k != 2]
+    tab = trend_table(_lungo(righe), finestra=3)
+    b = tab[tab['parametro'] == 'B'].set_index('sessione')
+    assert b.loc[5, 'baseline'] == pytest.approx(np.mean([0.0, 10.0, 30.0]))
+    assert b.loc[6, 'baseline'] == pytest.approx(np.mean([10.0, 30.0, 40.0]))
@@ -0,0 +1,7 @@
+# Nucleo di calcolo per le analisi su pedana (CMJ, SJ, balzelli).
+# I moduli non importano Tk; matplotlib viene caricato solo dalle funzioni che disegnano
+# (report, liveplot e i renderer dei PDF), così analysis, performance, comparison, metrics
+# ed excel si importano in fretta da script, batch e processi worker.
+# Dipendenze: numpy, pandas, matplotlib. Opzionali, importate solo dove servono: scipy
+# (filtro Butterworth), openpyxl (file Excel), pypdf (--unito di compare_new unisce i PDF
+# già scritti; senza, le pagine vengono ridisegnate).
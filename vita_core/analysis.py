@@ -0,0 +1,256 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from vita_core.baseline import estimate_baseline, estimate_bodyweight
+from vita_core.cache import StageCache, make_key, file_key
+from vita_core.filtering import force_filter, sample_rate, smooth
+from vita_core.ingest import capture_frame
+from vita_core.kinematics import cmj_kinematics
+from vita_core.phases import find_flight_intervals, intervals_to_mask, detect_cmj_phases
+from vita_core.preprocessing import preprocess_arrays
+from vita_core.profiling import profiled, stage
+
+# ============================
+# ANALISI CMJ (SENZA GUI)
+# ============================
+# Funzioni di calcolo di rep.py: importabili da script, batch e processi worker senza
+# aprire finestre né caricare Tk o matplotlib. matplotlib viene caricato solo quando
+# write_report disegna il PDF (vita_core.report). rep.py è l'interfaccia grafica sopra
+# questo modulo e ne riesporta i nomi (rep.load_pedana, rep.analyze_cmj_force, ...).
+
+g = 9.81  # gravità
+AUTO = "auto"  # offset/massa stimati dal tracciato
+# Cache dei risultati; VITA_CMJ_CACHE_DIR attiva anche il livello su disco
+pipeline_cache = StageCache(disk_dir=os.environ.get("VITA_CMJ_CACHE_DIR"))
+trapz = getattr(np, 'trapezoid', None) or np.trapz  # np.trapz rimosso in NumPy 2.x
+
+# ============================
+# CARICAMENTO E CALCOLO
+# ============================
+
+@profiled("load_pedana")
+def load_pedana(file, use_cache=True):
+    # Parser C + cache binaria accanto al file (vedi vita_core.ingest); "cartella.xlsx::Foglio"
+    # (o una cartella Excel, primo foglio) letto direttamente dal foglio, senza CSV intermedio
+    return capture_frame(file, use_cache=use_cache)
+
+@profiled("preprocess")
+def preprocess(df, offset_sx=0, offset_dx=0, soglia_contatto=3, dtype=np.float64):
+    # Calcolo su array NumPy (vita_core.preprocessing); le colonne grezze non vengono copiate.
+    # offset "auto": stimati dal tratto scarico più stabile (vita_core.baseline), salvati in df.attrs
+    baseline = None
+    if AUTO in (offset_sx, offset_dx):
+        baseline = estimate_baseline(df['time'].values, df['pedana_sinistra'].values, df['pedana_destra'].values)
+        if offset_sx == AUTO:
+            offset_sx = baseline['offset_sx']
+        if offset_dx == AUTO:
+            offset_dx = baseline['offset_dx']
+    sx_cor, dx_cor, forza_tot = preprocess_arrays(df['pedana_sinistra'].values, df['pedana_destra'].values,
+                                                  offset_sx, offset_dx, soglia_contatto, dtype)
+    df = df.copy(deep=False)
+    df["pedana_sinistra_cor"] = sx_cor
+    df["pedana_destra_cor"] = dx_cor
+    df["forza_tot"] = forza_tot
+    df['time_s'] = df['time'].values / 1000  # ms -> s
+    if baseline is not None:
+        df.attrs['baseline'] = baseline
+    return df
+
+@profiled("detect_flight_phase")
+def detect_flight_phase(df, soglia=5, durata_min=0.5):
+    df = df.copy(deep=False)
+    starts, ends = find_flight_intervals(df['forza_tot'].values, df['time_s'].values, soglia, durata_min)
+    df['in_volo'] = intervals_to_mask(starts, ends, len(df))
+    return df
+
+def resolve_massa(df, massa):
+    # massa "auto": dalla stima fatta in preprocess, altrimenti dal tratto carico più stabile
+    if massa != AUTO:
+        return massa
+    stima = df.attrs.get('baseline')
+    if stima is None or stima['massa'] is None:
+        stima = estimate_bodyweight(df['forza_tot'].values, df['time'].values)
+    if stima['massa'] is None:
+        raise ValueError("peso corporeo non stimabile: nessun tratto stabile in appoggio")
+    return stima['massa']
+
+@profiled("analyze_cmj_force")
+def analyze_cmj_force(df, soglia_volo=5, durata_min=0.5, massa=66, finestra_media=None, filtro=None):
+    # Forza filtrata per Fmax: filtro di vita_core.filtering (default media mobile di 3 ms
+    # alla frequenza di campionamento della prova; finestra_media in campioni come prima)
+    massa = resolve_massa(df, massa)
+    df = df.copy(deep=False)
+    fs = sample_rate(df['time_s'].values)
+    df['forza_filt'] = smooth(df['forza_tot'].values, fs, force_filter(finestra_media, filtro))
+    voli = find_flight_intervals(df['forza_tot'].values, df['time_s'].values, soglia_volo, durata_min)
+    df['in_volo'] = intervals_to_mask(voli[0], voli[1], len(df))
+
+    # Take-off e landing del primo volo (gli altri salti: vita_core.session.analyze_session)
+    takeoff_idx = int(voli[0][0]) if len(voli[0]) > 0 else None
+    landing_idx = int(voli[1][0]) if len(voli[0]) > 0 else None
+    takeoff_time = df['time_s'].iloc[takeoff_idx] if takeoff_idx is not None else None
+    landing_time = df['time_s'].iloc[landing_idx] if landing_idx is not None else None
+
+    # Picco di forza totale (prima del take-off)
+    if takeoff_idx is not None:
+        Fmax = df['forza_filt'].iloc[:takeoff_idx].max()
+        idx_peak = df['forza_filt'].iloc[:takeoff_idx].idxmax()
+        peak_time = df.loc[idx_peak, 'time_s']
+    else:
+        Fmax, peak_time = df['forza_filt'].max(), df['time_s'][df['forza_filt'].idxmax()]
+
+    return {
+        'Fmax': Fmax,
+        'peak_time': peak_time,
+        'df': df,
+        'massa': massa,
+        'takeoff_idx': takeoff_idx,
+        'landing_idx': landing_idx,
+        'takeoff_time': takeoff_time,
+        'landing_time': landing_time,
+        'flight_intervals': voli
+    }
+
+def run_pipeline(file_path, offset_sx=0, offset_dx=0, soglia_contatto=3, soglia_volo=5,
+                 durata_min=0.5, massa=66, finestra_media=None, filtro=None, cache=None):
+    # load_pedana -> preprocess -> analyze_cmj_force con cache per stadio: ogni chiave
+    # include quella dello stadio precedente e solo i propri parametri.
+    # Gli stadi precedenti vengono letti solo se quello successivo non è in cache.
+    cache = cache or pipeline_cache
+    k_load = make_key('load', file_key(file_path))
+    k_pre = make_key(k_load, 'preprocess', offset_sx, offset_dx, soglia_contatto)
+    k_an = make_key(k_pre, 'analyze', soglia_volo, durata_min, massa, finestra_media, filtro)
+
+    def _load():
+        return cache.get_or_compute('load', k_load, lambda: load_pedana(file_path))
+
+    def _preprocess():
+        return cache.get_or_compute('preprocess', k_pre,
+                                    lambda: preprocess(_load(), offset_sx, offset_dx, soglia_contatto))
+
+    return cache.get_or_compute('analyze', k_an, lambda: analyze_cmj_force(
+        _preprocess(), soglia_volo=soglia_volo, durata_min=durata_min, massa=massa, finestra_media=finestra_media,
+        filtro=filtro))
+
+# ============================
+# FASI E CINEMATICA
+# ============================
+
+@profiled("auto_phases")
+def auto_phases(cmj):
+    # Inizio eccentrica/concentrica calcolati dal tracciato; i pulsanti di selezione
+    # manuale restano come correzione.
+    df = cmj['df']
+    fasi = detect_cmj_phases(df['forza_tot'].values, df['time_s'].values, cmj['takeoff_idx'])
+    return fasi['eccentric_start_idx'], fasi['concentric_start_idx']
+
+@profiled("compute_kinematics")
+def compute_kinematics(df, eccentric_start_idx, concentric_start_idx, takeoff_idx):
+    # Velocità, spostamento e potenza integrate dall'inizio eccentrica (stazione eretta,
+    # peso corporeo stimato nel secondo precedente) fino al take-off. None se mancano le fasi.
+    if eccentric_start_idx is None or takeoff_idx is None or takeoff_idx <= eccentric_start_idx:
+        return None
+    return cmj_kinematics(df['forza_tot'].to_numpy(), df['time_s'].to_numpy(), takeoff_idx,
+                          start_idx=eccentric_start_idx, concentric_idx=concentric_start_idx)
+
+def numero_o_auto(testo):
+    # "auto" (qualsiasi maiuscola) oppure un numero
+    testo = testo.strip()
+    return AUTO if testo.lower() == AUTO else float(testo)
+
+# ============================
+# REPORT PDF/CSV
+# ============================
+
+@profiled("write_report", campioni=lambda argomenti, df_csv: len(argomenti['cmj']['df']))
+def write_report(pdf_file, csv_file, cmj, soglia_volo, eccentric_start_idx, concentric_start_idx, massa, kin=None):
+    # kin: risultato di compute_kinematics già calcolato dal chiamante, altrimenti calcolato qui
+    df = cmj['df']
+    takeoff_idx = cmj['takeoff_idx']
+    fine_conc = takeoff_idx + 1 if takeoff_idx is not None else None
+
+    t_ecc = t_conc = None
+    if kin is None:
+        kin = compute_kinematics(df, eccentric_start_idx, concentric_start_idx, takeoff_idx)
+    if eccentric_start_idx is not None and concentric_start_idx is not None:
+        t_ecc = df['time_s'].iloc[concentric_start_idx] - df['time_s'].iloc[eccentric_start_idx]
+    if concentric_start_idx is not None and takeoff_idx is not None:
+        t_conc = df['time_s'].iloc[takeoff_idx] - df['time_s'].iloc[concentric_start_idx]
+
+    # PARAMETRI DINAMICI CONCENTRICA
+    df_conc = df.iloc[concentric_start_idx:fine_conc].copy()
+    F_conc = df_conc['forza_tot'].values
+    t_conc_vec = df_conc['time_s'].values  # già in secondi
+    F_mean_conc = np.mean(F_conc)
+    # Impulso reale
+    J_conc = trapz(F_conc, t_conc_vec)
+    # Delta v al take-off
+    delta_v = J_conc / massa
+    # Impulso normalizzato
+    J_norm = J_conc / (massa * g)
+
+    # BILANCIAMENTO CONCENTRICO
+    df_conc = df.iloc[concentric_start_idx:fine_conc].copy()
+    forza_tot_lr = df_conc['pedana_sinistra_cor'] + df_conc['pedana_destra_cor']
+    bil_conc = 100 * df_conc['pedana_destra_cor'] / forza_tot_lr.replace(0, np.nan)
+    bil_mean = bil_conc.mean()
+
+    t_volo = None
+    H_salto = None
+    if cmj['takeoff_time'] is not None and cmj['landing_time'] is not None:
+        t_volo = cmj['landing_time'] - cmj['takeoff_time']
+        H_salto = g * t_volo**2 / 8
+
+    # Tabella: (parametro, valore numerico, formato); None = non disponibile
+    righe = [
+        ('Fmax (N)', cmj['Fmax'], "{:.0f}"),
+        ('t concentrica (s)', t_conc, "{:.3f}"),
+        ('Tempo di volo (s)', t_volo, "{:.3f}"),
+        ('Altezza salto (cm)', H_salto*100 if H_salto is not None else None, "{:.1f}"),
+        ('Bilanciamento medio DX (%)', bil_mean, "{:.1f}"),
+        ('Massa soggetto (kg)', massa, "{:.1f}"),
+    ]
+    stima = df.attrs.get('baseline')
+    if stima is not None:
+        righe.append(('Offset stimato SX (N)', stima['offset_sx'], "{:.1f}"))
+        righe.append(('Offset stimato DX (N)', stima['offset_dx'], "{:.1f}"))
+        righe.append(('Confidenza stima (%)', stima['confidence']*100, "{:.0f}"))
+    if t_conc is not None:
+        righe[2:2] = [
+            ('Forza media concentrica (N)', F_mean_conc, "{:.0f}"),
+            ('Impulso concentrico (N·s)', J_conc, "{:.1f}"),
+            ('Δv al take-off (m/s)', delta_v, "{:.2f}"),
+            ('Impulso / BW (s)', J_norm, "{:.2f}"),
+        ]
+    if kin is not None and t_conc is not None:
+        m = kin['metrics']
+        i = [r[0] for r in righe].index('Massa soggetto (kg)')
+        righe[i:i] = [
+            ('Potenza media concentrica (W)', m['mean_power'], "{:.0f}"),
+            ('Potenza massima concentrica (W)', m['peak_power'], "{:.0f}"),
+            ('Velocità al take-off (m/s)', m['takeoff_velocity'], "{:.2f}"),
+            ('Profondità contromovimento (cm)', m['cm_depth']*100, "{:.1f}"),
+            ('Impulso di frenata (N·s)', m['braking_impulse'], "{:.1f}"),
+            ('RFD frenata (N/s)', m['braking_rfd'], "{:.0f}"),
+            ('RSI modificato (m/s)', m['rsi_mod'], "{:.2f}"),
+        ]
+    if t_ecc is not None:
+        righe.insert(1, ('t eccentrica (s)', t_ecc, "{:.3f}"))
+    cmj_data = [[p, fmt.format(v) if v is not None and not pd.isna(v) else "-"] for p, v, fmt in righe]
+
+    # Pagine: forza totale, pedane, bilanciamento concentrico (se disponibile), tabella
+    bilanciamento = None
+    if concentric_start_idx is not None and takeoff_idx is not None:
+        bilanciamento = (df_conc['time_s'] - df_conc['time_s'].iloc[0], bil_conc)
+    from vita_core.report import render_cmj_report   # matplotlib solo quando si scrive un report
+    with stage("render_pdf", campioni=len(df)):
+        render_cmj_report(pdf_file, df, cmj, soglia_volo, eccentric_start_idx, concentric_start_idx,
+                          cmj_data, bilanciamento)
+
+    # CSV Parametro/Valore come prima; la colonna Numero (valori non formattati) resta nel DataFrame
+    df_csv = pd.DataFrame({'Parametro':[r[0] for r in cmj_data], 'Valore':[r[1] for r in cmj_data],
+                           'Numero':[r[1] for r in righe]})
+    df_csv.to_csv(csv_file, index=False, columns=['Parametro', 'Valore'])
+    return df_csv
@@ -0,0 +1,85 @@
+import numpy as np
+
+from vita_core.phases import g
+
+# ============================
+# OFFSET PEDANE E PESO CORPOREO DAI TRATTI STABILI
+# ============================
+# Media e deviazione standard mobili in O(n) con somme cumulative. Gli offset sono le medie
+# per pedana nel tratto scarico più stabile (prima di salire o durante il volo), il peso
+# corporeo è la forza netta nel tratto carico più stabile: da fermi la forza vale BW in
+# qualunque posizione. La confidenza (0-1) scende con la variabilità dei due tratti rispetto
+# al peso stimato ed è nulla se non si trovano entrambi.
+
+TOLLERANZA_SD = 0.03   # SD del tratto (frazione di BW) a cui la confidenza si annulla
+
+def rolling_mean_std(x, w):
+    # Media e SD di tutte le finestre di w campioni (n - w + 1 valori, finestra i = x[i:i+w]).
+    # Le finestre che contengono NaN hanno SD infinita.
+    x = np.asarray(x, dtype=np.float64)
+    nan = np.isnan(x)
+    centro = np.nanmean(x) if not nan.all() else 0.0
+    c = np.where(nan, 0.0, x - centro)   # centrato per la stabilità delle somme dei quadrati
+    s1 = np.concatenate(([0.0], np.cumsum(c)))
+    s2 = np.concatenate(([0.0], np.cumsum(c * c)))
+    media = (s1[w:] - s1[:-w]) / w
+    sd = np.sqrt(np.maximum((s2[w:] - s2[:-w]) / w - media**2, 0.0))
+    if nan.any():
+        n_nan = np.concatenate(([0], np.cumsum(nan)))
+        sd[(n_nan[w:] - n_nan[:-w]) > 0] = np.inf
+    return media + centro, sd
+
+def find_quiet_window(sd, validi=None):
+    # Inizio della finestra con SD minima tra quelle valide, None se non ce ne sono.
+    if validi is not None:
+        sd = np.where(validi, sd, np.inf)
+    if len(sd) == 0:
+        return None
+    i = int(np.argmin(sd))
+    return i if np.isfinite(sd[i]) else None
+
+def _campioni(time_ms, durata):
+    dt = np.median(np.diff(time_ms)) / 1000 if len(time_ms) > 1 else 0.001
+    return max(int(round(durata / dt)), 2)
+
+def _confidenza(sd, bw):
+    return float(np.clip(1 - sd / (TOLLERANZA_SD * bw), 0.0, 1.0))
+
+def estimate_bodyweight(forza, time_ms, finestra_bw=1.0, carico_min=200):
+    # Peso corporeo dalla forza netta (offset già tolti): tratto di finestra_bw secondi più
+    # stabile con media almeno carico_min N.
+    forza = np.asarray(forza, dtype=np.float64)
+    w = min(_campioni(time_ms, finestra_bw), len(forza))
+    vuoto = {'bw': None, 'massa': None, 'stazione': None, 'confidence': 0.0}
+    if w < 2:
+        return vuoto
+    media, sd = rolling_mean_std(forza, w)
+    i = find_quiet_window(sd, media >= carico_min)
+    if i is None:
+        return vuoto
+    bw = float(media[i])
+    return {'bw': bw, 'massa': bw / g, 'stazione': (i, i + w), 'confidence': _confidenza(sd[i], bw)}
+
+def estimate_baseline(time_ms, sx, dx, finestra_vuoto=0.1, finestra_bw=1.0, carico_min=200):
+    # Offset per pedana, peso e massa del sistema dai dati grezzi, con la confidenza della stima.
+    # Il tratto scarico è cercato tra le finestre con forza totale entro carico_min/4 dal minimo.
+    sx = np.asarray(sx, dtype=np.float64)
+    dx = np.asarray(dx, dtype=np.float64)
+    tot = sx + dx
+    w = min(_campioni(time_ms, finestra_vuoto), len(tot))
+    vuoto = {'offset_sx': 0.0, 'offset_dx': 0.0, 'bw': None, 'massa': None,
+             'scarico': None, 'stazione': None, 'confidence': 0.0}
+    if w < 2:
+        return vuoto
+    media, sd = rolling_mean_std(tot, w)
+    i = find_quiet_window(sd, media <= np.nanmin(media) + carico_min / 4)
+    if i is None:
+        return vuoto
+    offset_sx = float(np.nanmean(sx[i:i+w]))
+    offset_dx = float(np.nanmean(dx[i:i+w]))
+    peso = estimate_bodyweight(tot - offset_sx - offset_dx, time_ms, finestra_bw, carico_min)
+    conf = 0.0
+    if peso['bw'] is not None:
+        conf = min(peso['confidence'], _confidenza(sd[i], peso['bw']))
+    return {'offset_sx': offset_sx, 'offset_dx': offset_dx, 'bw': peso['bw'], 'massa': peso['massa'],
+            'scarico': (i, i + w), 'stazione': peso['stazione'], 'confidence': conf}
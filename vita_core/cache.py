@@ -0,0 +1,128 @@
+import hashlib
+import os
+import pickle
+import sys
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from vita_core.ingest import split_trial
+
+# ============================
+# CACHE DEI RISULTATI PER STADIO
+# ============================
+# Ogni stadio (load, preprocess, analyze, ...) è memorizzato con una chiave che combina la
+# chiave dello stadio precedente e i propri parametri: cambiando solo la soglia di volo si
+# ricalcola solo analyze. Livello in memoria LRU limitato in byte e numero di voci, più un
+# livello opzionale su disco (pickle) che sopravvive ai riavvii.
+
+def make_key(*parti):
+    return hashlib.blake2b(repr(parti).encode("utf-8"), digest_size=16).hexdigest()
+
+_hash_file = {}
+
+def file_key(path):
+    # Hash del contenuto, ricalcolato solo se cambiano dimensione o mtime.
+    # Foglio di una cartella Excel: hash della cartella più il nome del foglio.
+    path, foglio = split_trial(path)
+    if foglio is not None:
+        return make_key(file_key(path), foglio)
+    st = os.stat(path)
+    ident = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if ident not in _hash_file:
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for blocco in iter(lambda: f.read(1 << 20), b""):
+                h.update(blocco)
+        _hash_file[ident] = h.hexdigest()
+    return _hash_file[ident]
+
+def _sizeof(obj):
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=False).sum())
+    if isinstance(obj, (pd.Series, np.ndarray)):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sum(_sizeof(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(_sizeof(v) for v in obj)
+    return sys.getsizeof(obj)
+
+class StageCache:
+    def __init__(self, max_bytes=512 * 2**20, max_entries=64, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._voci = OrderedDict()   # chiave -> (valore, byte)
+        self._byte = 0
+        self.hits = {}
+        self.misses = {}
+        self.disk_hits = {}
+
+    def _conta(self, contatore, stadio):
+        contatore[stadio] = contatore.get(stadio, 0) + 1
+
+    def _metti(self, key, valore):
+        dim = _sizeof(valore)
+        if dim > self.max_bytes:
+            return
+        if key in self._voci:
+            self._byte -= self._voci.pop(key)[1]
+        self._voci[key] = (valore, dim)
+        self._byte += dim
+        while self._voci and (self._byte > self.max_bytes or len(self._voci) > self.max_entries):
+            _, (_, d) = self._voci.popitem(last=False)
+            self._byte -= d
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pkl")
+
+    def get_or_compute(self, stadio, key, fn):
+        if key in self._voci:
+            self._voci.move_to_end(key)
+            self._conta(self.hits, stadio)
+            return self._voci[key][0]
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), "rb") as f:
+                    valore = pickle.load(f)
+                self._conta(self.disk_hits, stadio)
+                self._metti(key, valore)
+                return valore
+            except FileNotFoundError:
+                pass
+            except Exception:
+                # Voce illeggibile (troncata, scritta da un'altra versione di pandas/numpy,
+                # classe non più importabile, ...): si elimina e si ricalcola
+                try:
+                    os.remove(self._disk_path(key))
+                except OSError:
+                    pass
+        self._conta(self.misses, stadio)
+        valore = fn()
+        self._metti(key, valore)
+        if self.disk_dir:
+            try:
+                os.makedirs(self.disk_dir, exist_ok=True)
+                tmp = self._disk_path(key) + ".tmp"
+                with open(tmp, "wb") as f:
+                    pickle.dump(valore, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, self._disk_path(key))
+            except OSError as e:
+                print(f"Cache su disco non scritta: {e}")
+        return valore
+
+    def clear(self, disk=False):
+        self._voci.clear()
+        self._byte = 0
+        if disk and self.disk_dir and os.path.isdir(self.disk_dir):
+            for f in os.listdir(self.disk_dir):
+                if f.endswith(".pkl"):
+                    os.remove(os.path.join(self.disk_dir, f))
+
+    def stats(self):
+        stadi = sorted(set(self.hits) | set(self.misses) | set(self.disk_hits))
+        return {s: {'hit': self.hits.get(s, 0), 'disk': self.disk_hits.get(s, 0),
+                    'miss': self.misses.get(s, 0)} for s in stadi} | {
+                '_memoria': {'voci': len(self._voci), 'byte': self._byte}}
@@ -0,0 +1,284 @@
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from vita_core.metrics import GRUPPI
+from vita_core import profiling
+from vita_core.profiling import profiled
+from vita_core.trends import parse_valori, pre_post, trend_table
+
+# ============================
+# CONFRONTO PRE/POST: CALCOLO E PAGINE PDF
+# ============================
+# Usato da compare.py, compare_new.py e dalla riga di comando di squadra. Nessun import di
+# tkinter; matplotlib viene importato solo dentro le funzioni che disegnano, così il modulo
+# si carica in fretta nei processi worker e negli script senza grafici.
+
+def _parametri(df):
+    # Nomi ripuliti e valori numerici di un CSV Parametro/Valore, prima riga per nome
+    nomi = df['Parametro'].astype(str).str.strip()
+    valori = parse_valori(df['Valore'])
+    if not nomi.is_unique:
+        prima = ~nomi.duplicated().to_numpy()
+        nomi, valori = nomi[prima], valori[prima]
+    return pd.Index(nomi), valori.to_numpy()
+
+@profiled("merge_sessions")
+def merge_sessions(sessioni):
+    # Confronto per chiave Parametro tra la prima e l'ultima sessione (DataFrame
+    # Parametro/Valore); solo i parametri presenti in entrambe, ordine delle righe come nel
+    # primo CSV. Pre/post: allineamento diretto per nome; con più sessioni passa dal motore
+    # di andamento (sessioni numerate per posizione nella lista, vita_core.trends).
+    if len(sessioni) == 2:
+        nomi_pre, pre = _parametri(sessioni[0])
+        nomi_post, post = _parametri(sessioni[1])
+        j = nomi_post.get_indexer(nomi_pre)
+        comuni = j >= 0
+        pre, post = pre[comuni], post[j[comuni]]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            diff = (post - pre) / pre * 100
+        return pd.DataFrame({'Parametro': nomi_pre[comuni], 'Valore_Pre': pre, 'Valore_Post': post, 'Diff %': diff})
+    pezzi = [_parametri(df) for df in sessioni]
+    lungo = pd.concat([pd.DataFrame({'atleta': '', 'data': k, 'parametro': nomi, 'valore': valori})
+                       for k, (nomi, valori) in enumerate(pezzi)], ignore_index=True)
+    lungo['data'] = pd.to_datetime(lungo['data'], unit='D')
+    comuni = pezzi[0][0].intersection(pezzi[-1][0])
+    merged = pre_post(trend_table(lungo), 1, len(sessioni)).drop(columns='atleta')
+    merged = merged[merged['Parametro'].isin(comuni)]
+    ordine = {p: i for i, p in enumerate(dict.fromkeys(lungo['parametro']))}
+    return merged.sort_values('Parametro', key=lambda c: c.map(ordine), ignore_index=True)
+
+# ---------- confronto CMJ di compare.py (DataFrame di metrics.compare_frame) ----------
+
+COLORI_ESITO = {1.0: 'green', -1.0: 'red'}   # migliorato / peggiorato, altrimenti grigio
+
+def group_figures(df):
+    # Un grafico a barre Pre/Post per gruppo dello schema, nell'ordine di GRUPPI
+    from matplotlib.figure import Figure
+    figure = []
+    for titolo in GRUPPI:
+        subset = df[df['Gruppo'] == titolo]
+        if subset.empty:
+            continue
+        fig = Figure(figsize=(8,4))
+        ax = fig.add_subplot()
+        x = np.arange(len(subset))
+        width = 0.35
+        ax.bar(x, subset['Valore_Pre'], width=width, label='Pre', color='skyblue')
+        ax.bar(x + width, subset['Valore_Post'], width=width, label='Post', color='orange')
+        ax.set_xticks(x + width/2)
+        ax.set_xticklabels(subset['Parametro'], rotation=45, ha='right')
+        ax.set_ylabel('Valore')
+        ax.set_title(f'Confronto Pre vs Post - {titolo}')
+        ax.legend()
+        ax.grid(alpha=0.3)
+        fig.tight_layout()
+        figure.append(fig)
+    return figure
+
+def diff_figure(df):
+    # Variazioni percentuali colorate secondo la direzione di miglioramento del parametro
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(10,4))
+    ax = fig.add_subplot()
+    x = np.arange(len(df))
+    ax.bar(x, df['Diff (%)'], color=[COLORI_ESITO.get(e, 'grey') for e in df['Esito']])
+    ax.set_xticks(x)
+    ax.set_xticklabels(df['Parametro'], rotation=45, ha='right')
+    ax.set_ylabel('Variazione (%)')
+    ax.set_title('Variazioni percentuali Pre vs Post')
+    ax.grid(alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+def table_figure(df):
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(10,6))
+    ax = fig.add_subplot()
+    ax.axis('off')
+    table = ax.table(cellText=df[['Parametro','Pre','Post']].values.tolist(), colLabels=['Parametro','Pre','Post'],
+                     loc='center', cellLoc='center')
+    table.auto_set_font_size(False)
+    table.set_fontsize(12)
+    table.scale(1.2,1.5)
+    ax.set_title("Tabella Pre vs Post", fontsize=16, fontweight='bold')
+    return fig
+
+@profiled("write_compare_pdf", campioni=lambda argomenti, r: len(argomenti['df']))
+def write_compare_pdf(file_path, df):
+    from matplotlib.backends.backend_pdf import PdfPages
+    with PdfPages(file_path) as pdf:
+        for fig in [table_figure(df)] + group_figures(df) + [diff_figure(df)]:
+            pdf.savefig(fig)
+
+# ---------- confronto di compare_new.py ----------
+
+def comparison_pages(df, atleta=None):
+    # Le tre pagine del confronto come Figure (senza pyplot: anche nei processi worker)
+    from matplotlib.figure import Figure
+    suffisso = f" - {atleta}" if atleta else ""
+
+    # --- PAGINA 1: TABELLA E CONFRONTO ALTEZZE ---
+    fig1 = Figure(figsize=(8.5, 11))
+    ax_t, ax_h = fig1.subplots(2, 1, gridspec_kw={'height_ratios': [0.7, 1.3]})
+    ax_t.axis('off')
+    vals = df[['Parametro', 'Valore_Pre', 'Valore_Post', 'Diff %']].round(2).values
+    table = ax_t.table(cellText=vals, colLabels=["Parametro", "Pre", "Post", "Var %"], loc='center', cellLoc='center')
+    table.auto_set_font_size(False); table.set_fontsize(10); table.scale(1, 2)
+    ax_t.set_title("SINTESI COMPARATIVA" + suffisso, fontsize=14, fontweight='bold', pad=20)
+
+    # Solo Altezze
+    h_df = df[df['Parametro'].str.contains('Altezza', case=False)]
+    x_h = np.arange(len(h_df))
+    ax_h.bar(x_h - 0.17, h_df['Valore_Pre'], 0.35, label='Iniziale (Pre)', color="#30E91F", edgecolor='black')
+    ax_h.bar(x_h + 0.17, h_df['Valore_Post'], 0.35, label='Finale (Post)', color='#CE44B7', edgecolor='black')
+    ax_h.set_xticks(x_h); ax_h.set_xticklabels(h_df['Parametro'])
+    ax_h.set_ylabel("Centimetri (cm)"); ax_h.legend(); ax_h.grid(axis='y', alpha=0.3)
+    ax_h.set_title("EVOLUZIONE ALTEZZE DI SALTO", fontsize=12, fontweight='bold')
+    fig1.tight_layout(pad=4.0)
+
+    # --- PAGINA 2: CONFRONTO INDICI (EUR, RSI, STIFFNESS) ---
+    fig2 = Figure(figsize=(8.5, 6))
+    ax_i = fig2.add_subplot()
+    i_df = df[~df['Parametro'].str.contains('Altezza', case=False)]
+    x_i = np.arange(len(i_df))
+    ax_i.bar(x_i - 0.17, i_df['Valore_Pre'], 0.35, label='Pre', color="#30E91F", alpha=0.7, edgecolor='black')
+    ax_i.bar(x_i + 0.17, i_df['Valore_Post'], 0.35, label='Post', color="#CE44B7", alpha=0.7, edgecolor='black')
+    ax_i.set_xticks(x_i); ax_i.set_xticklabels(i_df['Parametro'], rotation=15)
+    ax_i.set_title("INDICI NEUROMUSCOLARI E REATTIVITÀ" + suffisso, fontsize=12, fontweight='bold')
+    ax_i.legend(); ax_i.grid(axis='y', alpha=0.3)
+    fig2.tight_layout(pad=4.0)
+
+    # --- PAGINA 3: VARIAZIONE PERCENTUALE (IMPATTO VISIVO) ---
+    fig3 = Figure(figsize=(8.5, 8))
+    ax3 = fig3.add_subplot()
+    colors = ['#4CAF50' if v >= 0 else "#AA1949" for v in df['Diff %']]
+    bars = ax3.barh(df['Parametro'], df['Diff %'], color=colors, edgecolor='black', height=0.6)
+    
+    # Linea centrale sullo 0
+    ax3.axvline(0, color='black', linewidth=1.5)
+    
+    # Imposta limite fisso a +/- 100 per impatto grafico
+    limit = max(100, df['Diff %'].abs().max() + 20)
+    ax3.set_xlim(-limit, limit)
+    
+    ax3.set_title("VARIAZIONE PERCENTUALE DELLE PERFORMANCE (%)" + suffisso, fontsize=14, fontweight='bold', pad=20)
+    
+    # Label dentro le barre
+    for bar in bars:
+        width = bar.get_width()
+        # Posiziona il testo: se la barra è piccola lo mette fuori, se grande lo mette dentro
+        x_pos = width/2 if abs(width) > limit/4 else (width + (5 if width > 0 else -15))
+        ax3.text(x_pos, bar.get_y() + bar.get_height()/2, f'{width:+.1f}%', 
+                 va='center', ha='center', fontweight='bold', 
+                 color='white' if abs(width) > limit/4 else 'black')
+
+    ax3.grid(axis='x', linestyle='--', alpha=0.4)
+    ax3.invert_yaxis() # Parametri dall'alto verso il basso
+    fig3.tight_layout(pad=4.0)
+    return [fig1, fig2, fig3]
+
+@profiled("write_comparison_pdf", campioni=lambda argomenti, r: len(argomenti['df']))
+def write_comparison_pdf(path, df, atleta=None, pdf=None):
+    # pdf: PdfPages già aperto (report di squadra unico), altrimenti un file nuovo
+    from matplotlib.backends.backend_pdf import PdfPages
+    if pdf is not None:
+        _salva_pagine(pdf, df, atleta)
+        return
+    with PdfPages(path) as out:
+        _salva_pagine(out, df, atleta)
+
+def _salva_pagine(pdf, df, atleta):
+    for fig in comparison_pages(df, atleta):
+        pdf.savefig(fig)
+
+# ============================
+# REPORT DI SQUADRA SENZA GUI
+# ============================
+# Coppie pre/post per atleta da una cartella (ATLETA_pre.csv / ATLETA_post.csv, anche
+# "pre"/"post" maiuscoli o separati da spazio o trattino) oppure da un manifest con colonne
+# Atleta, Pre, Post. Un PDF per atleta in processi paralleli e, se richiesto, un PDF unico.
+
+NOME_FASE = re.compile(r"^(?P<atleta>.+?)[\s_\-]*(?P<fase>pre|post)$", re.IGNORECASE)
+
+def find_pairs(cartella):
+    trovati = {}
+    for f in sorted(os.listdir(cartella)):
+        stem, ext = os.path.splitext(f)
+        m = NOME_FASE.match(stem)
+        if ext.lower() == ".csv" and m:
+            trovati.setdefault(m.group('atleta'), {})[m.group('fase').lower()] = os.path.join(cartella, f)
+    return [(a, v['pre'], v['post']) for a, v in trovati.items() if 'pre' in v and 'post' in v]
+
+def read_pairs_manifest(path):
+    df = pd.read_csv(path, dtype=str, sep=None, engine="python")
+    df.columns = df.columns.str.strip().str.lower()
+    base = os.path.dirname(os.path.abspath(path))
+    percorso = lambda p: p if os.path.isabs(p) else os.path.join(base, p)
+    return [(r['atleta'].strip(), percorso(r['pre'].strip()), percorso(r['post'].strip()))
+            for r in df.dropna(subset=['atleta', 'pre', 'post']).to_dict('records')]
+
+def _load_report(path):
+    df = pd.read_csv(path)
+    df.columns = df.columns.str.strip()
+    return df
+
+@profiled("report_atleta")
+def _report_job(atleta, pre, post, out_dir):
+    t0 = time.perf_counter()
+    try:
+        df = merge_sessions([_load_report(pre), _load_report(post)])
+        nome = re.sub(r'[^\w\-]+', '_', atleta)
+        path = os.path.join(out_dir, f"Confronto_{nome}.pdf")
+        write_comparison_pdf(path, df, atleta)
+        return atleta, path, df, time.perf_counter() - t0, None
+    except Exception as e:
+        return atleta, None, None, time.perf_counter() - t0, f"{type(e).__name__}: {e}"
+
+def merge_pdfs(paths, destinazione):
+    # Unione dei PDF già scritti con pypdf (opzionale); False se non è installato
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        return False
+    writer = PdfWriter()
+    for p in paths:
+        writer.append(p)
+    with open(destinazione, "wb") as f:
+        writer.write(f)
+    return True
+
+def run_team(coppie, out_dir, workers=None, unito=None, log=print):
+    os.makedirs(out_dir, exist_ok=True)
+    fatti, errori = [], []
+    t_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [profiling.submit(pool, _report_job, a, pre, post, out_dir) for a, pre, post in coppie]
+        for fut in as_completed(futures):
+            atleta, path, df, durata, errore = profiling.result(fut)
+            if errore is not None:
+                errori.append((atleta, errore))
+                log(f"[ERRORE] {atleta}: {errore}")
+                continue
+            log(f"[OK] {atleta}: {os.path.basename(path)} ({durata:.2f} s)")
+            fatti.append((atleta, path, df))
+    t_tot = time.perf_counter() - t_start
+    log(f"Completati {len(fatti)}/{len(coppie)} report in {t_tot:.2f} s "
+        f"({len(fatti) / t_tot if t_tot > 0 else 0:.1f} report/s)")
+
+    if unito and fatti:
+        from matplotlib.backends.backend_pdf import PdfPages
+        fatti.sort(key=lambda r: r[0])
+        t0 = time.perf_counter()
+        with profiling.stage("pdf_squadra", file=unito, campioni=len(fatti)):
+            if not merge_pdfs([p for _, p, _ in fatti], unito):
+                # Senza pypdf: le pagine vengono ridisegnate qui, una dopo l'altra
+                with PdfPages(unito) as pdf:
+                    for atleta, _, df in fatti:
+                        write_comparison_pdf(None, df, atleta, pdf)
+        log(f"Report di squadra: {unito} ({time.perf_counter() - t0:.2f} s)")
+    return fatti, errori
@@ -0,0 +1,134 @@
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from vita_core.ingest import COLONNE, is_excel, save_capture_cache, trial_path
+from vita_core.profiling import profiled
+
+# ============================
+# CARTELLE EXCEL DELLA PEDANA -> CSV PER FOGLIO
+# ============================
+# Ogni foglio è una prova. Le righe vengono lette in streaming (openpyxl in sola lettura,
+# solo le prime `colonne` colonne, valori già convertiti: numeri, testo, date) e scritte
+# nel CSV man mano: in memoria resta una riga alla volta, non la cartella intera.
+# openpyxl in sola lettura scorre all'apertura tutti i fogli senza <dimension> per
+# misurarli: la cartella viene aperta una volta per processo e riusata finché il file non
+# cambia. I fogli vengono convertiti in processi paralleli, ognuno con la propria apertura
+# (openpyxl non è condivisibile tra thread). I vecchi .xls non hanno lettura in streaming
+# e passano da pandas un foglio alla volta. Con binario=True accanto a ogni CSV viene
+# scritta anche la cache .npy di vita_core.ingest, così load_capture non rilegge il testo.
+# In alternativa load_sheet porta un foglio direttamente agli array di load_capture, senza
+# CSV.
+
+def _xlsx(path):
+    return os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm")
+
+def expand_trials(path):
+    # Una prova per foglio per le cartelle Excel, il file stesso altrimenti
+    return [trial_path(path, f) for f in sheet_names(path)] if is_excel(path) else [path]
+
+_aperta = {}   # cartella aperta in questo processo: {'chiave': (pid, path, mtime, size), 'wb': ...}
+
+def _apri(path):
+    # La cartella aperta si riusa solo nel processo che l'ha aperta: un worker nato con fork
+    # eredita lo stesso descrittore (e la stessa posizione nel file) e deve riaprirla.
+    from openpyxl import load_workbook
+    st = os.stat(path)
+    chiave = (os.getpid(), os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    if _aperta.get('chiave') != chiave:
+        if _aperta.get('chiave', (None,))[0] != os.getpid():
+            _aperta.clear()   # ereditata dal padre: non chiusa qui, è ancora sua
+        chiudi()
+        _aperta.update(chiave=chiave, wb=load_workbook(path, read_only=True, data_only=True))
+    return _aperta['wb']
+
+def chiudi():
+    if _aperta:
+        _aperta.pop('wb').close()
+        _aperta.clear()
+
+def sheet_names(path):
+    if _xlsx(path):
+        return list(_apri(path).sheetnames)
+    return list(pd.ExcelFile(path).sheet_names)
+
+def iter_rows(path, foglio, colonne=3):
+    # Tuple con i valori delle prime `colonne` colonne, una riga alla volta
+    if _xlsx(path):
+        yield from _apri(path)[foglio].iter_rows(max_col=colonne, values_only=True)
+    else:
+        df = pd.read_excel(path, sheet_name=foglio, header=None, usecols=range(colonne))
+        yield from df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+
+def _numero(v):
+    if isinstance(v, bool) or v is None:
+        return np.nan
+    if isinstance(v, (int, float)):
+        return float(v)
+    try:
+        return float(str(v).strip())
+    except ValueError:
+        return np.nan
+
+@profiled("load_sheet")
+def load_sheet(path, foglio=None, colonne=3):
+    # Array tempo/SX/DX di un foglio (default il primo) come parse_capture: una sola lettura
+    # delle colonne A:C, righe senza tempo numerico (intestazioni) scartate.
+    if foglio is None:
+        foglio = sheet_names(path)[0]
+    n = len(COLONNE)
+    righe = [tuple(r[:n]) + (None,) * (n - len(r)) for r in iter_rows(path, foglio, colonne)]
+    df = pd.DataFrame.from_records(righe, columns=list(COLONNE)).apply(pd.to_numeric, errors="coerce")
+    df = df[df["time"].notna()]
+    if df.empty:
+        raise ValueError(f"{os.path.basename(path)} [{foglio}]: nessuna riga numerica nelle colonne A:C")
+    return {c: df[c].to_numpy(dtype=np.float64) for c in COLONNE}
+
+@profiled("convert_sheet", campioni=lambda argomenti, esito: esito['righe'])
+def convert_sheet(path, foglio, out_dir, colonne=3, binario=False):
+    # Un foglio -> out_dir/<foglio>.csv (più la cache binaria se richiesta)
+    t0 = time.perf_counter()
+    csv_path = os.path.join(out_dir, f"{foglio}.csv")
+    righe = 0
+    numeri = [] if binario else None
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for riga in iter_rows(path, foglio, colonne):
+            riga = tuple(riga) + (None,) * (colonne - len(riga))
+            if all(v is None for v in riga):
+                continue
+            writer.writerow(["" if v is None else v for v in riga])
+            righe += 1
+            if numeri is not None:
+                valori = [_numero(v) for v in riga[:len(COLONNE)]]
+                if not np.isnan(valori[0]):   # righe senza tempo (intestazioni) escluse come in parse_capture
+                    numeri.append(valori)
+    if numeri is not None:
+        a = np.array(numeri, dtype=np.float64).reshape(-1, len(COLONNE))
+        save_capture_cache(csv_path, {c: a[:, k] for k, c in enumerate(COLONNE)})
+    return {'foglio': foglio, 'csv': csv_path, 'righe': righe, 'secondi': time.perf_counter() - t0}
+
+def convert_workbook(path, out_dir, colonne=3, workers=None, binario=False, progress=None):
+    # Tutti i fogli; progress(fatti, totale, esito) dopo ogni foglio. workers=1: nel processo chiamante.
+    os.makedirs(out_dir, exist_ok=True)
+    fogli = sheet_names(path)
+    esiti = []
+    if workers == 1 or len(fogli) <= 1 or not _xlsx(path):
+        for foglio in fogli:
+            esiti.append(convert_sheet(path, foglio, out_dir, colonne, binario))
+            if progress is not None:
+                progress(len(esiti), len(fogli), esiti[-1])
+        return esiti
+    chiudi()   # i worker aprono la cartella per conto proprio
+    with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(fogli))) as pool:
+        futures = [pool.submit(convert_sheet, path, foglio, out_dir, colonne, binario) for foglio in fogli]
+        for fut in as_completed(futures):
+            esiti.append(fut.result())
+            if progress is not None:
+                progress(len(esiti), len(fogli), esiti[-1])
+    ordine = {f: i for i, f in enumerate(fogli)}
+    return sorted(esiti, key=lambda e: ordine[e['foglio']])
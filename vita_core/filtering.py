@@ -0,0 +1,176 @@
+import numpy as np
+
+# ============================
+# FILTRI SUI SEGNALI DI FORZA
+# ============================
+# Funzioni su array NumPy lungo un asse (default l'ultimo): un canale (n,), le due pedane
+# insieme (2, n) o un blocco di prove della stessa lunghezza (prove, n) in una sola chiamata.
+# - moving_average: media mobile in O(n) con somme cumulative, bordi come pandas
+#   rolling(min_periods=1) (finestra accorciata), NaN ignorati; centrata o all'indietro.
+# - butterworth: passa-basso (o passa-alto) a fase zero con sosfiltfilt, taglio in Hz
+#   rispetto alla frequenza di campionamento misurata sul tempo (sample_rate). Richiede
+#   scipy, importato solo qui.
+# - despike: mediana mobile; i campioni che se ne discostano più di `soglia` deviazioni
+#   robuste (MAD) vengono sostituiti dalla mediana.
+# Le finestre si indicano in secondi (finestra_s) oppure in campioni (finestra): in secondi
+# valgono lo stesso a 500 Hz o a 2 kHz. smooth applica una specifica {'tipo': ...} o una
+# lista di specifiche in sequenza; filter_trials applica la stessa specifica a prove di
+# lunghezze diverse, raggruppando quelle di uguale lunghezza in un blocco 2-D.
+
+MEDIA_CMJ = {'tipo': 'media', 'finestra_s': 0.003}   # 3 campioni a 1 kHz, come la vecchia rolling(3)
+MAD_SD = 1.4826   # MAD -> deviazione standard per rumore gaussiano
+
+def sample_rate(time_s):
+    # Frequenza di campionamento (Hz) dal passo mediano del tempo in secondi; NaN se non stimabile
+    dt = np.diff(np.asarray(time_s, dtype=np.float64))
+    dt = dt[np.isfinite(dt) & (dt > 0)]
+    return 1.0 / np.median(dt) if len(dt) else np.nan
+
+def window_samples(finestra_s, fs):
+    # Campioni di una finestra in secondi (almeno 1), arrotondati per eccesso a metà: stessa
+    # finestra anche se fs stimato da tempi diversi differisce per arrotondamento
+    if not np.isfinite(fs):
+        return 1
+    return max(int(np.floor(finestra_s * fs + 0.5 + 1e-6)), 1)
+
+def window_from_spec(spec, fs, chiave='finestra'):
+    # Campioni della finestra di una specifica: <chiave>_s in secondi se presente, altrimenti <chiave> in campioni
+    if spec.get(chiave + '_s') is not None:
+        return window_samples(spec[chiave + '_s'], fs)
+    return int(spec.get(chiave, 1))
+
+def moving_average(x, finestra, axis=-1, centrata=True):
+    # centrata: L = finestra // 2 campioni prima e R = (finestra - 1) // 2 dopo, come
+    # rolling(center=True); altrimenti gli ultimi `finestra` campioni (rolling all'indietro).
+    x = np.asarray(x, dtype=np.float64)
+    finestra = int(finestra)
+    if finestra <= 1 or x.shape[axis] == 0:
+        return x.copy()
+    x = np.moveaxis(x, axis, -1)
+    n = x.shape[-1]
+    L, R = (finestra // 2, (finestra - 1) // 2) if centrata else (finestra - 1, 0)
+    if np.isnan(np.sum(x)):
+        return np.moveaxis(_media_con_nan(x, L, R), -1, axis)
+
+    # Somme cumulative dei valori centrati sulla media della riga (meno errore di
+    # arrotondamento su 10^7 campioni), scritte in un solo buffer con lo zero iniziale
+    centro = x.mean(axis=-1, keepdims=True)
+    s = np.empty(x.shape[:-1] + (n + 1,))
+    s[..., 0] = 0.0
+    np.subtract(x, centro, out=s[..., 1:])
+    np.cumsum(s[..., 1:], axis=-1, out=s[..., 1:])
+    media = np.empty(x.shape)
+    # Finestre complete con fette contigue, i bordi (finestra accorciata) a parte
+    a, b = (L, n - R) if n >= finestra else (0, 0)
+    if b > a:
+        np.subtract(s[..., a + R + 1:b + R + 1], s[..., a - L:b - L], out=media[..., a:b])
+        media[..., a:b] /= finestra
+    bordo = np.r_[0:a, b:n]
+    lo, hi = np.maximum(bordo - L, 0), np.minimum(bordo + R + 1, n)
+    media[..., bordo] = (s[..., hi] - s[..., lo]) / (hi - lo)
+    media += centro
+    return np.moveaxis(media, -1, axis)
+
+def _media_con_nan(x, L, R):
+    # Come moving_average con i NaN esclusi dal conteggio (NaN se la finestra non ha valori)
+    n = x.shape[-1]
+    nan = np.isnan(x)
+    validi = (~nan).sum(axis=-1, keepdims=True)
+    centro = np.where(nan, 0.0, x).sum(axis=-1, keepdims=True) / np.maximum(validi, 1)
+    zero = np.zeros(x.shape[:-1] + (1,))
+    s = np.concatenate((zero, np.cumsum(np.where(nan, 0.0, x - centro), axis=-1)), axis=-1)
+    conteggi = np.concatenate((zero, np.cumsum(~nan, axis=-1)), axis=-1)
+    idx = np.arange(n)
+    lo, hi = np.maximum(idx - L, 0), np.minimum(idx + R + 1, n)
+    conta = conteggi[..., hi] - conteggi[..., lo]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = (s[..., hi] - s[..., lo]) / conta + centro
+    return np.where(conta > 0, media, np.nan)
+
+def butterworth(x, fs, taglio_hz, ordine=4, axis=-1, tipo="lowpass"):
+    # Filtro a fase zero (avanti e indietro: ordine effettivo doppio, nessun ritardo)
+    try:
+        from scipy.signal import butter, sosfiltfilt
+    except ImportError as e:
+        raise ImportError("il filtro Butterworth richiede scipy (pip install scipy)") from e
+    x = np.asarray(x, dtype=np.float64)
+    nyquist = fs / 2
+    if not 0 < taglio_hz < nyquist:
+        raise ValueError(f"taglio {taglio_hz} Hz fuori da (0, {nyquist:g}) Hz per fs = {fs:g} Hz")
+    sos = butter(ordine, taglio_hz, btype=tipo, fs=fs, output='sos')
+    # padlen predefinito di sosfiltfilt ridotto per le prove più corte
+    padlen = min(3 * (2 * len(sos) + 1 - min((sos[:, 2] == 0).sum(), (sos[:, 5] == 0).sum())),
+                 x.shape[axis] - 1)
+    return sosfiltfilt(sos, x, axis=axis, padlen=max(padlen, 0))
+
+def _mediana_mobile(x, finestra, blocco=2**18):
+    # Mediana centrata lungo l'ultimo asse, bordi replicati; a blocchi per non copiare
+    # n × finestra valori tutti insieme
+    meta = finestra // 2
+    esteso = np.pad(x, [(0, 0)] * (x.ndim - 1) + [(meta, meta)], mode='edge')
+    out = np.empty_like(x)
+    for a in range(0, x.shape[-1], blocco):
+        b = min(a + blocco, x.shape[-1])
+        finestre = np.lib.stride_tricks.sliding_window_view(esteso[..., a:b + 2 * meta], finestra, axis=-1)
+        out[..., a:b] = np.median(finestre, axis=-1)
+    return out
+
+def despike(x, finestra=5, soglia=5.0, axis=-1):
+    # Mediana mobile centrata su `finestra` campioni; i campioni con |x - mediana| oltre
+    # soglia · MAD_SD · MAD dei residui della riga diventano la mediana.
+    x = np.asarray(x, dtype=np.float64)
+    finestra = int(finestra) | 1   # dispari: mediana centrata
+    if finestra <= 1 or x.shape[axis] == 0:
+        return x.copy()
+    x = np.moveaxis(x, axis, -1)
+    mediana = _mediana_mobile(x, finestra)
+    residuo = np.abs(x - mediana)
+    mad = np.nanmedian(residuo, axis=-1, keepdims=True)
+    # MAD nullo (segnale piatto a tratti): vale il residuo medio, altrimenti ogni scostamento sarebbe un picco
+    scala = MAD_SD * np.where(mad > 0, mad, np.nanmean(residuo, axis=-1, keepdims=True))
+    picchi = residuo > soglia * scala
+    return np.moveaxis(np.where(picchi, mediana, x), -1, axis)
+
+def smooth(x, fs, filtro=MEDIA_CMJ, axis=-1):
+    # filtro: {'tipo': 'media'|'butterworth'|'mediana', ...} oppure una lista applicata in ordine
+    #   media:       finestra_s | finestra, centrata (default True)
+    #   butterworth: taglio_hz, ordine (default 4), passa ('lowpass' | 'highpass')
+    #   mediana:     finestra_s | finestra (default 5 campioni), soglia (default 5 MAD)
+    if filtro is None:
+        return np.asarray(x, dtype=np.float64)
+    if isinstance(filtro, (list, tuple)):
+        for f in filtro:
+            x = smooth(x, fs, f, axis)
+        return x
+    tipo = filtro['tipo']
+    if tipo == 'media':
+        return moving_average(x, window_from_spec(filtro, fs), axis, filtro.get('centrata', True))
+    if tipo == 'butterworth':
+        return butterworth(x, fs, filtro['taglio_hz'], filtro.get('ordine', 4), axis, filtro.get('passa', 'lowpass'))
+    if tipo == 'mediana':
+        spec = dict({'finestra': 5}, **filtro)
+        return despike(x, window_from_spec(spec, fs), spec.get('soglia', 5.0), axis)
+    raise ValueError(f"filtro sconosciuto: {tipo}")
+
+def force_filter(finestra_media=None, filtro=None):
+    # Specifica per la forza filtrata di analyze_cmj_force/analyze_session: il filtro
+    # indicato, altrimenti una media di finestra_media campioni (parametro storico),
+    # altrimenti MEDIA_CMJ (3 ms alla frequenza della prova)
+    if filtro is not None:
+        return filtro
+    return {'tipo': 'media', 'finestra': finestra_media} if finestra_media else MEDIA_CMJ
+
+def filter_trials(prove, fs, filtro=MEDIA_CMJ):
+    # Lista di array (n,) o (canali, n) di lunghezze diverse: un blocco 2-D per lunghezza,
+    # risultati nell'ordine delle prove. fs unico o uno per prova (blocchi per (n, fs)).
+    prove = [np.asarray(p, dtype=np.float64) for p in prove]
+    fs = np.broadcast_to(np.asarray(fs, dtype=np.float64), (len(prove),))
+    gruppi = {}
+    for i, p in enumerate(prove):
+        gruppi.setdefault((p.shape, float(fs[i])), []).append(i)
+    out = [None] * len(prove)
+    for (_, f), indici in gruppi.items():
+        blocco = smooth(np.stack([prove[i] for i in indici]), f, filtro, axis=-1)
+        for k, i in enumerate(indici):
+            out[i] = blocco[k]
+    return out
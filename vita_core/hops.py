@@ -0,0 +1,85 @@
+import numpy as np
+
+from vita_core.baseline import rolling_mean_std
+
+# ============================
+# SEGMENTAZIONE CONTATTI/VOLI NEI BALZELLI
+# ============================
+# Stato di contatto con isteresi: si entra in contatto sopra soglia_on e si esce sotto
+# soglia_off, in mezzo resta lo stato precedente (riempimento in avanti dell'ultimo evento
+# con maximum.accumulate, senza cicli). I contatti più brevi di tc_min (spike) vengono
+# tolti e i voli più brevi di tv_min (cali di segnale) uniti al contatto. Ogni balzo è un
+# contatto completo seguito dal suo volo; i balzi anomali (mediana ± n_mad·MAD su tc e tv)
+# vengono scartati e la finestra stazionaria è la sequenza di n_stabili balzi validi con il
+# periodo (tc + tv) meno variabile.
+
+def contact_state(forza, soglia_on=20, soglia_off=10):
+    forza = np.asarray(forza)
+    evento = np.zeros(len(forza), dtype=np.int8)
+    evento[forza > soglia_on] = 1
+    evento[forza < soglia_off] = -1
+    ultimo = np.where(evento != 0, np.arange(len(forza)), 0)
+    np.maximum.accumulate(ultimo, out=ultimo)
+    return evento[ultimo] > 0
+
+def _tratti(mask):
+    # Inizio e fine (inclusi) dei tratti True
+    fronti = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    return np.flatnonzero(fronti == 1), np.flatnonzero(fronti == -1) - 1
+
+def find_contacts(forza, time_s, soglia_on=20, soglia_off=10, tc_min=0.05, tv_min=0.05):
+    # Contatti (inizio, fine inclusi) dopo i filtri di durata minima.
+    time_s = np.asarray(time_s, dtype=np.float64)
+    n = len(time_s)
+    starts, ends = _tratti(contact_state(forza, soglia_on, soglia_off))
+    if len(starts) == 0:
+        return starts, ends
+    uscita = time_s[np.minimum(ends + 1, n - 1)]   # primo campione in volo
+    keep = uscita - time_s[starts] >= tc_min
+    starts, ends = starts[keep], ends[keep]
+    if len(starts) > 1:
+        volo = time_s[starts[1:]] - time_s[ends[:-1] + 1]
+        unisci = volo < tv_min
+        starts = np.concatenate((starts[:1], starts[1:][~unisci]))
+        ends = np.concatenate((ends[:-1][~unisci], ends[-1:]))
+    return starts, ends
+
+def _validi(x, n_mad):
+    med = np.median(x)
+    mad = 1.4826 * np.median(np.abs(x - med))
+    return np.abs(x - med) <= n_mad * mad if mad > 0 else np.isclose(x, med)
+
+def hop_metrics(forza, time_s, massa, soglia_on=20, soglia_off=10, tc_min=0.05, tv_min=0.05,
+                n_mad=3.0, n_stabili=10):
+    # Grandezze per balzo (array lunghi quanto i balzi) e maschere 'valid'/'steady'.
+    time_s = np.asarray(time_s, dtype=np.float64)
+    n = len(time_s)
+    starts, ends = find_contacts(forza, time_s, soglia_on, soglia_off, tc_min, tv_min)
+    # Contatti completi: né in corso a inizio file né ancora aperti a fine file
+    completi = (starts > 0) & (ends < n - 1)
+    starts, ends = starts[completi], ends[completi]
+    k = np.arange(max(len(starts) - 1, 0))   # balzo k: contatto k + volo fino al contatto k+1
+    uscita = time_s[ends[k] + 1]
+    tc = uscita - time_s[starts[k]]
+    tv = time_s[starts[k + 1]] - uscita
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rsi = tv / tc
+        k_vert = (massa * np.pi * tv) / (tc**2 * (tv + tc))
+
+    valid = np.zeros(len(k), dtype=bool)
+    steady = np.zeros(len(k), dtype=bool)
+    if len(k):
+        valid = _validi(tc, n_mad) & _validi(tv, n_mad)
+        pos = np.flatnonzero(valid)
+        if n_stabili and len(pos) > n_stabili:
+            periodo = tc[pos] + tv[pos]
+            media, sd = rolling_mean_std(periodo, n_stabili)
+            i = int(np.argmin(sd / media))
+            steady[pos[i:i + n_stabili]] = True
+        else:
+            steady = valid.copy()
+    return {
+        'contact_start': starts[k], 'contact_end': ends[k], 'next_contact': starts[k + 1],
+        'tc': tc, 'tv': tv, 'rsi': rsi, 'k_vert': k_vert,
+        'valid': valid, 'steady': steady,
+    }
@@ -0,0 +1,156 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# ============================
+# LETTURA FILE DI PEDANA + CACHE BINARIA
+# ============================
+# Il file di testo viene letto una sola volta con il parser C di pandas; le tre colonne
+# vengono salvate come .npy in una cartella nascosta accanto al file sorgente. Le letture
+# successive aprono i .npy in memory-map. La cache è valida finché percorso, mtime e
+# dimensione del sorgente non cambiano.
+# Una prova può essere anche un foglio di una cartella Excel, indicato come
+# "cartella.xlsx::Foglio" (trial_path): viene letto direttamente dal foglio (vita_core.excel),
+# colonne A:C, senza passare da un CSV intermedio.
+
+COLONNE = ("time", "pedana_sinistra", "pedana_destra")
+CACHE_DIR = ".cache_pedana"
+VERSIONE_CACHE = 1
+SEP_FOGLIO = "::"   # Excel non ammette ':' nei nomi dei fogli
+ESTENSIONI_EXCEL = (".xlsx", ".xlsm", ".xls")
+
+def trial_path(path, foglio):
+    return f"{path}{SEP_FOGLIO}{foglio}"
+
+def split_trial(path):
+    # (file, foglio); foglio None per i file di testo
+    file, sep, foglio = str(path).partition(SEP_FOGLIO)
+    return (file, foglio) if sep else (file, None)
+
+def trial_name(path):
+    # Nome per report ed export: "acquisizione" oppure "cartella_Foglio"
+    file, foglio = split_trial(path)
+    base = os.path.splitext(os.path.basename(file))[0]
+    return base if foglio is None else f"{base}_{foglio}"
+
+def is_excel(path):
+    return os.path.splitext(split_trial(path)[0])[1].lower() in ESTENSIONI_EXCEL
+
+def parse_capture(path):
+    df = pd.read_csv(path, sep=",", header=None, comment="#", engine="c",
+                     skip_blank_lines=True, on_bad_lines="skip")
+    df = df.iloc[:, :3]
+    if len(df.columns) < 3:
+        raise ValueError(f"{os.path.basename(path)}: servono almeno 3 colonne (tempo, SX, DX)")
+    df.columns = list(COLONNE)
+    if not all(pd.api.types.is_numeric_dtype(df[c]) for c in COLONNE):
+        # Righe di intestazione o testo: scartate, il resto convertito a numero
+        df = df.apply(pd.to_numeric, errors="coerce")
+        df = df[df["time"].notna()].reset_index(drop=True)
+    return {c: df[c].to_numpy(dtype=np.float64) for c in COLONNE}
+
+def _decimali(a, max_dec=4):
+    # Numero di decimali con cui i valori sono scritti nel file (None se più di max_dec).
+    finiti = a[np.isfinite(a)]
+    for k in range(max_dec + 1):
+        if np.array_equal(np.round(finiti, k), finiti):
+            return k
+    return None
+
+def _compatta(nome, a):
+    # Restituisce (array da salvare, decimali per ricostruire il float64 esatto).
+    if nome == "time":
+        if np.all(np.isfinite(a)) and np.array_equal(np.round(a), a) and np.abs(a).max(initial=0) < 2**31:
+            return a.astype(np.int32), 0
+        return a, None
+    k = _decimali(a)
+    if k is not None:
+        a32 = a.astype(np.float32)
+        if np.array_equal(np.round(a32.astype(np.float64), k), a, equal_nan=True):
+            return a32, k
+    return a, None
+
+def _cache_paths(path):
+    cartella = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+    base = os.path.join(cartella, os.path.basename(path))
+    return cartella, base + ".json", {c: f"{base}.{c}.npy" for c in COLONNE}
+
+def _chiave(path):
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+            "versione": VERSIONE_CACHE}
+
+def read_capture_cache(path):
+    # (array in memory-map nel formato compatto, decimali per colonna) se la cache binaria
+    # è valida per il file, altrimenti None. np.round(a.astype(float64), decimali[c])
+    # ridà i valori esatti del parse (decimali[c] None: l'array è già float64).
+    _, meta_path, npy_paths = _cache_paths(path)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("chiave") != _chiave(path):
+        return None
+    try:
+        dati = {c: np.load(npy_paths[c], mmap_mode="r") for c in COLONNE}
+    except (OSError, ValueError):
+        return None
+    return dati, meta["decimali"]
+
+def _leggi_cache(path, exact):
+    cache = read_capture_cache(path)
+    if cache is None:
+        return None
+    dati, decimali = cache
+    if exact:
+        for c in COLONNE:
+            k = decimali.get(c)
+            a = dati[c].astype(np.float64)
+            dati[c] = np.round(a, k) if k else a
+    return dati
+
+def _scrivi_cache(path, dati):
+    cartella, meta_path, npy_paths = _cache_paths(path)
+    try:
+        os.makedirs(cartella, exist_ok=True)
+        decimali = {}
+        for c in COLONNE:
+            a, k = _compatta(c, dati[c])
+            decimali[c] = k
+            tmp = npy_paths[c] + ".tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, a)
+            os.replace(tmp, npy_paths[c])
+        # Il .json per ultimo: una cache interrotta a metà non risulta valida
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"chiave": _chiave(path), "decimali": decimali}, f)
+    except OSError as e:
+        print(f"Cache non scritta per {os.path.basename(path)}: {e}")
+
+def save_capture_cache(path, dati):
+    # Cache per un file appena scritto da un convertitore che ha già i valori numerici
+    # (es. vita_core.excel): la prima load_capture non deve rileggere il testo.
+    _scrivi_cache(path, {c: np.asarray(dati[c], dtype=np.float64) for c in COLONNE})
+
+def load_capture(path, use_cache=True, exact=True):
+    # Dizionario {colonna: array}. Con exact=True i valori sono float64 identici al parse
+    # del testo; con exact=False restano nel formato compatto della cache (memory-map).
+    file, foglio = split_trial(path)
+    if foglio is not None or is_excel(file):
+        from vita_core.excel import load_sheet   # import qui: excel usa questo modulo
+        return load_sheet(file, foglio)
+    if use_cache:
+        dati = _leggi_cache(path, exact)
+        if dati is not None:
+            return dati
+    dati = parse_capture(path)
+    if use_cache:
+        _scrivi_cache(path, dati)
+    return dati
+
+def capture_frame(path, use_cache=True):
+    dati = load_capture(path, use_cache=use_cache)
+    return pd.DataFrame({c: dati[c] for c in COLONNE})
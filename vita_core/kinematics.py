@@ -0,0 +1,110 @@
+import numpy as np
+
+from vita_core.phases import g
+
+# ============================
+# CINEMATICA DEL CMJ DALLA FORZA (UNA PASSATA, ANCHE A LOTTI)
+# ============================
+# Accelerazione (F - BW)/m integrata con trapezi cumulativi dall'inizio del movimento
+# (velocità e spostamento nulli in stazione eretta) fino al take-off: velocità,
+# spostamento del centro di massa e potenza F·v. Le prove possono essere passate tutte
+# insieme come matrice (prove, campioni): ogni riga ha il proprio inizio, take-off e peso
+# corporeo, i campioni fuori da [inizio, take-off] valgono NaN.
+
+def _per_prova(valore, p, dtype):
+    return np.broadcast_to(np.asarray(valore, dtype=dtype), (p,)).copy()
+
+def _peso_da_stazione(F, t, start, finestra_bw):
+    # Media della forza nei finestra_bw secondi prima dell'inizio del movimento; se prima
+    # dell'inizio ci sono meno di 2 campioni, i primi finestra_bw secondi della prova.
+    j = np.arange(F.shape[1])
+    t_start = np.take_along_axis(t, start[:, None], axis=1)
+    prima = (j < start[:, None]) & (t >= t_start - finestra_bw)
+    inizio = t < t[:, :1] + finestra_bw
+    usa = np.where(prima.sum(axis=1, keepdims=True) >= 2, prima, inizio)
+    return np.where(usa, F, 0.0).sum(axis=1) / np.maximum(usa.sum(axis=1), 1)
+
+def _cumtrapz_mascherato(y, t, dentro):
+    # Integrale cumulativo lungo le righe, con incrementi solo tra campioni consecutivi
+    # entrambi dentro la finestra (le parti fuori possono contenere NaN).
+    inc = np.zeros_like(y)
+    passo = dentro[:, 1:] & dentro[:, :-1]
+    with np.errstate(invalid='ignore'):
+        np.copyto(inc[:, 1:], (y[:, 1:] + y[:, :-1]) * np.diff(t, axis=1) / 2, where=passo)
+    return np.cumsum(inc, axis=1)
+
+def cmj_kinematics(forza, time_s, takeoff_idx, start_idx=0, bw=None, massa=None,
+                   concentric_idx=None, finestra_bw=1.0):
+    # forza: (n,) oppure (prove, n); time_s: asse comune (n,) o della stessa forma di forza.
+    # takeoff_idx, start_idx, bw, massa, concentric_idx: scalari o un valore per prova.
+    # bw None: stimato in stazione eretta prima di start_idx. massa None: bw/g.
+    # concentric_idx None: inizio concentrica = prima velocità >= 0 dopo il minimo.
+    F = np.asarray(forza, dtype=np.float64)
+    singolo = F.ndim == 1
+    F = np.atleast_2d(F)
+    p, n = F.shape
+    t = np.broadcast_to(np.asarray(time_s, dtype=np.float64), F.shape)
+    start = _per_prova(start_idx, p, np.intp)
+    takeoff = _per_prova(takeoff_idx, p, np.intp)
+    bw = _peso_da_stazione(F, t, start, finestra_bw) if bw is None else _per_prova(bw, p, np.float64)
+    m = bw / g if massa is None else _per_prova(massa, p, np.float64)
+    righe = np.arange(p)
+    j = np.arange(n)
+    dentro = (j >= start[:, None]) & (j <= takeoff[:, None])
+
+    impulso = _cumtrapz_mascherato(F - bw[:, None], t, dentro)   # impulso netto (N·s)
+    vel = impulso / m[:, None]
+    disp = _cumtrapz_mascherato(vel, t, dentro)
+    pot = F * vel
+    lavoro = _cumtrapz_mascherato(pot, t, dentro)
+
+    # Minimo di velocità e inizio concentrica
+    i_vmin = np.argmin(np.where(dentro, vel, np.inf), axis=1)
+    if concentric_idx is None:
+        # -1e-9 m/s: una velocità nulla proprio su un campione esce dall'integrale come
+        # -1e-16 circa e non deve spostare l'inizio concentrica al campione dopo
+        cand = dentro & (j >= i_vmin[:, None]) & (vel >= -1e-9)
+        conc = np.where(cand.any(axis=1), np.argmax(cand, axis=1), takeoff)
+    else:
+        conc = _per_prova(concentric_idx, p, np.intp)
+    fase_conc = dentro & (j >= conc[:, None])
+
+    def _in(a, idx):
+        return a[righe, idx]
+
+    t_to, t_conc, t_vmin = _in(t, takeoff), _in(t, conc), _in(t, i_vmin)
+    v_to = _in(vel, takeoff)
+    altezza = np.where(v_to > 0, v_to**2 / (2 * g), 0.0)
+    durata_conc = t_to - t_conc
+    tempo_takeoff = t_to - _in(t, start)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        metriche = {
+            'bw': bw,
+            'massa': m,
+            'min_velocity_idx': i_vmin,
+            'concentric_start_idx': conc,
+            'takeoff_velocity': v_to,
+            'jump_height': altezza,
+            'peak_power': np.max(np.where(fase_conc, pot, -np.inf), axis=1),
+            'mean_power': np.where(durata_conc > 0, (_in(lavoro, takeoff) - _in(lavoro, conc)) / durata_conc, np.nan),
+            'cm_depth': -np.min(np.where(dentro, disp, np.inf), axis=1),
+            'braking_impulse': _in(impulso, conc) - _in(impulso, i_vmin),
+            'braking_rfd': np.where(t_conc > t_vmin, (_in(F, conc) - _in(F, i_vmin)) / (t_conc - t_vmin), np.nan),
+            'time_to_takeoff': tempo_takeoff,
+            'rsi_mod': np.where(tempo_takeoff > 0, altezza / tempo_takeoff, np.nan),
+        }
+
+    # Prove senza movimento prima del take-off: nessuna metrica
+    valide = takeoff > start
+    for k, v in metriche.items():
+        if v.dtype.kind == 'f':
+            v[~valide] = np.nan
+            v[np.isinf(v)] = np.nan
+
+    vel[~dentro] = np.nan
+    disp[~dentro] = np.nan
+    pot[~dentro] = np.nan
+    if singolo:
+        vel, disp, pot = vel[0], disp[0], pot[0]
+        metriche = {k: v[0].item() for k, v in metriche.items()}
+    return {'velocity': vel, 'displacement': disp, 'power': pot, 'metrics': metriche}
@@ -0,0 +1,150 @@
+import numpy as np
+from matplotlib.figure import Figure
+
+from vita_core.report import envelope_decimate
+
+# ============================
+# GRAFICI DELLA FINESTRA CMJ (CANVAS PERSISTENTE)
+# ============================
+# Figura, assi e canvas vengono creati una sola volta: a ogni nuova analisi si aggiornano i
+# dati delle linee, mentre i marker (take-off, landing, inizio eccentrica/concentrica, Fmax)
+# sono artisti animati ridisegnati con blitting sopra lo sfondo salvato. Le tracce sono
+# decimate alla larghezza in pixel dell'asse per l'intervallo visibile, anche dopo zoom/pan.
+
+class LivePlotController:
+    def __init__(self, master, figsize=(10,4), canvas_factory=None, toolbar=True):
+        if canvas_factory is None:
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            canvas_factory = FigureCanvasTkAgg
+        self.fig = Figure(figsize=figsize)
+        self.ax_forza, self.ax_pedane = self.fig.subplots(1, 2)
+        self.canvas = canvas_factory(self.fig, master=master) if master is not None else canvas_factory(self.fig)
+        self._bg = None
+        self._serie = {}  # linea -> (x completo, y completo)
+
+        ax = self.ax_forza
+        self.line_forza, = ax.plot([], [], label='Forza Totale')
+        self.line_soglia = ax.axhline(0, color='red', linestyle='--', label='Soglia volo')
+        stile = {'takeoff': ('green', 'Take-off'), 'landing': ('orange', 'Landing'),
+                 'ecc': ('purple', 'Inizio eccentrica'), 'conc': ('brown', 'Inizio concentrica')}
+        self.markers = {k: ax.axvline(0, color=c, linestyle='--', label=l, animated=True, visible=False)
+                        for k, (c, l) in stile.items()}
+        self.fmax = ax.scatter([0], [0], color='red', s=60, zorder=5, label='Fmax', animated=True)
+        ax.set_xlabel('Tempo (ms)')
+        ax.set_ylabel('Forza (N)')
+        ax.set_title('Forza Totale e volo')
+
+        ax = self.ax_pedane
+        self.line_sx, = ax.plot([], [], label='SX')
+        self.line_dx, = ax.plot([], [], label='DX')
+        ax.set_xlabel('Tempo (ms)')
+        ax.set_ylabel('Forza (N)')
+        ax.set_title('Forza Pedane')
+        ax.legend()
+        self.fig.tight_layout()
+
+        for a in (self.ax_forza, self.ax_pedane):
+            a.callbacks.connect('xlim_changed', self._on_xlim)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        if master is not None:
+            if toolbar:
+                from matplotlib.backends.backend_tkagg import NavigationToolbar2Tk
+                NavigationToolbar2Tk(self.canvas, master).update()
+            self.canvas.get_tk_widget().pack()
+
+    # ---------- decimazione sull'intervallo visibile ----------
+
+    def _pixel(self, ax):
+        return max(int(ax.bbox.width), 100)
+
+    def _aggiorna_linea(self, line, ax):
+        x, y = self._serie[line]
+        if len(x) == 0:
+            line.set_data([], [])
+            return
+        x0, x1 = ax.get_xlim()
+        i0 = max(int(np.searchsorted(x, x0)) - 1, 0)
+        i1 = min(int(np.searchsorted(x, x1)) + 1, len(x))
+        line.set_data(*envelope_decimate(x[i0:i1], y[i0:i1], self._pixel(ax)))
+
+    def _on_xlim(self, ax):
+        for line in ax.get_lines():
+            if line in self._serie:
+                self._aggiorna_linea(line, ax)
+
+    # ---------- blitting dei marker ----------
+
+    def _on_draw(self, event):
+        self._bg = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._disegna_animati()
+
+    def _disegna_animati(self):
+        for artista in (*self.markers.values(), self.fmax):
+            if artista.get_visible():
+                self.ax_forza.draw_artist(artista)
+
+    def _blit(self):
+        if self._bg is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._bg)
+        self._disegna_animati()
+        self.canvas.blit(self.fig.bbox)
+
+    def _legenda(self):
+        handles = [self.line_forza, self.line_soglia] + \
+                  [self.markers[k] for k in ('takeoff', 'landing')] + [self.fmax] + \
+                  [self.markers[k] for k in ('ecc', 'conc')]
+        self.ax_forza.legend(handles=[h for h in handles if h.get_visible()])
+
+    # ---------- API ----------
+
+    def show(self, cmj, soglia_volo, ecc_idx=None, conc_idx=None):
+        # Nuovi dati: aggiorna linee e scala, poi un unico ridisegno completo.
+        df = cmj['df']
+        t = df['time'].to_numpy()
+        self._serie = {
+            self.line_forza: (t, df['forza_tot'].to_numpy()),
+            self.line_sx: (t, df['pedana_sinistra_cor'].to_numpy()),
+            self.line_dx: (t, df['pedana_destra_cor'].to_numpy()),
+        }
+        self._time = t
+        self.line_soglia.set_ydata([soglia_volo, soglia_volo])
+        self.fmax.set_offsets([[cmj['peak_time']*1000, cmj['Fmax']]])
+        self._posiziona(cmj['takeoff_time'], cmj['landing_time'], ecc_idx, conc_idx)
+        for ax, linee in ((self.ax_forza, (self.line_forza,)), (self.ax_pedane, (self.line_sx, self.line_dx))):
+            ymax = max(float(np.nanmax(self._serie[l][1])) for l in linee) if len(t) else 0.0
+            ax.set_ylim(0, ymax * 1.05 if ymax > 0 else 1.0)
+            if len(t) > 1:
+                ax.set_xlim(t[0], t[-1])  # xlim_changed aggiorna le linee decimate
+            else:
+                for l in linee:
+                    self._aggiorna_linea(l, ax)
+        self._legenda()
+        self.canvas.draw_idle()
+
+    def _posiziona(self, takeoff_time, landing_time, ecc_idx, conc_idx):
+        pos = {
+            'takeoff': takeoff_time*1000 if takeoff_time is not None else None,
+            'landing': landing_time*1000 if landing_time is not None else None,
+            'ecc': self._time[ecc_idx] if ecc_idx is not None else None,
+            'conc': self._time[conc_idx] if conc_idx is not None else None,
+        }
+        for k, x in pos.items():
+            self.markers[k].set_visible(x is not None)
+            if x is not None:
+                self.markers[k].set_xdata([x, x])
+
+    def set_markers(self, ecc_idx, conc_idx):
+        # Solo inizio eccentrica/concentrica cambiano: blitting, senza ridisegnare le tracce.
+        prima = (self.markers['ecc'].get_visible(), self.markers['conc'].get_visible())
+        for k, idx in (('ecc', ecc_idx), ('conc', conc_idx)):
+            self.markers[k].set_visible(idx is not None)
+            if idx is not None:
+                x = self._time[idx]
+                self.markers[k].set_xdata([x, x])
+        if prima != (ecc_idx is not None, conc_idx is not None):
+            self._legenda()  # cambia la legenda: serve un ridisegno completo
+            self.canvas.draw_idle()
+        else:
+            self._blit()
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from vita_core.profiling import profiled
+from vita_core.trends import parse_valori
+
+# ============================
+# SCHEMA DEI PARAMETRI E CONFRONTO PRE/POST
+# ============================
+# Un solo registro per nome, unità, gruppo dei grafici, direzione di miglioramento
+# (+1 più alto è meglio, -1 più basso è meglio, 0 neutro) e tipo numerico dei parametri
+# scritti nei CSV Parametro/Valore. Il confronto viene calcolato una volta in un DataFrame
+# tipizzato (allineato per nome del parametro, non per posizione) che anteprima GUI ed
+# export PDF disegnano senza riconvertire le stringhe.
+
+GRUPPI = ['Forza / Potenza', 'Velocità', 'Tempo', 'Altezza', 'Bilanciamento', 'Massa']
+
+SCHEMA = pd.DataFrame([
+    # parametro,                         unità,  gruppo,            direzione, dtype
+    ('Fmax (N)',                          'N',    'Forza / Potenza',  1, 'float64'),
+    ('t eccentrica (s)',                  's',    'Tempo',            0, 'float64'),
+    ('t concentrica (s)',                 's',    'Tempo',           -1, 'float64'),
+    ('Forza media concentrica (N)',       'N',    'Forza / Potenza',  1, 'float64'),
+    ('Impulso concentrico (N·s)',         'N·s',  'Forza / Potenza',  1, 'float64'),
+    ('Δv al take-off (m/s)',              'm/s',  'Velocità',         1, 'float64'),
+    ('Impulso / BW (s)',                  's',    'Tempo',            1, 'float64'),
+    ('Tempo di volo (s)',                 's',    'Tempo',            1, 'float64'),
+    ('Altezza salto (cm)',                'cm',   'Altezza',          1, 'float64'),
+    ('Bilanciamento medio DX (%)',        '%',    'Bilanciamento',    0, 'float64'),
+    ('Potenza media concentrica (W)',     'W',    'Forza / Potenza',  1, 'float64'),
+    ('Potenza massima concentrica (W)',   'W',    'Forza / Potenza',  1, 'float64'),
+    ('Velocità al take-off (m/s)',        'm/s',  'Velocità',         1, 'float64'),
+    ('Profondità contromovimento (cm)',   'cm',   'Altezza',          0, 'float64'),
+    ('Impulso di frenata (N·s)',          'N·s',  'Forza / Potenza',  1, 'float64'),
+    ('RFD frenata (N/s)',                 'N/s',  'Forza / Potenza',  1, 'float64'),
+    ('RSI modificato (m/s)',              'm/s',  'Velocità',         1, 'float64'),
+    ('Massa soggetto (kg)',               'kg',   'Massa',            0, 'float64'),
+], columns=['Parametro', 'Unità', 'Gruppo', 'Direzione', 'dtype']).set_index('Parametro')
+
+# Parametri mostrati nel confronto pre/post di compare.py (in quest'ordine)
+CONFRONTO_CMJ = [
+    'Fmax (N)',
+    't concentrica (s)',
+    'Forza media concentrica (N)',
+    'Impulso concentrico (N·s)',
+    'Δv al take-off (m/s)',
+    'Impulso / BW (s)',
+    'Tempo di volo (s)',
+    'Altezza salto (cm)',
+    'Bilanciamento medio DX (%)',
+    'Massa soggetto (kg)',
+]
+
+def _parametri(df):
+    out = pd.DataFrame({'Parametro': df['Parametro'].astype(str).str.strip(), 'Valore': df['Valore']})
+    return out.drop_duplicates('Parametro')
+
+@profiled("compare_frame")
+def compare_frame(pre, post, parametri=CONFRONTO_CMJ, schema=SCHEMA):
+    # Parametro, Unità, Gruppo, Direzione, Pre/Post (testo del CSV), Pre/Post numerici,
+    # Diff (%) ed Esito (+1 migliorato, -1 peggiorato, 0 invariato o neutro, NaN non numerico).
+    m = pd.merge(_parametri(pre), _parametri(post), on='Parametro', suffixes=('_pre', '_post'))
+    ordine = pd.Series(np.arange(len(parametri)), index=parametri)
+    m = m[m['Parametro'].isin(ordine.index)]
+    m = m.sort_values('Parametro', key=lambda c: c.map(ordine), ignore_index=True)
+    m = m.join(schema, on='Parametro')
+
+    # Conversione unica delle due colonne di testo, poi tipo dichiarato nello schema
+    n = len(m)
+    valori = parse_valori(pd.concat([m['Valore_pre'], m['Valore_post']], ignore_index=True)).to_numpy()
+    out = pd.DataFrame({
+        'Parametro': m['Parametro'], 'Unità': m['Unità'], 'Gruppo': m['Gruppo'],
+        'Direzione': m['Direzione'].fillna(0).astype(np.int8),
+        'Pre': m['Valore_pre'].astype(str), 'Post': m['Valore_post'].astype(str),
+        'Valore_Pre': valori[:n], 'Valore_Post': valori[n:],
+    })
+    tipi = m['dtype'].dropna().unique()
+    tipo = tipi[0] if len(tipi) == 1 else 'float64'   # tipi diversi: float comune
+    out[['Valore_Pre', 'Valore_Post']] = out[['Valore_Pre', 'Valore_Post']].astype(tipo)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        diff = (out['Valore_Post'] - out['Valore_Pre']) / out['Valore_Pre'] * 100
+    out['Diff (%)'] = diff.round(1)
+    out['Esito'] = np.sign(diff) * out['Direzione'] + 0.0   # + 0.0: niente -0.0
+    return out
@@ -0,0 +1,115 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from vita_core.baseline import estimate_baseline
+from vita_core.filtering import moving_average, sample_rate, window_samples
+from vita_core.hops import hop_metrics
+from vita_core.ingest import load_capture
+from vita_core.profiling import profiled
+
+# ============================
+# EUR, STIFFNESS E REPORT DI PERFORMANCE (SENZA GUI)
+# ============================
+# Calcoli di new.py, importabili da roster.py e dai processi worker senza Tk; matplotlib
+# viene caricato solo da write_performance_report.
+
+# ============================
+# LOGICA CALCOLI ROBUSTA
+# ============================
+
+@profiled("get_eur")
+def get_eur(sj_csv, cmj_csv):
+    try:
+        df_sj = pd.read_csv(sj_csv)
+        df_cmj = pd.read_csv(cmj_csv)
+        h_sj = float(df_sj[df_sj.iloc[:, 0].str.contains('Altezza', na=False)].iloc[0, 1])
+        h_cmj = float(df_cmj[df_cmj.iloc[:, 0].str.contains('Altezza', na=False)].iloc[0, 1])
+        return h_sj, h_cmj, h_cmj / h_sj
+    except Exception as e:
+        print(f"Errore lettura EUR: {e}")
+        return None
+
+def estimate_mass(file_path):
+    # Massa (kg) stimata dal tratto carico più stabile di un'acquisizione, None se non stimabile
+    dati = load_capture(file_path)
+    return estimate_baseline(dati["time"], dati["pedana_sinistra"], dati["pedana_destra"])['massa']
+
+@profiled("calculate_stiffness_metrics")
+def calculate_stiffness_metrics(file_path, massa, soglia=20, isteresi=10):
+    try:
+        dati = load_capture(file_path)
+        df = pd.DataFrame({"time": dati["time"], "sx": dati["pedana_sinistra"], "dx": dati["pedana_destra"]})
+        
+        # OFFSET automatici dal tratto scarico più stabile (volo o prima di salire in pedana)
+        stima = estimate_baseline(dati["time"], dati["pedana_sinistra"], dati["pedana_destra"])
+        offset_sx, offset_dx = stima['offset_sx'], stima['offset_dx']
+        if massa == "auto":
+            massa = stima['massa']
+            if massa is None: return None
+        
+        df['sx_cor'] = (df['sx'] - offset_sx).clip(lower=0)
+        df['dx_cor'] = (df['dx'] - offset_dx).clip(lower=0)
+        df['time_s'] = df['time'] / 1000
+        # Media mobile centrata di 5 ms (5 campioni a 1 kHz): nessun ritardo sui fronti dei contatti
+        fs = sample_rate(df['time_s'].values)
+        df['forza'] = moving_average((df['sx_cor'] + df['dx_cor']).values, window_samples(0.005, fs))
+        
+        # Balzi con isteresi, durate minime, scarto degli anomali e finestra stazionaria
+        balzi = hop_metrics(df['forza'].values, df['time_s'].values, massa,
+                            soglia_on=soglia, soglia_off=soglia - isteresi)
+        usati = balzi['steady']
+        if usati.sum() < 2: return None
+        
+        tc = np.mean(balzi['tc'][usati])
+        tv = np.mean(balzi['tv'][usati])
+        rsi = tv / tc
+        k_vert = (massa * np.pi * tv) / (tc**2 * (tv + tc))
+        
+        return tc, tv, rsi, k_vert
+    except Exception as e:
+        print(f"Errore Stiffness: {e}")
+    return None
+
+# ============================
+# EXPORT PDF + CSV
+# ============================
+
+def performance_values(results):
+    # (parametro, valore numerico, formato) per i test eseguiti
+    righe = []
+    if 'eur' in results:
+        righe.append(("Altezza SJ (cm)", results['eur']['sj'], "{:.1f}"))
+        righe.append(("Altezza CMJ (cm)", results['eur']['cmj'], "{:.1f}"))
+        righe.append(("EUR (Efficienza)", results['eur']['eur'], "{:.2f}"))
+    if 'stiff' in results:
+        righe.append(("RSI (Reattivita)", results['stiff']['rsi'], "{:.2f}"))
+        righe.append(("Vertical Stiffness (kN/m)", results['stiff']['kv']/1000, "{:.2f}"))
+        righe.append(("T. Contatto (s)", results['stiff']['tc'], "{:.3f}"))
+    return righe
+
+def performance_rows(results):
+    # Righe Parametro/Valore (struttura compatibile con compare.py)
+    return [[p, fmt.format(v)] for p, v, fmt in performance_values(results)]
+
+@profiled("write_performance_report")
+def write_performance_report(path_base, results, titolo="VALUTAZIONE NEUROMUSCOLARE"):
+    # PDF con la tabella dei parametri e CSV con lo stesso nome; restituisce il percorso del CSV.
+    # Figura senza pyplot: utilizzabile anche nei processi worker.
+    csv_data = performance_rows(results)
+    csv_path = os.path.splitext(path_base)[0] + ".csv"
+    pd.DataFrame(csv_data, columns=["Parametro", "Valore"]).to_csv(csv_path, index=False)
+
+    from matplotlib.figure import Figure   # matplotlib solo quando si scrive il report
+    from matplotlib.backends.backend_pdf import PdfPages
+    fig = Figure(figsize=(8.5, 11))
+    ax = fig.add_subplot()
+    ax.axis('off')
+    if csv_data:
+        table = ax.table(cellText=csv_data, colLabels=["Parametro", "Valore"], loc='center', cellLoc='left')
+        table.set_fontsize(12); table.scale(1.2, 2.5)
+    ax.set_title(titolo, fontsize=16, fontweight='bold', pad=30)
+    with PdfPages(path_base) as pdf:
+        pdf.savefig(fig)
+    return csv_path
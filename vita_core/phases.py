@@ -0,0 +1,84 @@
+import numpy as np
+
+# ============================
+# FASI DI VOLO (RUN-LENGTH)
+# ============================
+
+def find_flight_intervals(forza, time_s, soglia=5, durata_min=0.5):
+    # Restituisce gli indici posizionali (inizio, fine inclusi) di tutti i tratti
+    # con forza < soglia che durano almeno durata_min secondi.
+    forza = np.asarray(forza)
+    time_s = np.asarray(time_s)
+    sotto = np.empty(len(forza) + 2, dtype=np.int8)
+    sotto[0] = sotto[-1] = 0
+    np.less(forza, soglia, out=sotto[1:-1], casting='unsafe')
+    fronti = np.diff(sotto)
+    starts = np.flatnonzero(fronti == 1)
+    ends = np.flatnonzero(fronti == -1) - 1
+    keep = (time_s[ends] - time_s[starts]) >= durata_min
+    return starts[keep], ends[keep]
+
+def intervals_to_mask(starts, ends, n):
+    # Maschera booleana lunga n, True dentro gli intervalli [start, end].
+    marks = np.zeros(n + 1, dtype=np.int32)
+    np.add.at(marks, starts, 1)
+    np.add.at(marks, np.asarray(ends) + 1, -1)
+    return np.cumsum(marks[:n]) > 0
+
+# ============================
+# FASI DEL CMJ (ECCENTRICA / CONCENTRICA)
+# ============================
+
+g = 9.81
+
+def cumtrapz(y, x):
+    # Integrale cumulativo con regola dei trapezi, stesso numero di campioni di y (parte da 0).
+    out = np.empty(len(y))
+    out[0] = 0.0
+    np.cumsum((y[1:] + y[:-1]) * np.diff(x) / 2, out=out[1:])
+    return out
+
+def nearest_index(times, x):
+    # Indice del campione più vicino a x su un asse dei tempi ordinato: O(log n).
+    i = int(np.searchsorted(times, x))
+    if i <= 0:
+        return 0
+    if i >= len(times):
+        return len(times) - 1
+    return i - 1 if x - times[i-1] <= times[i] - x else i
+
+def detect_cmj_phases(forza, time_s, takeoff_idx, finestra_bw=1.0, n_sd=5, banda_min=10):
+    # Inizio eccentrica: primo campione dopo la finestra di peso corporeo in cui la forza
+    # scende sotto BW - n_sd*SD, riportato all'ultimo campione precedente ancora >= BW.
+    # Inizio concentrica: prima inversione della velocità (da negativa a >= 0) ottenuta
+    # integrando (F - BW)/m dall'inizio del movimento.
+    forza = np.asarray(forza, dtype=float)
+    time_s = np.asarray(time_s, dtype=float)
+    vuoto = {'eccentric_start_idx': None, 'concentric_start_idx': None, 'bw': None, 'bw_sd': None}
+    if takeoff_idx is None or takeoff_idx < 2:
+        return vuoto
+
+    contatto = np.flatnonzero(forza[:takeoff_idx] > 0)
+    if len(contatto) == 0:
+        return vuoto
+    i0 = contatto[0]
+    i1 = min(int(np.searchsorted(time_s, time_s[i0] + finestra_bw)), takeoff_idx)
+    if i1 - i0 < 2:
+        return vuoto
+    bw = forza[i0:i1].mean()
+    bw_sd = forza[i0:i1].std()
+    banda = max(n_sd * bw_sd, banda_min)
+
+    sotto = np.flatnonzero(forza[i1:takeoff_idx] < bw - banda)
+    if len(sotto) == 0:
+        return dict(vuoto, bw=bw, bw_sd=bw_sd)
+    j = i1 + sotto[0]
+    sopra = np.flatnonzero(forza[i0:j] >= bw)
+    ecc_idx = i0 + sopra[-1] if len(sopra) else j
+
+    massa = bw / g
+    vel = cumtrapz((forza[ecc_idx:takeoff_idx+1] - bw) / massa, time_s[ecc_idx:takeoff_idx+1])
+    k = int(np.argmin(vel))
+    risalita = np.flatnonzero(vel[k:] >= 0)
+    conc_idx = ecc_idx + k + (risalita[0] if len(risalita) else 0)
+    return {'eccentric_start_idx': int(ecc_idx), 'concentric_start_idx': int(conc_idx), 'bw': bw, 'bw_sd': bw_sd}
@@ -0,0 +1,26 @@
+import numpy as np
+
+# ============================
+# PRE-ELABORAZIONE SU ARRAY NUMPY
+# ============================
+# Stesso risultato di analysis.preprocess (offset, clip a 0, soglia di contatto) ma lavorando
+# in-place su buffer preallocati: nessuna Series intermedia, dtype a scelta (float32
+# dimezza la memoria delle colonne di forza).
+
+def _pulisci(raw, offset, soglia, out):
+    # out = raw - offset, azzerato dove non supera la soglia (include il clip a 0 e i NaN)
+    np.subtract(raw, offset, out=out, casting="unsafe")
+    np.copyto(out, 0, where=~(out > soglia))
+    return out
+
+def preprocess_arrays(sx, dx, offset_sx=0, offset_dx=0, soglia_contatto=3, dtype=np.float64, out=None):
+    # Restituisce (sx_cor, dx_cor, forza_tot). Con out=(a, b, c) riusa i buffer passati.
+    n = len(sx)
+    if out is None:
+        out = tuple(np.empty(n, dtype=dtype) for _ in range(3))
+    sx_cor, dx_cor, forza_tot = out
+    soglia = max(soglia_contatto, 0)
+    _pulisci(sx, offset_sx, soglia, sx_cor)
+    _pulisci(dx, offset_dx, soglia, dx_cor)
+    np.add(sx_cor, dx_cor, out=forza_tot)
+    return sx_cor, dx_cor, forza_tot
@@ -0,0 +1,353 @@
+import atexit
+import cProfile
+import inspect
+import json
+import os
+import threading
+import time
+import tracemalloc
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+# ============================
+# STRUMENTAZIONE PER STADIO (OPZIONALE)
+# ============================
+# Le funzioni di calcolo e di export sono decorate con @profiled("nome"). Da spenta la
+# strumentazione costa un confronto con None per chiamata. Da accesa ogni stadio registra
+# tempo reale, tempo CPU del thread, campioni elaborati, file e stadio genitore. Con
+# memoria=True registra anche il picco di memoria allocata (tracemalloc, rallenta
+# sensibilmente). Gli stadi annidati ereditano il file del genitore. Export in JSON lines
+# (un evento per riga) o in formato Chrome trace (chrome://tracing, Perfetto). profilo
+# "cprofile" o "pyinstrument" attiva anche un profiler di funzioni attorno agli stadi di
+# primo livello; le statistiche vanno accanto all'export (.prof / .html).
+# Accensione: enable() da codice, --profilo FILE nelle righe di comando (add_arguments),
+# oppure VITA_PROFILE=FILE per qualsiasi strumento, GUI comprese (salvato all'uscita;
+# VITA_PROFILE_MEMORY=1, VITA_PROFILER=cprofile|pyinstrument).
+# Nei processi worker gli eventi tornano al processo principale con submit/result.
+
+PROFILI = ("cprofile", "pyinstrument")
+MB = 2**20
+
+_attivo = None   # Profiler acceso in questo processo, None = spento
+
+class _Spento:
+    # Contesto restituito da stage() a strumentazione spenta: nessuna misura
+    __slots__ = ()
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+    def __setattr__(self, nome, valore):
+        pass
+
+_SPENTO = _Spento()
+
+class _Fase:
+    __slots__ = ('profiler', 'nome', 'file', 'file_default', 'campioni', 'genitore', 'livello', 'inizio',
+                 't0', 'c0', 'm0', 'picco', 'hook')
+
+    def __init__(self, profiler, nome, file, campioni, file_default=None):
+        self.profiler, self.nome, self.file, self.campioni = profiler, nome, file, campioni
+        self.file_default = file_default
+
+    def __enter__(self):
+        p = self.profiler
+        pila = p._pila()
+        self.genitore = pila[-1] if pila else None
+        if self.file is None:
+            # file dello stadio esterno, altrimenti il percorso passato alla funzione decorata
+            ereditato = self.genitore.file if self.genitore is not None else None
+            self.file = ereditato if ereditato is not None else self.file_default
+        self.livello = len(pila)
+        pila.append(self)
+        if p.memoria:
+            corrente, picco = tracemalloc.get_traced_memory()
+            if self.genitore is not None:
+                self.genitore.picco = max(self.genitore.picco, picco)
+            tracemalloc.reset_peak()
+            self.m0 = self.picco = corrente
+        self.hook = self.livello == 0 and p._avvia_hook()
+        self.inizio = time.time()
+        self.c0 = time.thread_time()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, *exc):
+        wall = time.perf_counter() - self.t0
+        cpu = time.thread_time() - self.c0
+        p = self.profiler
+        if self.hook:
+            p._ferma_hook()
+        evento = {'stadio': self.nome, 'file': self.file, 'inizio': self.inizio, 'wall_s': wall, 'cpu_s': cpu,
+                  'campioni': self.campioni, 'livello': self.livello,
+                  'genitore': self.genitore.nome if self.genitore is not None else None,
+                  'pid': os.getpid(), 'tid': threading.get_ident(), 'errore': tipo.__name__ if tipo else None}
+        if p.memoria:
+            picco = max(self.picco, tracemalloc.get_traced_memory()[1])
+            if self.genitore is not None:
+                self.genitore.picco = max(self.genitore.picco, picco)
+            evento['picco_mb'] = (picco - self.m0) / MB
+        p._pila().pop()
+        with p._lock:
+            p.eventi.append(evento)
+        return False
+
+class Profiler:
+    def __init__(self, memoria=False, profilo=None, uscita=None):
+        if profilo is not None and profilo not in PROFILI:
+            raise ValueError(f"profilo sconosciuto: {profilo} (ammessi: {', '.join(PROFILI)})")
+        self.memoria = memoria
+        self.profilo = profilo
+        self.uscita = uscita
+        self.pid = os.getpid()
+        self.eventi = []
+        self._lock = threading.Lock()
+        self._locale = threading.local()
+        self._hook = None
+        self._hook_usato = False
+        self._hook_lock = threading.Lock()   # un solo profiler di funzioni attivo alla volta
+        if memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if profilo == "cprofile":
+            self._hook = cProfile.Profile()
+        elif profilo == "pyinstrument":
+            try:
+                from pyinstrument import Profiler as Campionatore
+                self._hook = Campionatore()
+            except ImportError:
+                print("pyinstrument non installato: nessun profilo delle funzioni")
+
+    def opzioni(self):
+        return {'memoria': self.memoria, 'profilo': self.profilo, 'uscita': self.uscita}
+
+    def _pila(self):
+        pila = getattr(self._locale, 'pila', None)
+        if pila is None:
+            pila = self._locale.pila = []
+        return pila
+
+    def _avvia_hook(self):
+        # Stadio di primo livello: profiler di funzioni acceso se libero (altri thread no)
+        if self._hook is None or not self._hook_lock.acquire(blocking=False):
+            return False
+        self._hook_usato = True
+        if self.profilo == "cprofile":
+            self._hook.enable()
+        else:
+            self._hook.start()
+        return True
+
+    def _ferma_hook(self):
+        if self.profilo == "cprofile":
+            self._hook.disable()
+        else:
+            self._hook.stop()
+        self._hook_lock.release()
+
+    def stage(self, nome, file=None, campioni=None, file_default=None):
+        return _Fase(self, nome, file, campioni, file_default)
+
+    def drain(self):
+        with self._lock:
+            eventi, self.eventi = self.eventi, []
+        return eventi
+
+    def extend(self, eventi):
+        with self._lock:
+            self.eventi.extend(eventi)
+
+    # ---------- export ----------
+
+    def to_jsonl(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for e in self.eventi:
+                f.write(json.dumps(e) + "\n")
+
+    def to_chrome_trace(self, path):
+        # Eventi completi ("X"), tempi in microsecondi; un processo/thread per riga della vista
+        t_min = min((e['inizio'] for e in self.eventi), default=0.0)
+        eventi = [{'name': e['stadio'], 'cat': e['genitore'] or 'vita', 'ph': 'X',
+                   'ts': (e['inizio'] - t_min) * 1e6, 'dur': e['wall_s'] * 1e6, 'pid': e['pid'], 'tid': e['tid'],
+                   'args': {k: e[k] for k in ('file', 'campioni', 'cpu_s', 'picco_mb', 'errore') if e.get(k) is not None}}
+                  for e in self.eventi]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({'traceEvents': eventi, 'displayTimeUnit': 'ms'}, f)
+
+    def save_profile(self, path):
+        # Statistiche del profiler di funzioni: .prof (pstats / snakeviz) o .html (pyinstrument)
+        if self._hook is None or not self._hook_usato:
+            return None
+        if self.profilo == "cprofile":
+            self._hook.dump_stats(path)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self._hook.output_html())
+        return path
+
+    def save(self, path=None):
+        # .jsonl -> JSON lines, altrimenti Chrome trace; il profilo di funzioni accanto
+        path = path or self.uscita
+        if path.lower().endswith(".jsonl"):
+            self.to_jsonl(path)
+        else:
+            self.to_chrome_trace(path)
+        self.save_profile(_percorso_profilo(path, self.profilo))
+        return path
+
+    def summary(self):
+        # Una riga per stadio: chiamate, tempi totali/medi/massimi, CPU, picco, campioni al secondo
+        colonne = ['stadio', 'chiamate', 'wall_s', 'wall_medio_ms', 'wall_max_ms', 'cpu_s', 'picco_mb',
+                   'campioni', 'Mcampioni_s']
+        if not self.eventi:
+            return pd.DataFrame(columns=colonne)
+        df = pd.DataFrame(self.eventi)
+        if 'picco_mb' not in df:
+            df['picco_mb'] = np.nan
+        df['campioni'] = pd.to_numeric(df['campioni'], errors='coerce')
+        g = df.groupby('stadio', sort=False)
+        out = pd.DataFrame({
+            'chiamate': g.size(), 'wall_s': g['wall_s'].sum(), 'wall_medio_ms': g['wall_s'].mean() * 1000,
+            'wall_max_ms': g['wall_s'].max() * 1000, 'cpu_s': g['cpu_s'].sum(), 'picco_mb': g['picco_mb'].max(),
+            'campioni': g['campioni'].sum(min_count=1),
+        })
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out['Mcampioni_s'] = out['campioni'] / out['wall_s'] / 1e6
+        return out.reset_index()[colonne].sort_values('wall_s', ascending=False, ignore_index=True)
+
+def _percorso_profilo(path, profilo):
+    return os.path.splitext(path)[0] + (".prof" if profilo == "cprofile" else ".html")
+
+# ============================
+# INTERRUTTORE E DECORATORE
+# ============================
+
+def enable(memoria=False, profilo=None, uscita=None):
+    # uscita: file salvato all'uscita dell'interprete (solo dal processo che l'ha acceso)
+    global _attivo
+    _attivo = Profiler(memoria=memoria, profilo=profilo, uscita=uscita)
+    if uscita is not None:
+        atexit.register(_salva_all_uscita, _attivo)
+    return _attivo
+
+def disable():
+    global _attivo
+    p, _attivo = _attivo, None
+    if p is not None and p.memoria and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return p
+
+def active():
+    return _attivo
+
+def _salva_all_uscita(p):
+    if p is _attivo and p.pid == os.getpid() and p.eventi:
+        print(f"Profilo: {p.save()}")
+
+def stage(nome, file=None, campioni=None):
+    # with stage("render", file=path) as s: ...; s.campioni = n
+    if _attivo is None:
+        return _SPENTO
+    return _attivo.stage(nome, file, campioni)
+
+def _conta(x):
+    if isinstance(x, (pd.DataFrame, pd.Series, np.ndarray)):
+        return len(x)
+    if isinstance(x, dict):
+        if isinstance(x.get('df'), pd.DataFrame):
+            return len(x['df'])
+        primo = next(iter(x.values()), None)
+        if isinstance(primo, np.ndarray):   # colonne di load_capture
+            return len(primo)
+    return None
+
+def _campioni(argomenti, risultato):
+    # Campioni elaborati: il primo argomento se è un tracciato, altrimenti il risultato
+    n = _conta(next(iter(argomenti.values()), None))
+    return n if n is not None else _conta(risultato)
+
+def profiled(nome, campioni=_campioni):
+    # campioni(argomenti, risultato) -> numero di campioni elaborati dallo stadio; argomenti
+    # è {parametro: valore} della chiamata (posizionali o per nome, default compresi)
+    def decora(fn):
+        firma = inspect.signature(fn)
+        @wraps(fn)
+        def avvolta(*args, **kwargs):
+            if _attivo is None:
+                return fn(*args, **kwargs)
+            legati = firma.bind(*args, **kwargs)
+            legati.apply_defaults()
+            argomenti = legati.arguments
+            primo = next(iter(argomenti.values()), None)
+            with _attivo.stage(nome, file_default=primo if isinstance(primo, str) else None) as fase:
+                risultato = fn(*args, **kwargs)
+                fase.campioni = campioni(argomenti, risultato)
+            return risultato
+        return avvolta
+    return decora
+
+# ============================
+# PROCESSI WORKER
+# ============================
+
+class _DaWorker:
+    __slots__ = ('risultato', 'eventi')
+    def __init__(self, risultato, eventi):
+        self.risultato, self.eventi = risultato, eventi
+
+def _in_worker(opzioni, fn, args, kwargs):
+    # Profiler del worker (nuovo se ereditato dal padre con fork), eventi restituiti col risultato
+    global _attivo
+    if _attivo is None or _attivo.pid != os.getpid():
+        _attivo = Profiler(memoria=opzioni['memoria'], profilo=opzioni['profilo'])
+    risultato = fn(*args, **kwargs)
+    if opzioni['uscita'] is not None and _attivo.profilo is not None:
+        base, ext = os.path.splitext(_percorso_profilo(opzioni['uscita'], _attivo.profilo))
+        _attivo.save_profile(f"{base}-{os.getpid()}{ext}")   # cumulativo per processo
+    return _DaWorker(risultato, _attivo.drain())
+
+def submit(pool, fn, *args, **kwargs):
+    # pool.submit con la strumentazione estesa al worker quando è accesa
+    if _attivo is None:
+        return pool.submit(fn, *args, **kwargs)
+    return pool.submit(_in_worker, _attivo.opzioni(), fn, args, kwargs)
+
+def result(fut):
+    risultato = fut.result()
+    if isinstance(risultato, _DaWorker):
+        if _attivo is not None:
+            _attivo.extend(risultato.eventi)
+        return risultato.risultato
+    return risultato
+
+# ============================
+# RIGA DI COMANDO
+# ============================
+
+def add_arguments(parser):
+    gruppo = parser.add_argument_group("strumentazione")
+    gruppo.add_argument("--profilo", metavar="FILE",
+                        help="tempi per stadio in FILE (.jsonl = JSON lines, altrimenti Chrome trace)")
+    gruppo.add_argument("--profilo-memoria", action="store_true", help="registra anche il picco di memoria")
+    gruppo.add_argument("--profiler", choices=PROFILI, help="profilo delle funzioni accanto al FILE")
+
+def from_args(args):
+    # Accende la strumentazione se richiesta: Profiler oppure None
+    if not args.profilo:
+        return None
+    return enable(memoria=args.profilo_memoria, profilo=args.profiler, uscita=args.profilo)
+
+def finish(p, args, log=print):
+    # Salva e stampa il riepilogo per stadio; spegne la strumentazione
+    if p is None:
+        return
+    disable()
+    log(f"Profilo: {p.save(args.profilo)}")
+    log(p.summary().round(3).to_string(index=False))
+
+if os.environ.get("VITA_PROFILE"):
+    import multiprocessing
+    if multiprocessing.parent_process() is None:   # non nei worker: salva solo il processo principale
+        enable(memoria=os.environ.get("VITA_PROFILE_MEMORY") == "1", profilo=os.environ.get("VITA_PROFILER") or None,
+               uscita=os.environ["VITA_PROFILE"])
@@ -0,0 +1,167 @@
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_pdf import PdfPages
+
+# ============================
+# REPORT PDF CMJ (API A OGGETTI, SENZA PYPLOT)
+# ============================
+# Le figure vengono create una volta per renderer e riusate: per ogni report si aggiornano
+# solo i dati delle linee e la posizione dei marker. Le tracce lunghe sono ridotte con un
+# inviluppo min/max per intervallo: i picchi restano visibili ma il PDF contiene qualche
+# migliaio di punti invece di tutti i campioni.
+
+PUNTI_MAX = 4000
+
+def envelope_decimate(x, y, n_bins=PUNTI_MAX // 2):
+    # Per ogni intervallo tiene il campione minimo e massimo, in ordine di tempo.
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    if n <= 2 * n_bins:
+        return x, y
+    k = n // n_bins
+    # NaN esclusi dal confronto (un intervallo tutto NaN tiene il primo campione)
+    nan = np.isnan(y)
+    y_min = np.where(nan, np.inf, y)
+    y_max = np.where(nan, -np.inf, y)
+    m = k * n_bins
+    base = np.arange(n_bins) * k
+    idx = [base + np.argmin(y_min[:m].reshape(n_bins, k), axis=1),
+           base + np.argmax(y_max[:m].reshape(n_bins, k), axis=1)]
+    if n > m:
+        idx.append(m + np.array([np.argmin(y_min[m:]), np.argmax(y_max[m:])]))
+    idx = np.unique(np.concatenate(idx))
+    return x[idx], y[idx]
+
+def _vline(ax, **kw):
+    return ax.axvline(0, linestyle='--', **kw)
+
+class CMJReportRenderer:
+    def __init__(self, punti_max=PUNTI_MAX):
+        self.n_bins = punti_max // 2
+        self._forza = self._template_forza()
+        self._pedane = self._template_pedane()
+        self._bil = self._template_bilanciamento()
+        self._tab = self._template_tabella()
+
+    # ---------- template ----------
+
+    def _template_forza(self):
+        fig = Figure(figsize=(8,5))
+        ax = fig.add_subplot()
+        t = {'fig': fig, 'ax': ax}
+        t['forza'], = ax.plot([], [], label='Forza Totale')
+        t['soglia'] = ax.axhline(0, color='red', linestyle='--', label='Soglia volo')
+        t['takeoff'] = _vline(ax, color='green', label='Take-off')
+        t['landing'] = _vline(ax, color='orange', label='Landing')
+        t['fmax'] = ax.scatter([0], [0], color='red', s=60, zorder=5, label='Fmax')
+        t['ecc'] = _vline(ax, color='purple', label='Inizio eccentrica')
+        t['conc'] = _vline(ax, color='brown', label='Inizio concentrica')
+        ax.set_xlabel('Tempo (ms)')
+        ax.set_ylabel('Forza (N)')
+        return t
+
+    def _template_pedane(self):
+        fig = Figure(figsize=(8,5))
+        ax = fig.add_subplot()
+        t = {'fig': fig, 'ax': ax}
+        t['sx'], = ax.plot([], [], label='SX')
+        t['dx'], = ax.plot([], [], label='DX')
+        ax.set_xlabel('Tempo (ms)')
+        ax.set_ylabel('Forza (N)')
+        ax.legend(loc='upper left')
+        return t
+
+    def _template_bilanciamento(self):
+        fig = Figure(figsize=(8,5))
+        ax = fig.add_subplot()
+        t = {'fig': fig, 'ax': ax}
+        t['bil'], = ax.plot([], [], label='Bilanciamento DX (%)')
+        ax.axhline(50, color='black', linestyle='--', linewidth=1)
+        ax.set_xlabel('Tempo concentrica (s)')
+        ax.set_ylabel('Bilanciamento (%)')
+        ax.set_title('Bilanciamento durante fase concentrica')
+        ax.set_ylim(0,100)
+        ax.legend(loc='upper left')
+        ax.grid(alpha=0.3)
+        return t
+
+    def _template_tabella(self):
+        fig = Figure(figsize=(10,6))
+        ax = fig.add_subplot()
+        ax.axis('off')
+        ax.set_title('Parametri CMJ', fontsize=18, fontweight='bold')
+        return {'fig': fig, 'ax': ax}
+
+    # ---------- aggiornamento ----------
+
+    def _set_line(self, line, x, y):
+        line.set_data(*envelope_decimate(x, y, self.n_bins))
+
+    @staticmethod
+    def _rescale(ax):
+        ax.relim(visible_only=True)
+        ax.autoscale_view()
+        ax.set_ylim(bottom=0)
+
+    def _pagina_forza(self, df, cmj, soglia_volo, ecc_idx, conc_idx):
+        t = self._forza
+        self._set_line(t['forza'], df['time'].values, df['forza_tot'].values)
+        t['soglia'].set_ydata([soglia_volo, soglia_volo])
+        marker = {
+            'takeoff': cmj['takeoff_time']*1000 if cmj['takeoff_time'] is not None else None,
+            'landing': cmj['landing_time']*1000 if cmj['landing_time'] is not None else None,
+            'ecc': df['time'].iloc[ecc_idx] if ecc_idx is not None else None,
+            'conc': df['time'].iloc[conc_idx] if conc_idx is not None else None,
+        }
+        for nome, x in marker.items():
+            t[nome].set_visible(x is not None)
+            if x is not None:
+                t[nome].set_xdata([x, x])
+        t['fmax'].set_offsets([[cmj['peak_time']*1000, cmj['Fmax']]])
+        visibili = [t['forza'], t['soglia'], t['takeoff'], t['landing'], t['fmax'], t['ecc'], t['conc']]
+        t['ax'].legend(handles=[h for h in visibili if h.get_visible()], loc='upper left')
+        self._rescale(t['ax'])
+        return t['fig']
+
+    def _pagina_pedane(self, df):
+        t = self._pedane
+        self._set_line(t['sx'], df['time'].values, df['pedana_sinistra_cor'].values)
+        self._set_line(t['dx'], df['time'].values, df['pedana_destra_cor'].values)
+        self._rescale(t['ax'])
+        return t['fig']
+
+    def _pagina_bilanciamento(self, t_rel, bil_conc):
+        t = self._bil
+        self._set_line(t['bil'], np.asarray(t_rel), np.asarray(bil_conc))
+        t['ax'].relim()
+        t['ax'].autoscale_view(scaley=False)
+        return t['fig']
+
+    def _pagina_tabella(self, cmj_data):
+        ax = self._tab['ax']
+        for tab in list(ax.tables):
+            tab.remove()
+        table = ax.table(cellText=cmj_data, loc='center', cellLoc='center', colWidths=[0.5,0.5])
+        table.auto_set_font_size(False)
+        table.set_fontsize(14)
+        table.scale(1.5,2)
+        return self._tab['fig']
+
+    def render(self, pdf_file, df, cmj, soglia_volo, ecc_idx, conc_idx, cmj_data, bilanciamento=None):
+        # bilanciamento = (tempo relativo, % DX) della fase concentrica, oppure None
+        with PdfPages(pdf_file) as pdf:
+            pdf.savefig(self._pagina_forza(df, cmj, soglia_volo, ecc_idx, conc_idx))
+            pdf.savefig(self._pagina_pedane(df))
+            if bilanciamento is not None:
+                pdf.savefig(self._pagina_bilanciamento(*bilanciamento))
+            pdf.savefig(self._pagina_tabella(cmj_data))
+
+_renderer = None
+
+def render_cmj_report(pdf_file, *args, **kwargs):
+    # Renderer condiviso nel processo: i template vengono costruiti al primo report.
+    global _renderer
+    if _renderer is None:
+        _renderer = CMJReportRenderer()
+    _renderer.render(pdf_file, *args, **kwargs)
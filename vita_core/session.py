@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+from vita_core.filtering import force_filter, sample_rate, smooth
+from vita_core.phases import find_flight_intervals, detect_cmj_phases, cumtrapz
+from vita_core.profiling import profiled
+
+g = 9.81
+
+# ============================
+# SESSIONE CON PIÙ CMJ NELLO STESSO FILE
+# ============================
+# Ogni tratto di volo è un salto. Per il salto k la ricerca delle fasi parte
+# dall'atterraggio precedente + `assestamento` secondi (per escludere l'impatto), il peso
+# corporeo viene stimato sulla finestra iniziale di quel tratto e le grandezze vengono
+# calcolate su tutti i salti insieme con integrali cumulativi e riduzioni per segmento.
+
+COLONNE_SALTO = [
+    'Fmax (N)', 'Tempo di volo (s)', 'Altezza salto (cm)', 'Impulso concentrico (N·s)',
+    'Potenza media concentrica (W)', 'Potenza massima concentrica (W)',
+]
+
+@profiled("analyze_session")
+def analyze_session(df, soglia_volo=5, durata_min=0.2, finestra_media=None, assestamento=1.0, finestra_bw=1.0,
+                    filtro=None):
+    # df come restituito da preprocess. Restituisce {'salti': tabella per salto, 'riepilogo': best/media/CV}.
+    forza = df['forza_tot'].to_numpy(dtype=np.float64)
+    time_s = df['time_s'].to_numpy(dtype=np.float64)
+    forza_filt = smooth(forza, sample_rate(time_s), force_filter(finestra_media, filtro))
+    takeoff, landing = find_flight_intervals(forza, time_s, soglia_volo, durata_min)
+    n_salti = len(takeoff)
+
+    # Inizio del tratto utile per ogni salto
+    inizio = np.zeros(n_salti, dtype=np.intp)
+    if n_salti > 1:
+        dopo = np.searchsorted(time_s, time_s[landing[:-1]] + assestamento)
+        inizio[1:] = np.minimum(dopo, takeoff[1:])
+
+    ecc = np.full(n_salti, -1, dtype=np.intp)
+    conc = np.full(n_salti, -1, dtype=np.intp)
+    bw = np.full(n_salti, np.nan)
+    for k in range(n_salti):
+        a, t = inizio[k], takeoff[k]
+        fasi = detect_cmj_phases(forza[a:t+1], time_s[a:t+1], t - a, finestra_bw=finestra_bw)
+        if fasi['concentric_start_idx'] is not None:
+            ecc[k] = a + fasi['eccentric_start_idx']
+            conc[k] = a + fasi['concentric_start_idx']
+            bw[k] = fasi['bw']
+
+    # Fmax sul segnale filtrato tra inizio movimento (o inizio tratto) e take-off
+    da = np.where(ecc >= 0, ecc, inizio)
+    validi = takeoff > da
+    fmax = np.full(n_salti, np.nan)
+    if validi.any():
+        fmax[validi] = np.maximum.reduceat(forza_filt, np.ravel(np.column_stack((da[validi], takeoff[validi]))))[::2]
+
+    t_volo = time_s[landing] - time_s[takeoff]
+    altezza = g * t_volo**2 / 8 * 100
+
+    # Impulso e potenza concentrica: integrali cumulativi su tutto il tracciato
+    imp_cum = cumtrapz(forza, time_s)
+    ok = conc >= 0
+    impulso = np.full(n_salti, np.nan)
+    impulso[ok] = imp_cum[takeoff[ok]] - imp_cum[conc[ok]]
+
+    pot_media = np.full(n_salti, np.nan)
+    pot_max = np.full(n_salti, np.nan)
+    if ok.any():
+        # Velocità dall'inizio del movimento: v = (∫F dt - BW·Δt) / m, per ogni salto
+        segmenti = [np.arange(e, t + 1) for e, t in zip(ecc[ok], takeoff[ok])]
+        lunghezze = np.array([len(s) for s in segmenti])
+        idx = np.concatenate(segmenti)
+        salto = np.repeat(np.arange(ok.sum()), lunghezze)
+        e0 = ecc[ok][salto]
+        m = bw[ok][salto] / g
+        vel = (imp_cum[idx] - imp_cum[e0] - bw[ok][salto] * (time_s[idx] - time_s[e0])) / m
+        pot = forza[idx] * vel
+        fase_conc = idx >= conc[ok][salto]
+        pot_c = np.where(fase_conc, pot, -np.inf)
+        partenze = np.concatenate(([0], np.cumsum(lunghezze)[:-1]))
+        pot_max[ok] = np.maximum.reduceat(pot_c, partenze)
+        # Potenza media = lavoro concentrico / durata concentrica
+        lavoro = cumtrapz(pot, time_s[idx])
+        fine = partenze + lunghezze - 1
+        primo_conc = partenze + (conc[ok] - ecc[ok])
+        durata = time_s[takeoff[ok]] - time_s[conc[ok]]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pot_media[ok] = np.where(durata > 0, (lavoro[fine] - lavoro[primo_conc]) / durata, np.nan)
+
+    salti = pd.DataFrame({
+        'Salto': np.arange(1, n_salti + 1),
+        'takeoff_idx': takeoff,
+        'landing_idx': landing,
+        'eccentric_start_idx': np.where(ecc >= 0, ecc, -1),
+        'concentric_start_idx': np.where(conc >= 0, conc, -1),
+        'Take-off (s)': time_s[takeoff],
+        'Fmax (N)': fmax,
+        'Tempo di volo (s)': t_volo,
+        'Altezza salto (cm)': altezza,
+        'Impulso concentrico (N·s)': impulso,
+        'Potenza media concentrica (W)': pot_media,
+        'Potenza massima concentrica (W)': pot_max,
+    })
+    return {'salti': salti, 'riepilogo': session_summary(salti)}
+
+def session_summary(salti):
+    # Migliore, media e coefficiente di variazione (%) tra le prove
+    valori = salti[COLONNE_SALTO]
+    media = valori.mean()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cv = valori.std(ddof=1) / media * 100
+    return pd.DataFrame({'Best': valori.max(), 'Media': media, 'CV (%)': cv})
@@ -0,0 +1,158 @@
+import datetime
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+# ============================
+# ARCHIVIO STORICO DEI RISULTATI (SQLITE)
+# ============================
+# Una riga per sessione (atleta, tipo di test, data, file di origine) e una riga per
+# parametro con il valore numerico, invece di CSV Parametro/Valore con stringhe formattate.
+# Indici su atleta/test/data e su parametro: confronti pre/post e andamenti su migliaia
+# di sessioni sono una sola query. Percorso predefinito: VITA_RESULTS_DB oppure
+# risultati_vita.sqlite nella cartella del programma.
+
+DB_PATH = os.environ.get("VITA_RESULTS_DB") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "risultati_vita.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessioni (
+    id        INTEGER PRIMARY KEY,
+    atleta    TEXT NOT NULL,
+    test      TEXT NOT NULL,
+    data      TEXT NOT NULL,
+    sorgente  TEXT NOT NULL DEFAULT '',
+    massa     REAL,
+    creato    TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (atleta, test, data, sorgente)
+);
+CREATE TABLE IF NOT EXISTS metriche (
+    sessione_id INTEGER NOT NULL REFERENCES sessioni(id) ON DELETE CASCADE,
+    parametro   TEXT NOT NULL,
+    valore      REAL,
+    PRIMARY KEY (sessione_id, parametro)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_sessioni_atleta ON sessioni (atleta, test, data);
+CREATE INDEX IF NOT EXISTS idx_sessioni_test ON sessioni (test, data);
+CREATE INDEX IF NOT EXISTS idx_metriche_parametro ON metriche (parametro, sessione_id);
+"""
+
+def _data_iso(data):
+    if data is None:
+        return datetime.date.today().isoformat()
+    if isinstance(data, datetime.datetime):
+        return data.isoformat(timespec='seconds')
+    if isinstance(data, datetime.date):
+        return data.isoformat()
+    return str(data)
+
+def _numero(v):
+    if v is None:
+        return None
+    try:
+        v = float(v)
+    except (TypeError, ValueError):
+        return None
+    return v if np.isfinite(v) else None
+
+class ResultsStore:
+    def __init__(self, path=None):
+        self.path = path or DB_PATH
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")   # letture concorrenti durante gli export
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- scrittura ----------
+
+    def save_session(self, atleta, test, valori, data=None, sorgente="", massa=None):
+        # valori: {parametro: numero}. Una sessione già presente (stessa chiave) viene sostituita.
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO sessioni (atleta, test, data, sorgente, massa) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (atleta, test, data, sorgente) DO UPDATE SET massa = excluded.massa, "
+                "creato = CURRENT_TIMESTAMP RETURNING id",
+                (atleta, test, _data_iso(data), sorgente or "", _numero(massa)))
+            sessione_id = cur.fetchone()[0]
+            self.conn.execute("DELETE FROM metriche WHERE sessione_id = ?", (sessione_id,))
+            self.conn.executemany(
+                "INSERT INTO metriche (sessione_id, parametro, valore) VALUES (?, ?, ?)",
+                [(sessione_id, p, _numero(v)) for p, v in valori.items()])
+        return sessione_id
+
+    def import_csv(self, csv_path, atleta, test, data=None):
+        # Migrazione dei vecchi CSV Parametro/Valore (le stringhe vengono convertite una volta sola)
+        df = pd.read_csv(csv_path)
+        df.columns = df.columns.str.strip()
+        valori = pd.to_numeric(df['Valore'].astype(str).str.replace('%', '').str.strip(), errors='coerce')
+        if data is None:
+            data = datetime.date.fromtimestamp(os.path.getmtime(csv_path))
+        return self.save_session(atleta, test, dict(zip(df['Parametro'], valori)), data,
+                                 sorgente=os.path.abspath(csv_path))
+
+    # ---------- interrogazioni ----------
+
+    def _query(self, sql, params=()):
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def sessions(self, atleta=None, test=None):
+        filtri, params = self._filtri(atleta, test, None, None)
+        return self._query(f"SELECT * FROM sessioni s {filtri} ORDER BY atleta, test, data", params)
+
+    def _filtri(self, atleta, test, dal, al, parametri=None):
+        cond, params = [], []
+        for col, v in (("s.atleta", atleta), ("s.test", test)):
+            if v is None:
+                continue
+            v = [v] if isinstance(v, str) else list(v)
+            cond.append(f"{col} IN ({','.join('?' * len(v))})")
+            params += v
+        if dal is not None:
+            cond.append("s.data >= ?"); params.append(_data_iso(dal))
+        if al is not None:
+            cond.append("s.data <= ?"); params.append(_data_iso(al))
+        if parametri is not None:
+            parametri = [parametri] if isinstance(parametri, str) else list(parametri)
+            cond.append(f"m.parametro IN ({','.join('?' * len(parametri))})")
+            params += parametri
+        return ("WHERE " + " AND ".join(cond)) if cond else "", params
+
+    def history(self, atleta=None, test=None, parametri=None, dal=None, al=None):
+        # Formato lungo: atleta, test, data, sessione_id, parametro, valore (ordinato per data)
+        filtri, params = self._filtri(atleta, test, dal, al, parametri)
+        return self._query(
+            "SELECT s.atleta, s.test, s.data, s.id AS sessione_id, m.parametro, m.valore "
+            f"FROM sessioni s JOIN metriche m ON m.sessione_id = s.id {filtri} "
+            "ORDER BY s.atleta, s.test, s.data, s.id", params)
+
+    def pre_post(self, atleta, test, data_pre, data_post, parametri=None):
+        # Stesse colonne di compare_new.get_merged_df: ultima sessione di ciascuna data
+        filtri, params = self._filtri(atleta, test, None, None, parametri)
+        filtri += (" AND " if filtri else "WHERE ") + "s.data IN (?, ?)"
+        pre, post = _data_iso(data_pre), _data_iso(data_post)
+        df = self._query(
+            "SELECT s.data, s.id, m.parametro AS Parametro, m.valore AS Valore "
+            f"FROM sessioni s JOIN metriche m ON m.sessione_id = s.id {filtri} ORDER BY s.id",
+            params + [pre, post])
+        df = df.drop_duplicates(['data', 'Parametro'], keep='last')
+        merged = pd.merge(df[df['data'] == pre][['Parametro', 'Valore']],
+                          df[df['data'] == post][['Parametro', 'Valore']],
+                          on='Parametro', suffixes=('_Pre', '_Post'))
+        merged['Diff %'] = (merged['Valore_Post'] - merged['Valore_Pre']) / merged['Valore_Pre'] * 100
+        return merged
+
+def save_session(*args, path=None, **kwargs):
+    # Scrittura singola con apertura e chiusura dell'archivio (usata dagli export)
+    with ResultsStore(path) as store:
+        return store.save_session(*args, **kwargs)
@@ -0,0 +1,244 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from vita_core import ingest
+from vita_core.filtering import force_filter, sample_rate, window_from_spec
+from vita_core.preprocessing import preprocess_arrays
+
+# ============================
+# ANALISI IN STREAMING (A BLOCCHI)
+# ============================
+# Per registrazioni lunghe con molti salti: il file viene letto a blocchi di dimensione
+# fissa e ogni blocco passa per offset/clip/soglia, media mobile centrata e ricerca dei
+# tratti di volo. Tra un blocco e l'altro si conservano solo le code necessarie alla
+# media mobile e lo stato del tratto di volo aperto, quindi la memoria non dipende dalla
+# durata della registrazione. Ogni salto viene restituito appena il volo si chiude.
+# Sui file che stanno in memoria i risultati coincidono con preprocess + analyze_session:
+# Fmax e picco vengono cercati sulla forza filtrata dall'atterraggio precedente più
+# `assestamento` secondi (dall'inizio del file per il primo salto) fino al take-off.
+
+def iter_capture_chunks(path, chunksize=100_000):
+    # Blocchi (time_ms, sx, dx). Se la cache binaria è valida si leggono fette dei .npy
+    # in memory-map, altrimenti il testo con il parser C a blocchi.
+    cache = ingest.read_capture_cache(path)
+    if cache is not None:
+        dati, decimali = cache
+        n = len(dati["time"])
+        for i in range(0, n, chunksize):
+            blocco = []
+            for c in ingest.COLONNE:
+                a = np.asarray(dati[c][i:i+chunksize], dtype=np.float64)
+                k = decimali.get(c)
+                blocco.append(np.round(a, k) if k else a)
+            yield tuple(blocco)
+        return
+    reader = pd.read_csv(path, sep=",", header=None, comment="#", engine="c",
+                         skip_blank_lines=True, on_bad_lines="skip", chunksize=chunksize)
+    for df in reader:
+        df = df.iloc[:, :3]
+        if len(df.columns) < 3:
+            raise ValueError(f"{os.path.basename(path)}: servono almeno 3 colonne (tempo, SX, DX)")
+        if any(df[c].dtype == object for c in df.columns):
+            df = df.apply(pd.to_numeric, errors="coerce")
+            df = df[df.iloc[:, 0].notna()]
+        yield tuple(df.iloc[:, j].to_numpy(dtype=np.float64) for j in range(3))
+
+def _spec_media(filtro):
+    # Specifica di filtering.smooth ridotta a una sola media mobile, altrimenti ValueError
+    if isinstance(filtro, (list, tuple)):
+        if len(filtro) != 1:
+            raise ValueError("JumpStream: una sola specifica di filtro, non una sequenza")
+        filtro = filtro[0]
+    if filtro.get('tipo') != 'media':
+        raise ValueError(f"JumpStream: filtro '{filtro.get('tipo')}' non calcolabile a blocchi, "
+                         "solo 'media'")
+    return filtro
+
+class JumpStream:
+    def __init__(self, offset_sx=0, offset_dx=0, soglia_contatto=3, soglia_volo=5,
+                 durata_min=0.5, finestra_media=None, assestamento=1.0, filtro=None):
+        self.offset_sx = offset_sx
+        self.offset_dx = offset_dx
+        self.soglia_contatto = soglia_contatto
+        self.soglia_volo = soglia_volo
+        self.durata_min = durata_min
+        # Dopo un atterraggio la ricerca del massimo riparte da atterraggio + assestamento
+        # secondi, come in session.analyze_session: l'impatto non è la spinta del salto dopo
+        self.assestamento = assestamento
+        self.riprendi_t = -np.inf
+        # Forza filtrata come in analyze_session(finestra_media, filtro): L campioni prima
+        # e R dopo, come filtering.moving_average; la finestra in secondi si converte alla
+        # frequenza stimata sul primo blocco. Solo la media mobile si calcola a blocchi
+        # con lo stesso risultato: Butterworth (fase zero su tutto il segnale) e mediana
+        # (MAD su tutta la prova) no.
+        self.filtro = _spec_media(force_filter(finestra_media, filtro))
+        self.L = self.R = None
+
+        self.n_seen = 0              # campioni grezzi ricevuti
+        self.n_filt = 0              # campioni con media mobile già calcolata
+        self.coda_forza = np.empty(0)
+        self.coda_time = np.empty(0)
+        self.cursore = 0             # primo campione filtrato non ancora assegnato a un segmento
+
+        self.run_start = None        # tratto sotto soglia ancora aperto
+        self.run_start_time = None
+        self.last_time = None
+        self.pending = []            # voli chiusi in attesa della media mobile fino al take-off
+        self.best = None             # (Fmax, idx, tempo) dall'ultimo atterraggio
+        self.held = None             # massimo dentro il tratto aperto (conta solo se non è un volo)
+        self.seg_start = 0
+        self.finito = False
+
+    # ---------- pre-elaborazione (come analysis.preprocess) ----------
+
+    def _forza(self, sx, dx):
+        return preprocess_arrays(sx, dx, self.offset_sx, self.offset_dx, self.soglia_contatto)[2]
+
+    # ---------- media mobile con code tra blocchi ----------
+    # Stessa media di filtering.moving_average, calcolata a blocchi: la coda degli ultimi
+    # L + R campioni passa al blocco successivo, i bordi sono solo inizio e fine del file.
+
+    def _finestra(self, time_s):
+        w = max(window_from_spec(self.filtro, sample_rate(time_s)), 1)
+        if self.filtro.get('centrata', True):
+            self.L, self.R = w // 2, (w - 1) // 2
+        else:
+            self.L, self.R = w - 1, 0
+
+    def _filtra(self, forza, time_s, finale):
+        buf = np.concatenate((self.coda_forza, forza))
+        buf_t = np.concatenate((self.coda_time, time_s))
+        b0 = self.n_seen - len(self.coda_forza)
+        n_tot = self.n_seen + len(forza)
+        fine = n_tot if finale else max(n_tot - self.R, self.n_filt)
+        idx = np.arange(self.n_filt, fine)
+        cs = np.concatenate(([0.0], np.cumsum(buf)))
+        lo = np.maximum(idx - self.L, 0)
+        hi = np.minimum(idx + self.R + 1, n_tot)
+        valori = (cs[hi - b0] - cs[lo - b0]) / (hi - lo)
+        tempi = buf_t[idx - b0]
+        self.n_filt = fine
+        keep = self.L + self.R
+        self.coda_forza = buf[-keep:] if keep else buf[:0]
+        self.coda_time = buf_t[-keep:] if keep else buf_t[:0]
+        return valori, tempi
+
+    # ---------- tratti sotto soglia ----------
+
+    def _tratti(self, forza, time_s):
+        # Tratti chiusi in questo blocco come (start, end, t_start, t_end) globali.
+        sotto = forza < self.soglia_volo
+        prima = 1 if self.run_start is not None else 0
+        fronti = np.diff(np.concatenate(([prima], sotto.astype(np.int8))))
+        starts = list(np.flatnonzero(fronti == 1) + self.n_seen)
+        ends = np.flatnonzero(fronti == -1) - 1 + self.n_seen
+        chiusi = []
+        t_start = [self.run_start_time] if prima else []
+        if prima:
+            starts.insert(0, self.run_start)
+        t_start += [time_s[s - self.n_seen] for s in starts[len(t_start):]]
+        for k, e in enumerate(ends):
+            t_end = time_s[e - self.n_seen] if e >= self.n_seen else self.last_time
+            chiusi.append((int(starts[k]), int(e), t_start[k], t_end))
+        if len(starts) > len(ends):
+            self.run_start, self.run_start_time = int(starts[-1]), t_start[-1]
+        else:
+            self.run_start = self.run_start_time = None
+        return chiusi
+
+    # ---------- massimi e salti ----------
+
+    def _max(self, corrente, valori, tempi, i0, a, b):
+        # Aggiorna (max, idx, tempo) con i valori filtrati di indice globale [a, b),
+        # esclusi i campioni dentro l'assestamento dopo l'ultimo atterraggio.
+        if b > a and tempi[a - i0] < self.riprendi_t:
+            a = i0 + int(np.searchsorted(tempi, self.riprendi_t))
+        if b <= a:
+            return corrente
+        pezzo = valori[a - i0:b - i0]
+        k = int(np.argmax(pezzo))
+        if corrente is None or pezzo[k] > corrente[0]:
+            return (pezzo[k], a + k, tempi[a - i0 + k])
+        return corrente
+
+    def _elabora(self, valori, tempi, i0, finale):
+        eventi = []
+        disponibili = i0 + len(valori)
+        while self.pending:
+            s, e, ts, te = self.pending[0]
+            qualifica = te - ts >= self.durata_min
+            if qualifica and s > disponibili:
+                break  # media mobile non ancora pronta fino al take-off
+            self.pending.pop(0)
+            inizio = max(self.cursore, i0)
+            self.best = self._max(self.best, valori, tempi, i0, inizio, min(s, disponibili))
+            if qualifica:
+                eventi.append({
+                    'takeoff_idx': s, 'landing_idx': e,
+                    'takeoff_time': ts, 'landing_time': te,
+                    'Fmax': self.best[0] if self.best else None,
+                    'peak_idx': self.best[1] if self.best else None,
+                    'peak_time': self.best[2] if self.best else None,
+                    'segment_start': self.seg_start,
+                })
+                self.best = self.held = None
+                self.riprendi_t = te + self.assestamento
+                self.seg_start = e + 1
+                self.cursore = e + 1
+            else:
+                if self.held is not None and (self.best is None or self.held[0] > self.best[0]):
+                    self.best = self.held
+                self.held = None
+                self.best = self._max(self.best, valori, tempi, i0, max(s, inizio), min(e + 1, disponibili))
+                self.cursore = max(self.cursore, min(e + 1, disponibili))
+
+        if self.pending:
+            return eventi
+        inizio = max(self.cursore, i0)
+        if self.run_start is not None and not finale:
+            confine = max(min(self.run_start, disponibili), inizio)
+            self.best = self._max(self.best, valori, tempi, i0, inizio, confine)
+            self.held = self._max(self.held, valori, tempi, i0, confine, disponibili)
+        else:
+            self.best = self._max(self.best, valori, tempi, i0, inizio, disponibili)
+        self.cursore = max(self.cursore, disponibili)
+        return eventi
+
+    def feed(self, time_ms, sx, dx):
+        if self.finito:
+            raise RuntimeError("stream già chiuso")
+        if len(time_ms) == 0:
+            return []
+        time_s = np.asarray(time_ms, dtype=np.float64) / 1000
+        if self.L is None:
+            self._finestra(time_s)
+        forza = self._forza(np.asarray(sx, dtype=np.float64), np.asarray(dx, dtype=np.float64))
+        self.pending += self._tratti(forza, time_s)
+        i0 = self.n_filt
+        valori, tempi = self._filtra(forza, time_s, finale=False)
+        self.n_seen += len(forza)
+        self.last_time = time_s[-1]
+        return self._elabora(valori, tempi, i0, finale=False)
+
+    def finish(self):
+        if self.finito:
+            return []
+        self.finito = True
+        # Un volo ancora aperto a fine file si chiude sull'ultimo campione
+        if self.run_start is not None:
+            self.pending.append((self.run_start, self.n_seen - 1, self.run_start_time, self.last_time))
+            self.run_start = self.run_start_time = None
+        if self.L is None:
+            self._finestra(np.empty(0))
+        i0 = self.n_filt
+        valori, tempi = self._filtra(np.empty(0), np.empty(0), finale=True)
+        return self._elabora(valori, tempi, i0, finale=True)
+
+def stream_jumps(path, chunksize=100_000, **params):
+    # Generatore dei salti rilevati in un file, in ordine di take-off.
+    stream = JumpStream(**params)
+    for time_ms, sx, dx in iter_capture_chunks(path, chunksize):
+        yield from stream.feed(time_ms, sx, dx)
+    yield from stream.finish()
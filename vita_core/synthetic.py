@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+g = 9.81
+
+# ============================
+# TRACCE SINTETICHE DI PEDANA
+# ============================
+
+def _seg(fs, durata, f0, f1, forma="cos"):
+    n = max(int(round(durata * fs)), 1)
+    u = np.linspace(0, 1, n, endpoint=False)
+    if forma == "cos":
+        u = (1 - np.cos(np.pi * u)) / 2
+    return f0 + (f1 - f0) * u
+
+def _spinta(fs, bw, picco, contromovimento):
+    # Forza totale dall'appoggio al take-off. CMJ: scarico, frenata fino al picco, spinta;
+    # SJ: dalla posizione accosciata direttamente alla spinta. Durate in secondi.
+    if contromovimento:
+        parti = [_seg(fs, 0.25, bw, 0.4 * bw), _seg(fs, 0.20, 0.4 * bw, picco)]
+    else:
+        parti = [_seg(fs, 0.10, bw, picco)]
+    parti += [np.full(int(round(0.125 * fs)), picco), _seg(fs, 0.125, picco, 0.0)]
+    return np.concatenate(parti)
+
+def _jump_template(fs, massa, altezza, contromovimento=True):
+    # Profilo di un salto coerente con la dinamica: il picco di forza viene scelto perché
+    # l'impulso netto (F - BW) fino al take-off dia v = sqrt(2·g·h), e il volo dura 2·v/g.
+    # Il profilo è lineare nel picco, quindi basta risolvere impulso(picco) = m·v.
+    bw = massa * g
+    impulso = lambda f: np.sum(f - bw) / fs
+    a = impulso(_spinta(fs, bw, 0.0, contromovimento))
+    b = impulso(_spinta(fs, bw, 1.0, contromovimento)) - a
+    v = np.sqrt(2 * g * altezza)
+    spinta = _spinta(fs, bw, (massa * v - a) / b, contromovimento)
+    v_to = impulso(spinta) / massa
+    parti = [
+        spinta,
+        np.zeros(int(round(2 * v_to / g * fs))),  # volo
+        _seg(fs, 0.05, 0.0, 4.0 * bw),             # impatto
+        _seg(fs, 0.15, 4.0 * bw, bw),              # assorbimento
+    ]
+    return np.concatenate(parti)
+
+def cmj_trace(fs=1000, durata=10.0, n_salti=1, massa=75, altezza=0.35, rumore=1.0, asimmetria=0.0,
+              offset=(50, 40), seed=0, contromovimento=True):
+    # DataFrame con le stesse colonne di load_pedana (time in ms, forze grezze per pedana).
+    # altezza in metri: velocità al take-off dall'impulso e tempo di volo coerenti tra loro.
+    rng = np.random.default_rng(seed)
+    n = int(round(durata * fs))
+    bw = massa * g
+    forza = np.full(n, bw)
+    salto = _jump_template(fs, massa, altezza, contromovimento)
+    if n_salti > 0:
+        passo = n // n_salti
+        if passo < len(salto) + fs // 2:
+            raise ValueError("Durata troppo breve per il numero di salti richiesto")
+        for k in range(n_salti):
+            i0 = k * passo + (passo - len(salto)) // 2
+            forza[i0:i0 + len(salto)] = salto
+    quota_sx = 0.5 - asimmetria / 2
+    sx = forza * quota_sx + offset[0] + rng.normal(0, rumore, n)
+    dx = forza * (1 - quota_sx) + offset[1] + rng.normal(0, rumore, n)
+    return pd.DataFrame({
+        "time": np.arange(n) * (1000.0 / fs),
+        "pedana_sinistra": np.round(sx, 2),
+        "pedana_destra": np.round(dx, 2),
+    })
+
+def sj_trace(fs=1000, durata=10.0, n_salti=1, massa=75, altezza=0.30, **kwargs):
+    # Squat jump: come cmj_trace senza contromovimento (parte da fermo in accosciata)
+    return cmj_trace(fs=fs, durata=durata, n_salti=n_salti, massa=massa, altezza=altezza,
+                     contromovimento=False, **kwargs)
+
+def hop_trace(fs=1000, n_balzi=20, tc=0.2, tv=0.3, massa=75, variabilita=0.02, rumore=1.0,
+              stazione=2.0, asimmetria=0.0, offset=(50, 40), seed=0):
+    # Balzelli: stazione eretta, n_balzi (volo + contatto a semi-seno con impulso pari a
+    # BW·(tc + tv)), stazione eretta. tc/tv variano di ±variabilità relativa per balzo.
+    rng = np.random.default_rng(seed)
+    bw = massa * g
+    parti = [np.full(int(round(stazione * fs)), bw)]
+    for _ in range(n_balzi):
+        tc_k = tc * (1 + rng.uniform(-variabilita, variabilita))
+        tv_k = tv * (1 + rng.uniform(-variabilita, variabilita))
+        n_c = int(round(tc_k * fs))
+        picco = bw * np.pi * (tc_k + tv_k) / (2 * tc_k)
+        parti.append(np.zeros(int(round(tv_k * fs))))
+        parti.append(picco * np.sin(np.pi * (np.arange(n_c) + 0.5) / n_c))
+    parti.append(np.zeros(int(round(tv * fs))))
+    parti.append(np.full(int(round(stazione * fs)), bw))
+    forza = np.concatenate(parti)
+    n = len(forza)
+    quota_sx = 0.5 - asimmetria / 2
+    sx = forza * quota_sx + offset[0] + rng.normal(0, rumore, n)
+    dx = forza * (1 - quota_sx) + offset[1] + rng.normal(0, rumore, n)
+    return pd.DataFrame({
+        "time": np.arange(n) * (1000.0 / fs),
+        "pedana_sinistra": np.round(sx, 2),
+        "pedana_destra": np.round(dx, 2),
+    })
+
+def analytic_jump(fs=1000, massa=75.0, V=2.5, omega=2*np.pi, stazione=1.0):
+    # Salto di riferimento con soluzione esatta: v(t) = -V sin(ωt) per t in [0, 3π/(2ω)] dopo
+    # `stazione` secondi di stazione eretta. Take-off a v = V, minimo di velocità a π/(2ω),
+    # inizio concentrica a π/ω, profondità 2V/ω, impulso di frenata m·V, altezza V²/(2g).
+    # Restituisce forza totale, tempo (s), inizio movimento, take-off e metriche attese.
+    from vita_core.phases import cumtrapz
+    t_mov = np.arange(0, 1.5 * np.pi / omega + 0.5 / fs, 1 / fs)
+    t = np.concatenate((np.arange(0, stazione, 1 / fs), stazione + t_mov))
+    acc = np.concatenate((np.zeros(int(round(stazione * fs))), -V * omega * np.cos(omega * t_mov)))
+    forza = massa * (g + acc)
+    attesi = {
+        'takeoff_velocity': V,
+        'jump_height': V**2 / (2 * g),
+        'cm_depth': 2 * V / omega,
+        'braking_impulse': massa * V,
+        'time_to_takeoff': 1.5 * np.pi / omega,
+        'bw': massa * g,
+    }
+    # Potenza F·v analitica sulla concentrica (ωt in [π, 3π/2]), integrata su una griglia fine
+    tc = np.linspace(np.pi / omega, 1.5 * np.pi / omega, 100001)
+    pot = massa * (g - V * omega * np.cos(omega * tc)) * (-V * np.sin(omega * tc))
+    attesi['peak_power'] = pot.max()
+    attesi['mean_power'] = cumtrapz(pot, tc)[-1] / (tc[-1] - tc[0])
+    return forza, t, int(round(stazione * fs)), len(t) - 1, attesi
+
+def write_capture(df, path):
+    # Stesso formato dei file esportati dalla pedana: niente intestazione, separatore virgola.
+    df.to_csv(path, header=False, index=False)
@@ -0,0 +1,172 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from vita_core.baseline import rolling_mean_std
+from vita_core.profiling import profiled
+
+# ============================
+# ANDAMENTO SU N SESSIONI (TUTTI GLI ATLETI INSIEME)
+# ============================
+# Ingresso in formato lungo: atleta, data, parametro, valore (come ResultsStore.history o
+# load_sessions dai CSV). Ordinando per (atleta, parametro, data) ogni serie è un tratto
+# contiguo: differenze, baseline mobile e SWC si calcolano su tutto l'array in una volta,
+# con i confini tra serie gestiti dalla posizione nella serie (nessun ciclo per atleta).
+# Baseline = media delle `finestra` sessioni precedenti; SWC = fattore × SD della baseline
+# dell'atleta ('atleta') oppure × SD tra atleti alla prima sessione ('squadra').
+
+CHIAVI = ['atleta', 'parametro']
+
+def load_sessions(paths, atleta=None, date=None):
+    # CSV Parametro/Valore in formato lungo. atleta/date: uno per file (default: cartella
+    # del file e data di modifica). I valori vengono convertiti una sola volta, tutti insieme.
+    pezzi = []
+    for k, p in enumerate(paths):
+        df = pd.read_csv(p, usecols=[0, 1])
+        df.columns = ['parametro', 'valore']
+        df['atleta'] = atleta[k] if atleta is not None else os.path.basename(os.path.dirname(os.path.abspath(p)))
+        df['data'] = date[k] if date is not None else pd.Timestamp(os.path.getmtime(p), unit='s').normalize()
+        df['sorgente'] = os.path.basename(p)
+        pezzi.append(df)
+    lungo = pd.concat(pezzi, ignore_index=True)
+    lungo['parametro'] = lungo['parametro'].astype(str).str.strip()
+    lungo['valore'] = parse_valori(lungo['valore'])
+    return lungo
+
+def parse_valori(valori):
+    # Stringhe dei CSV Parametro/Valore ("12.3", "45 %", "-") -> float, NaN se non numeriche.
+    # Colonne già numeriche (read_csv senza '%') passano senza tornare a stringa.
+    if pd.api.types.is_numeric_dtype(valori) and not pd.api.types.is_bool_dtype(valori):
+        return valori.astype(np.float64)
+    return pd.to_numeric(valori.astype(str).str.replace('%', '').str.strip(), errors='coerce').astype(np.float64)
+
+def trend_table(lungo, finestra=3, swc_fattore=0.2, riferimento_swc='atleta'):
+    # Aggiunge sessione, delta e variazioni % rispetto alla misura precedente e alla prima,
+    # baseline mobile, SWC e flag (+1 / 0 / -1, NaN senza baseline).
+    # sessione = rango denso della chiave di sessione (data, poi sessione_id se presente) per
+    # atleta su tutti i parametri: un parametro assente in una sessione lascia un buco nella
+    # sua serie invece di spostare i valori successivi. Delta e baseline usano le misure
+    # presenti della serie (la precedente esistente, le `finestra` precedenti esistenti).
+    df = lungo.copy()
+    df['data'] = pd.to_datetime(df['data'])
+    chiave = ['data'] + (['sessione_id'] if 'sessione_id' in df.columns else [])
+    df = df.sort_values(CHIAVI + chiave, kind='stable', ignore_index=True)
+    v = df['valore'].to_numpy(dtype=np.float64)
+
+    # Id globale ordinato per (atleta, chiave): meno il primo id dell'atleta = rango per atleta
+    id_sessione = df.groupby(['atleta'] + chiave, sort=True, dropna=False).ngroup()
+    df['sessione'] = (id_sessione - id_sessione.groupby(df['atleta']).transform('min') + 1).to_numpy()
+
+    gruppo = df.groupby(CHIAVI, sort=False)
+    pos = gruppo.cumcount().to_numpy()
+    precedente = np.where(pos > 0, np.roll(v, 1), np.nan)
+    primo = v[np.flatnonzero(pos == 0)[np.cumsum(pos == 0) - 1]]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        df['delta'] = v - precedente
+        df['delta %'] = (v - precedente) / np.abs(precedente) * 100
+        df['delta % dalla prima'] = (v - primo) / np.abs(primo) * 100
+
+    # Baseline: finestra che finisce alla sessione precedente (valida solo dentro la serie)
+    n = len(v)
+    base = np.full(n, np.nan)
+    sd = np.full(n, np.nan)
+    if n > finestra:
+        media_w, sd_w = rolling_mean_std(v, finestra)   # finestra i = v[i:i+finestra]
+        righe = np.flatnonzero(pos >= finestra)
+        inizio = righe - finestra
+        ok = np.isfinite(sd_w[inizio])
+        base[righe[ok]] = media_w[inizio[ok]]
+        # SD campionaria (ddof=1) come pandas.std
+        sd[righe[ok]] = sd_w[inizio[ok]] * np.sqrt(finestra / (finestra - 1)) if finestra > 1 else 0.0
+    df['baseline'] = base
+
+    if riferimento_swc == 'squadra':
+        primi = df[pos == 0].groupby('parametro')['valore'].std()
+        df['SWC'] = swc_fattore * df['parametro'].map(primi).to_numpy()
+        df.loc[np.isnan(base), 'SWC'] = np.nan
+    else:
+        df['SWC'] = swc_fattore * sd
+    soglia = df['SWC'].to_numpy()
+    flag = np.where(v > base + soglia, 1.0, np.where(v < base - soglia, -1.0, 0.0))
+    flag[np.isnan(base) | np.isnan(v)] = np.nan
+    df['flag'] = flag
+    return df
+
+def trend_matrix(tabella, colonna='valore'):
+    # Matrice (atleta, parametro) × sessione con un solo pivot; NaN dove il parametro manca
+    return tabella.pivot(index=CHIAVI, columns='sessione', values=colonna)
+
+def pre_post(tabella, sessione_pre=1, sessione_post=None):
+    # Due sessioni della tabella nelle colonne di compare_new (Parametro, Valore_Pre, Valore_Post, Diff %),
+    # scelte per numero di sessione (NaN se il parametro manca in quella sessione).
+    # sessione_post None = ultima sessione con un valore per ogni serie.
+    m = trend_matrix(tabella)
+    if sessione_post is None:
+        post = m.ffill(axis=1).iloc[:, -1]
+    else:
+        post = m.reindex(columns=[sessione_post]).iloc[:, 0]
+    pre = m.reindex(columns=[sessione_pre]).iloc[:, 0]
+    out = pd.DataFrame({'Valore_Pre': pre, 'Valore_Post': post}).reset_index()
+    out['Diff %'] = (out['Valore_Post'] - out['Valore_Pre']) / out['Valore_Pre'] * 100
+    return out.rename(columns={'parametro': 'Parametro'})
+
+# ============================
+# REPORT PDF MULTI-SESSIONE
+# ============================
+
+def _fmt(v, formato):
+    return formato.format(v) if pd.notna(v) else "-"
+
+COLORI_FLAG = {1.0: '#4CAF50', 0.0: '#9E9E9E', -1.0: '#AA1949'}
+
+@profiled("render_trend_report")
+def render_trend_report(pdf_file, tabella, parametri=None, per_pagina=6):
+    # Per ogni atleta: andamento di ogni parametro con baseline ± SWC e punti colorati dal
+    # flag, poi una tabella dell'ultima sessione. Figure create una volta e riusate.
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_pdf import PdfPages
+    if parametri is not None:
+        tabella = tabella[tabella['parametro'].isin(parametri)]
+    fig = Figure(figsize=(8.5, 11))
+    assi = fig.subplots(per_pagina // 2, 2).ravel()
+    fig_tab = Figure(figsize=(8.5, 11))
+    ax_tab = fig_tab.add_subplot()
+    impaginata = False
+    with PdfPages(pdf_file) as pdf:
+        for atleta, dati in tabella.groupby('atleta', sort=True):
+            serie = list(dati.groupby('parametro', sort=False))
+            for inizio in range(0, len(serie), per_pagina):
+                for ax in assi:
+                    ax.clear()
+                    ax.set_visible(False)
+                for ax, (parametro, s) in zip(assi, serie[inizio:inizio + per_pagina]):
+                    ax.set_visible(True)
+                    x = s['sessione'].to_numpy()
+                    ax.plot(x, s['valore'], color='black', linewidth=1, marker='')
+                    base, swc = s['baseline'].to_numpy(), s['SWC'].to_numpy()
+                    ax.plot(x, base, color='#2196F3', linestyle='--', linewidth=1)
+                    ax.fill_between(x, base - swc, base + swc, color='#2196F3', alpha=0.15)
+                    colori = [COLORI_FLAG.get(f, 'white') for f in s['flag']]
+                    ax.scatter(x, s['valore'], c=colori, edgecolors='black', zorder=3, s=30)
+                    ax.set_title(parametro, fontsize=9, fontweight='bold')
+                    ax.set_xticks(x)
+                    ax.tick_params(labelsize=7)
+                    ax.grid(alpha=0.3)
+                fig.suptitle(f"ANDAMENTO - {atleta}", fontsize=14, fontweight='bold')
+                if not impaginata:   # stessa griglia per tutte le pagine: layout calcolato una volta
+                    fig.tight_layout(rect=(0, 0, 1, 0.97))
+                    impaginata = True
+                pdf.savefig(fig)
+
+            ultima = dati[dati['sessione'] == dati.groupby('parametro')['sessione'].transform('max')]
+            celle = [[r['parametro'], _fmt(r['valore'], "{:.2f}"), _fmt(r['baseline'], "{:.2f}"),
+                      _fmt(r['delta % dalla prima'], "{:+.1f}"), {1.0: "▲", -1.0: "▼", 0.0: "="}.get(r['flag'], "-")]
+                     for r in ultima.to_dict('records')]
+            ax_tab.clear()
+            ax_tab.axis('off')
+            table = ax_tab.table(cellText=celle, colLabels=["Parametro", "Ultima", "Baseline", "Var % dalla prima", "SWC"],
+                                 loc='center', cellLoc='center')
+            table.auto_set_font_size(False); table.set_fontsize(9); table.scale(1, 1.6)
+            ax_tab.set_title(f"ULTIMA SESSIONE - {atleta}", fontsize=14, fontweight='bold', pad=20)
+            pdf.savefig(fig_tab)